@@ -0,0 +1,26 @@
+from librespot.audio.decoders import AudioQuality, VorbisOnlyAudioQuality
+from librespot.metadata import TrackId
+
+AUDIO_QUALITIES = {
+    "normal": AudioQuality.NORMAL,
+    "high": AudioQuality.HIGH,
+}
+
+
+class LibrespotAudioSource:
+    """Ogg Vorbis streams from Spotify's content feeder over a librespot session.
+
+    An audio source opens a track by its base62 ID at a download_quality ('normal' or
+    'high') and returns (size, reader): size is None when unknown, and reader.read(n)
+    returns up to n bytes, or b"" once the stream is exhausted. The download stage only
+    talks to this interface, so a local source can stand in for Spotify.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def open(self, track_id, quality):
+        stream = self.session.content_feeder().load(
+            TrackId.from_base62(track_id), VorbisOnlyAudioQuality(AUDIO_QUALITIES[quality]), False, None)
+
+        return stream.input_stream.size, stream.input_stream.stream()
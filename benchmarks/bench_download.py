@@ -0,0 +1,156 @@
+"""Run download_handler on a mock playlist and report download pipeline throughput.
+
+Audio comes from benchmarks.fake_audio_source and metadata (genres, lyrics, covers) from
+benchmarks.mock_spotify, so the download, transcode, tag and finalize stages run
+offline. Reports tracks per minute, CPU utilisation and the busy time of every stage.
+Needs ffmpeg. Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_download --tracks 100 --bandwidth-kbps 2000 --transcode-jobs 4 --output download.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_audio_source import FakeAudioSource
+from benchmarks.load_scenario import create_app
+from benchmarks.mock_spotify import MockLibrary, MockSpotifyServer, get_mock_playlist_id
+from main import prepare_sync
+
+
+def get_cpu_seconds():
+    times = os.times()
+    # children are the ffmpeg processes; they are only counted once waited for
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def get_stage_report(stage, wall_seconds):
+    return {
+        "stage": stage.name,
+        "workers": stage.workers,
+        "jobs": stage.count,
+        "seconds": stage.seconds,
+        "seconds_per_job": stage.seconds / stage.count if stage.count else None,
+        # share of the stage's worker time spent handling jobs
+        "busy": stage.seconds / (wall_seconds * stage.workers) if wall_seconds else None,
+    }
+
+
+def run_benchmark(args):
+    server = MockSpotifyServer(
+        MockLibrary(liked_count=0, playlist_count=1, playlist_size=args.tracks),
+        latency=args.latency_ms / 1000,
+    ).start()
+    runtime_folder = tempfile.mkdtemp(prefix="unify-download-")
+    audio_source = FakeAudioSource(
+        seconds=args.track_seconds,
+        bandwidth=args.bandwidth_kbps * 1000 / 8 if args.bandwidth_kbps else None,
+        first_byte_delay=args.first_byte_ms / 1000,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    config_overrides = {
+        "download_format": args.format,
+        "download_quality": args.quality,
+        "download_jobs": args.download_jobs,
+        "transcode_jobs": args.transcode_jobs,
+        "tag_jobs": args.tag_jobs,
+        "stream_transcode": args.stream_transcode,
+    }
+
+    print(f"Mock Spotify at {server.url}, runtime files in {runtime_folder}")
+
+    try:
+        app = create_app(server, runtime_folder, config_overrides)
+        app.audio_source = audio_source
+        app.option_type = "playlist"
+        app.playlist_id = get_mock_playlist_id(0)
+        app.playlist_url = f"https://open.spotify.com/playlist/{app.playlist_id}"
+        app.playlist_name = "Playlist 0"
+        app.local_playlist_folder = f"{runtime_folder}/Playlist 0"
+        app.prepare_runtime_state()
+
+        if not prepare_sync(app):
+            raise RuntimeError("The mock playlist could not be prepared.")
+
+        # render the template outside the timed part
+        audio_source.get_template(args.quality)
+
+        cpu_started_at = get_cpu_seconds()
+        started_at = time.perf_counter()
+        app.download_handler()
+        wall_seconds = time.perf_counter() - started_at
+        cpu_seconds = get_cpu_seconds() - cpu_started_at
+
+        app.remove_temp_download_folder()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    downloaded = len(app.spotify_tracks_downloaded)
+    return {
+        "settings": vars(args),
+        "cpu_count": os.cpu_count(),
+        "tracks": len(app.spotify_tracks_to_download),
+        "downloaded": downloaded,
+        "failed": len(app.spotify_tracks_failed),
+        "bytes_downloaded": audio_source.bytes_served,
+        "wall_seconds": wall_seconds,
+        "tracks_per_minute": downloaded * 60 / wall_seconds if wall_seconds else None,
+        "cpu_seconds": cpu_seconds,
+        "cpu_utilisation": cpu_seconds / (wall_seconds * (os.cpu_count() or 1)) if wall_seconds else None,
+        "stages": [get_stage_report(stage, wall_seconds) for stage in app.download_pipeline.stages],
+    }
+
+
+def print_report(report):
+    print(
+        f"\n{report['downloaded']}/{report['tracks']} tracks in {report['wall_seconds']:.2f} s "
+        f"({report['tracks_per_minute']:.1f} tracks/min, {report['failed']} failed, "
+        f"{report['bytes_downloaded'] / (1024 * 1024):.1f} MB)")
+    print(
+        f"CPU: {report['cpu_seconds']:.2f} s ({report['cpu_utilisation']:.0%} of {report['cpu_count']} cores)")
+
+    for stage in report["stages"]:
+        seconds_per_job = stage["seconds_per_job"] or 0
+        print(
+            f"  {stage['stage']:<10} {stage['workers']:>2} workers  {stage['jobs']:>5} jobs  "
+            f"{stage['seconds']:8.2f} s  {seconds_per_job * 1000:8.1f} ms/job  {stage['busy']:5.0%} busy")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=50, help="Tracks in the mock playlist")
+    parser.add_argument("--track-seconds", type=float, default=30, help="Length of the generated audio")
+    parser.add_argument("--bandwidth-kbps", type=float, default=0, help="Bandwidth of each stream (0: unthrottled)")
+    parser.add_argument("--first-byte-ms", type=float, default=0, help="Delay before each stream starts")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Share of streams that fail halfway")
+    parser.add_argument("--seed", type=int, default=0, help="Seed deciding which streams fail")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every metadata request")
+    parser.add_argument("--format", choices=["mp3", "m4a", "ogg", "opus"], default="mp3")
+    parser.add_argument("--quality", choices=["normal", "high"], default="high")
+    parser.add_argument("--download-jobs", type=int, default=1)
+    parser.add_argument("--transcode-jobs", type=int, default=0, help="0: one per CPU core")
+    parser.add_argument("--tag-jobs", type=int, default=2)
+    parser.add_argument("--stream-transcode", action="store_true", help="Encode while downloading")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = run_benchmark(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Report written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Time the matching and planning steps on synthetic libraries.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_matching --sizes 1000 10000 --output bench.json
+    python -m benchmarks.bench_matching --compare bench.json
+
+Everything runs offline on generated track dicts. Disposal steps only see paths that do
+not exist, and duplicates are not sent to the trash, so nothing on disk is touched.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import unify
+from benchmarks.synthetic_library import build_library
+from track_matching import TrackMatchIndex, normalize_text, tracks_match
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def create_app(spotify_tracks, local_tracks):
+    app = unify.Unify()
+    app.option_type = "playlist"
+    # shallow copies: the steps below rebuild lists and rewrite 'save_as'
+    app.spotify_tracks_raw = [dict(spotify_track) for spotify_track in spotify_tracks]
+    app.local_tracks_raw = [dict(local_track) for local_track in local_tracks]
+    return app
+
+
+def bench_normalize_text(spotify_tracks, local_tracks):
+    app = create_app(spotify_tracks, ())
+
+    def run():
+        for spotify_track in app.spotify_tracks_raw:
+            normalize_text(spotify_track["title"])
+            normalize_text(spotify_track["artist"])
+            normalize_text(spotify_track["album"])
+
+    return run
+
+
+def bench_get_track_signature(spotify_tracks, local_tracks):
+    app = create_app((), local_tracks)
+
+    def run():
+        for local_track in app.local_tracks_raw:
+            app.get_track_signature(local_track)
+
+    return run
+
+
+def bench_tracks_match(spotify_tracks, local_tracks):
+    pairs = list(zip(spotify_tracks, local_tracks))
+
+    def run():
+        for spotify_track, local_track in pairs:
+            tracks_match(spotify_track, local_track)
+
+    return run
+
+
+def bench_track_match_index(spotify_tracks, local_tracks):
+    def run():
+        spotify_tracks_index = TrackMatchIndex(spotify_tracks)
+        for local_track in local_tracks:
+            spotify_tracks_index.find(local_track)
+
+    return run
+
+
+def bench_app_method(method_name):
+    def bench(spotify_tracks, local_tracks):
+        app = create_app(spotify_tracks, local_tracks)
+        return getattr(app, method_name)
+
+    return bench
+
+
+# run in this order on fresh copies of the library, like a sync would
+STAGES = {
+    "normalize_text": bench_normalize_text,
+    "get_track_signature": bench_get_track_signature,
+    "tracks_match": bench_tracks_match,
+    "track_match_index": bench_track_match_index,
+    "spotify_tracks_remove_duplicate": bench_app_method("spotify_tracks_remove_duplicate"),
+    "spotify_tracks_fix_save_as": bench_app_method("spotify_tracks_fix_save_as"),
+    "local_tracks_delete_unmatched": bench_app_method("local_tracks_delete_unmatched"),
+    "local_tracks_delete_duplicate": bench_app_method("local_tracks_delete_duplicate"),
+    "get_spotify_tracks_to_download": bench_app_method("get_spotify_tracks_to_download"),
+}
+
+
+def measure_stage(bench, spotify_tracks, local_tracks, repeat):
+    timings = []
+
+    for _ in range(repeat):
+        run = bench(spotify_tracks, local_tracks)
+        started_at = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started_at)
+
+    # separate pass, since tracing allocations slows the stage down
+    run = bench(spotify_tracks, local_tracks)
+    tracemalloc.start()
+    run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": statistics.median(timings),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, stage_names, repeat, seed):
+    results = []
+
+    for size in sizes:
+        spotify_tracks, local_tracks = build_library(size, seed)
+        print(f"Library of {size} tracks ({len(local_tracks)} local files)")
+
+        for stage_name in stage_names:
+            result = measure_stage(STAGES[stage_name], spotify_tracks, local_tracks, repeat)
+            result.update({"stage": stage_name, "size": size})
+            results.append(result)
+            print(
+                f"  {stage_name:<32} {result['seconds_min'] * 1000:10.2f} ms  "
+                f"{result['peak_memory_bytes'] / (1024 * 1024):8.2f} MB peak")
+
+    return {
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": get_git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare_reports(baseline, report):
+    baseline_results = {(result["stage"], result["size"]): result for result in baseline["results"]}
+
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for result in report["results"]:
+        baseline_result = baseline_results.get((result["stage"], result["size"]))
+        if not baseline_result or not baseline_result["seconds_min"]:
+            continue
+
+        ratio = result["seconds_min"] / baseline_result["seconds_min"]
+        print(f"  {result['stage']:<32} {result['size']:>7}  {ratio:6.2f}x time")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Library sizes (Spotify tracks) to benchmark")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES),
+                        help="Stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic library")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # local_tracks_delete_duplicate trashes every duplicate it finds without checking the path
+    unify.send2trash = lambda path: None
+    report = run_benchmarks(args.sizes, args.stages, max(1, args.repeat), args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            compare_reports(json.load(baseline_file), report)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Local stand-in for librespot's content feeder, for download pipeline benchmarks.
+
+FakeAudioSource serves real Ogg Vorbis: pink noise rendered once per quality with
+ffmpeg, which encodes close to the nominal bitrate like music does. The transcode and
+tag stages therefore do the same work as on a Spotify download. Each stream can be throttled to a bandwidth, delayed before its first byte, and made to
+fail halfway through. Whether a track fails depends only on the seed and its track ID,
+so reruns fail the same tracks.
+"""
+import random
+import subprocess
+import threading
+import time
+
+# Spotify's Ogg Vorbis bitrates for the qualities Unify downloads
+QUALITY_BITRATES = {
+    "normal": "96k",
+    "high": "160k",
+}
+
+
+class FakeAudioSourceError(IOError):
+    pass
+
+
+def render_ogg_vorbis(seconds, bitrate):
+    command = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.2:sample_rate=44100:duration={seconds}",
+        "-ac", "2", "-c:a", "libvorbis", "-b:a", bitrate,
+        "-f", "ogg", "pipe:1",
+    ]
+    result = subprocess.run(command, capture_output=True)
+
+    if result.returncode != 0 or not result.stdout:
+        raise RuntimeError(
+            f"ffmpeg could not render a test stream: {result.stderr.decode(errors='replace').strip()}")
+
+    return result.stdout
+
+
+class ThrottledReader:
+    """Reads bytes no faster than bandwidth bytes/second and raises once fail_at bytes were read."""
+
+    def __init__(self, data, bandwidth=None, fail_at=None, on_read=None):
+        self.data = data
+        self.bandwidth = bandwidth
+        self.fail_at = fail_at
+        self.on_read = on_read
+        self.position = 0
+        self.started_at = time.perf_counter()
+
+    def read(self, size):
+        if self.fail_at is not None and self.position >= self.fail_at:
+            raise FakeAudioSourceError("Simulated stream failure")
+
+        end = len(self.data) if self.fail_at is None else self.fail_at
+        chunk = self.data[self.position:min(self.position + size, end)]
+        self.position += len(chunk)
+
+        if self.bandwidth:
+            # sleep until the bytes read so far would have arrived at this bandwidth
+            delay = self.started_at + self.position / self.bandwidth - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        if self.on_read and chunk:
+            self.on_read(len(chunk))
+
+        return chunk
+
+
+class FakeAudioSource:
+    """Audio source serving generated Ogg Vorbis streams; see audio_source.LibrespotAudioSource."""
+
+    def __init__(self, seconds=30, bandwidth=None, first_byte_delay=0.0, failure_rate=0.0, seed=0):
+        self.seconds = seconds
+        # bytes per second of every stream; None is unthrottled
+        self.bandwidth = bandwidth
+        self.first_byte_delay = first_byte_delay
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.templates = {}
+        self.lock = threading.Lock()
+        self.streams_opened = 0
+        self.streams_failing = 0
+        self.bytes_served = 0
+
+    def get_template(self, quality):
+        # rendered under the lock, so parallel download workers share one ffmpeg run
+        with self.lock:
+            if quality not in self.templates:
+                self.templates[quality] = render_ogg_vorbis(self.seconds, QUALITY_BITRATES[quality])
+
+            return self.templates[quality]
+
+    def count_bytes(self, byte_count):
+        with self.lock:
+            self.bytes_served += byte_count
+
+    def open(self, track_id, quality):
+        data = self.get_template(quality)
+        fails = random.Random(f"{self.seed}:{track_id}").random() < self.failure_rate
+
+        with self.lock:
+            self.streams_opened += 1
+            self.streams_failing += fails
+
+        if self.first_byte_delay:
+            time.sleep(self.first_byte_delay)
+
+        reader = ThrottledReader(
+            data, self.bandwidth, fail_at=len(data) // 2 if fails else None, on_read=self.count_bytes)
+        return len(data), reader
@@ -0,0 +1,224 @@
+"""Sync a mock Spotify library end to end and report fetch throughput, retries and wall time.
+
+Starts benchmarks.mock_spotify in-process and points a Unify app at it, then runs:
+
+    liked_fetch       Liked Songs fetched through get_spotify_tracks_raw (liked_full)
+    playlist_names    every playlist name resolved with prefetch_playlist_names
+    playlist_prepare  every playlist fetched, scanned and reconciled like a multi-playlist sync
+    metadata          genres, lyrics and covers for every queued track, with tag_jobs workers
+
+Audio is not part of the mock (librespot speaks its own protocol), so downloads stop at
+the queue. Run from the repository root, e.g.:
+
+    python -m benchmarks.load_scenario --liked 100000 --playlists 300 --rate-limit-every 50 --output load.json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+
+import unify
+from benchmarks.mock_spotify import add_mock_server_arguments, create_mock_server_from_args, get_mock_playlist_id
+from download_pipeline import DownloadJob, DownloadPipeline, PipelineStage
+from main import prepare_playlist_apps
+
+
+class StaticTokenAuthManager:
+    """Stands in for SpotifyOAuth; the mock server accepts any bearer token."""
+
+    token_info = {"access_token": "mock-token", "token_type": "Bearer", "expires_at": 2 ** 31}
+
+    def get_cached_token(self):
+        return self.token_info
+
+    def validate_token(self, token_info):
+        return token_info
+
+    def get_access_token(self, *args, as_dict=True, **kwargs):
+        return self.token_info if as_dict else self.token_info["access_token"]
+
+    def refresh_access_token(self, refresh_token):
+        return self.token_info
+
+
+class MockUnify(unify.Unify):
+    def __init__(self, runtime_folder):
+        self.runtime_folder = runtime_folder
+        super().__init__()
+
+    def get_runtime_base_folder(self):
+        return self.runtime_folder
+
+    def create_spotipy_auth_manager(self):
+        return StaticTokenAuthManager()
+
+    def update_window_title(self, title):
+        return
+
+
+def create_app(server, runtime_folder, config_overrides):
+    app = MockUnify(runtime_folder)
+    app.config.update(config_overrides)
+    app.config["spotify_api_url"] = f"{server.url}/v1"
+    app.config["spotify_client_url"] = server.url
+    app.config["temp_download_folder"] = f"{runtime_folder}/temp"
+    app.create_spotipy_session(verbose=False)
+    app.init_progress_bars()
+    return app
+
+
+class PhaseTimer:
+    def __init__(self, server):
+        self.server = server
+        self.phases = []
+
+    def run(self, name, action):
+        stats_before = self.server.get_stats()
+        started_at = time.perf_counter()
+        items = action()
+        seconds = time.perf_counter() - started_at
+        stats_after = self.server.get_stats()
+
+        requests = stats_after["total_requests"] - stats_before["total_requests"]
+        rate_limited = stats_after["total_rate_limited"] - stats_before["total_rate_limited"]
+        phase = {
+            "phase": name,
+            "seconds": seconds,
+            "items": items,
+            "items_per_second": items / seconds if seconds else None,
+            "requests": requests,
+            "requests_per_second": requests / seconds if seconds else None,
+            "rate_limited": rate_limited,
+        }
+        self.phases.append(phase)
+
+        print(
+            f"  {name:<18} {seconds:8.2f} s  {items:>7} items  {requests:>6} requests "
+            f"({rate_limited} answered 429)")
+        return phase
+
+
+def run_liked_fetch(app, runtime_folder):
+    app.option_type = "liked_full"
+    app.local_playlist_folder = f"{runtime_folder}/Liked Songs"
+    app.reset_sync_collections()
+    app.prepare_runtime_state()
+
+    if not app.get_spotify_tracks_raw():
+        raise RuntimeError("Fetching Liked Songs from the mock server failed.")
+
+    return len(app.spotify_tracks_raw)
+
+
+def run_playlist_names(app, playlist_jobs):
+    app.prefetch_playlist_names(playlist_jobs)
+
+    for playlist_job in playlist_jobs:
+        if not playlist_job["name"]:
+            raise RuntimeError(f"Could not resolve the name of {playlist_job['id']}.")
+
+    return len(playlist_jobs)
+
+
+def run_playlist_prepare(app, runtime_folder, playlist_jobs):
+    app.option_type = "playlist"
+    app.local_playlist_folder = f"{runtime_folder}/Playlists"
+    app.reset_sync_collections()
+    app.prepare_runtime_state()
+
+    playlist_apps, prepared = prepare_playlist_apps(app, playlist_jobs)
+    if not all(prepared):
+        raise RuntimeError("Some playlists could not be prepared.")
+
+    app.queue_playlist_downloads(playlist_apps)
+    return len(app.spotify_tracks_raw)
+
+
+def run_metadata(app):
+    app.prefetch_artist_genres()
+    app.get_http_session()
+    app.get_lyrics_cache()
+    app.get_cover_cache()
+
+    def fetch_metadata(job, worker_index):
+        job.metadata_progress_id = app.metadata_progress_ids['tag'][worker_index]
+        app.fetch_genres(job)
+        app.fetch_lyrics(job)
+        app.fetch_cover_art(job.spotify_track['image_url'])
+
+    pipeline = DownloadPipeline([PipelineStage("metadata", fetch_metadata, app.get_stage_workers('tag_jobs'))])
+    pipeline.run(DownloadJob(spotify_track) for spotify_track in app.spotify_tracks_to_download)
+    app.save_caches()
+
+    return len(app.spotify_tracks_to_download)
+
+
+def run_scenario(args):
+    server = create_mock_server_from_args(args).start()
+    runtime_folder = tempfile.mkdtemp(prefix="unify-load-")
+    config_overrides = {
+        "fetch_concurrency": args.fetch_concurrency,
+        "tag_jobs": args.tag_jobs,
+        "retry_attempts": args.retry_attempts,
+    }
+
+    print(f"Mock Spotify at {server.url}, runtime files in {runtime_folder}")
+    timer = PhaseTimer(server)
+    started_at = time.perf_counter()
+
+    try:
+        app = create_app(server, runtime_folder, config_overrides)
+        playlist_jobs = [
+            {"url": f"https://open.spotify.com/playlist/{get_mock_playlist_id(index)}",
+             "id": get_mock_playlist_id(index), "name": None}
+            for index in range(args.playlists)
+        ]
+
+        if args.liked:
+            timer.run("liked_fetch", lambda: run_liked_fetch(app, runtime_folder))
+        if playlist_jobs:
+            timer.run("playlist_names", lambda: run_playlist_names(app, playlist_jobs))
+            timer.run("playlist_prepare", lambda: run_playlist_prepare(app, runtime_folder, playlist_jobs))
+            timer.run("metadata", lambda: run_metadata(app))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    wall_seconds = time.perf_counter() - started_at
+    print(f"  {'total':<18} {wall_seconds:8.2f} s")
+
+    return {
+        "settings": vars(args),
+        "phases": timer.phases,
+        "wall_seconds": wall_seconds,
+        "server": server.get_stats(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    add_mock_server_arguments(parser)
+    parser.add_argument("--fetch-concurrency", type=int, default=4)
+    parser.add_argument("--tag-jobs", type=int, default=4)
+    parser.add_argument("--retry-attempts", type=int, default=3)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = run_scenario(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Report written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
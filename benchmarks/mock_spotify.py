@@ -0,0 +1,395 @@
+"""Local stand-in for the Spotify endpoints Unify uses, for offline load testing.
+
+Serves a deterministic library of generated tracks:
+
+    /v1/me/tracks                    Liked Songs, newest first
+    /v1/playlists/{id}               playlist name and snapshot_id
+    /v1/playlists/{id}/tracks        playlist items
+    /v1/tracks/{id}, /v1/tracks/?ids=
+    /v1/artists/{id}, /v1/artists/?ids=
+    /color-lyrics/v2/track/{id}      lyrics (every 5th track has none and answers 404)
+    /image/{album_id}-{width}        album covers
+    /stats                           request counters
+
+Requests can be slowed down by a fixed latency, and every Nth API or lyrics request can be
+answered with a 429 and a Retry-After header.
+
+    python -m benchmarks.mock_spotify --liked 100000 --playlists 300 --rate-limit-every 50
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+PLAYLIST_ID_PREFIX = "mockplaylist"
+TRACKS_PER_ALBUM = 10
+TRACKS_PER_ARTIST = 25
+GENRES = ["rock", "pop", "indie pop", "j-pop", "k-pop", "synthwave", "jazz", "hip hop", "metal", "folk"]
+IMAGE_WIDTHS = (64, 300, 640)
+
+# smallest valid JPEG (1x1, grey), enough for taggers that embed cover bytes as-is
+COVER_JPEG = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912"
+    "130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b080001"
+    "000101011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b51000020103"
+    "03020403050504040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f024336272"
+    "82090a161718191a25262728292a3435363738393a434445464748494a535455565758595a636465666768696a737475"
+    "767778797a838485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6c7c8c9"
+    "cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3ffd9"
+)
+
+
+def get_mock_track_id(index):
+    return f"mocktrack{index:013d}"
+
+
+def get_mock_playlist_id(index):
+    return f"{PLAYLIST_ID_PREFIX}{index:010d}"
+
+
+class MockLibrary:
+    """Generated catalog; tracks are built on request, so a 100k library costs no memory.
+
+    Playlist p holds playlist_size consecutive catalog tracks starting at p * playlist_size / 2,
+    so neighbouring playlists share half of their tracks.
+    """
+
+    def __init__(self, liked_count=1000, playlist_count=10, playlist_size=100, version=1):
+        self.liked_count = liked_count
+        self.playlist_count = playlist_count
+        self.playlist_size = playlist_size
+        self.catalog_size = max(liked_count, playlist_size, 1)
+        # bump to change every playlist's snapshot_id
+        self.version = version
+
+    def get_track_index(self, track_id):
+        if not track_id.startswith("mocktrack"):
+            return None
+
+        try:
+            index = int(track_id[len("mocktrack"):])
+        except ValueError:
+            return None
+
+        return index if 0 <= index < self.catalog_size else None
+
+    def build_track(self, index, base_url):
+        album_index = index // TRACKS_PER_ALBUM
+        artist_index = index // TRACKS_PER_ARTIST
+        track_id = get_mock_track_id(index)
+
+        return {
+            "id": track_id,
+            "uri": f"spotify:track:{track_id}",
+            "name": f"Track {index}",
+            "artists": [{"id": f"mockartist{artist_index:012d}", "name": f"Artist {artist_index}"}],
+            "album": {
+                "name": f"Album {album_index}",
+                "artists": [{"id": f"mockartist{artist_index:012d}", "name": f"Artist {artist_index}"}],
+                "total_tracks": TRACKS_PER_ALBUM,
+                "release_date": f"{1970 + album_index % 55}-01-01",
+                "images": [
+                    {"url": f"{base_url}/image/{album_index}-{width}", "width": width, "height": width}
+                    for width in IMAGE_WIDTHS
+                ],
+            },
+            "disc_number": 1,
+            "track_number": index % TRACKS_PER_ALBUM + 1,
+            "duration_ms": 120_000 + (index * 7919) % 240_000,
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+            "is_local": False,
+            "is_playable": True,
+        }
+
+    def build_artist(self, artist_id):
+        artist_index = int(artist_id[len("mockartist"):])
+        return {
+            "id": artist_id,
+            "name": f"Artist {artist_index}",
+            "genres": [GENRES[artist_index % len(GENRES)], GENRES[(artist_index * 3 + 1) % len(GENRES)]],
+        }
+
+    def get_playlist_track_indexes(self, playlist_index):
+        start = playlist_index * self.playlist_size // 2
+        return [(start + position) % self.catalog_size for position in range(self.playlist_size)]
+
+    def get_added_at(self, position):
+        # newest first, one minute apart
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1_700_000_000 - position * 60))
+
+
+class MockSpotifyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, library, host="127.0.0.1", port=0, latency=0.0, page_size=50,
+                 rate_limit_every=0, retry_after=1):
+        super().__init__((host, port), MockSpotifyHandler)
+        self.library = library
+        self.latency = latency
+        self.page_size = page_size
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.request_counts = Counter()
+        self.rate_limited_counts = Counter()
+        self.limited_requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "requests": dict(self.request_counts),
+                "rate_limited": dict(self.rate_limited_counts),
+                "total_requests": sum(self.request_counts.values()),
+                "total_rate_limited": sum(self.rate_limited_counts.values()),
+            }
+
+    def should_rate_limit(self, endpoint):
+        with self.lock:
+            self.request_counts[endpoint] += 1
+            if endpoint in {"image", "stats"} or not self.rate_limit_every:
+                return False
+
+            self.limited_requests += 1
+            if self.limited_requests % self.rate_limit_every:
+                return False
+
+            self.rate_limited_counts[endpoint] += 1
+            return True
+
+    def handle_error(self, request, client_address):
+        # clients dropping keep-alive connections are not worth a traceback
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def start(self):
+        """Serve from a daemon thread and return the server."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class MockSpotifyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; with Nagle on, keep-alive clients wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        return
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path_parts = [part for part in url.path.split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        endpoint, handler = self.route(path_parts)
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.server.should_rate_limit(endpoint):
+            self.send_json(
+                {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                status=429,
+                headers={"Retry-After": str(self.server.retry_after)},
+            )
+            return
+
+        if handler is None:
+            self.send_json({"error": {"status": 404, "message": "Service not found"}}, status=404)
+            return
+
+        handler(path_parts, query)
+
+    def route(self, path_parts):
+        if path_parts[:2] == ["v1", "me"] and path_parts[2:] == ["tracks"]:
+            return "me/tracks", self.handle_liked_tracks
+        if path_parts[:2] == ["v1", "playlists"] and len(path_parts) == 4 and path_parts[3] == "tracks":
+            return "playlists/tracks", self.handle_playlist_tracks
+        if path_parts[:2] == ["v1", "playlists"] and len(path_parts) == 3:
+            return "playlists", self.handle_playlist
+        if path_parts[:2] == ["v1", "tracks"]:
+            return "tracks", self.handle_tracks
+        if path_parts[:2] == ["v1", "artists"]:
+            return "artists", self.handle_artists
+        if path_parts[:3] == ["color-lyrics", "v2", "track"] and len(path_parts) == 4:
+            return "color-lyrics", self.handle_lyrics
+        if path_parts[:1] == ["image"] and len(path_parts) == 2:
+            return "image", self.handle_image
+        if path_parts == ["stats"]:
+            return "stats", lambda path_parts, query: self.send_json(self.server.get_stats())
+        return "unknown", None
+
+    def get_base_url(self):
+        return f"http://{self.headers.get('Host') or '%s:%s' % self.server.server_address[:2]}"
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_page(self, track_indexes, query, path):
+        library = self.server.library
+        base_url = self.get_base_url()
+        total = len(track_indexes)
+        offset = max(0, int(query.get("offset", 0)))
+        limit = min(max(1, int(query.get("limit", 20))), self.server.page_size)
+        page_indexes = track_indexes[offset:offset + limit]
+
+        def page_url(page_offset):
+            return f"{base_url}{path}?{urlencode({'offset': page_offset, 'limit': limit})}"
+
+        self.send_json({
+            "href": page_url(offset),
+            "items": [
+                {"added_at": library.get_added_at(offset + position), "track": library.build_track(index, base_url)}
+                for position, index in enumerate(page_indexes)
+            ],
+            "limit": limit,
+            "offset": offset,
+            "total": total,
+            "next": page_url(offset + limit) if offset + limit < total else None,
+            "previous": page_url(max(0, offset - limit)) if offset else None,
+        })
+
+    def get_playlist_index(self, playlist_id):
+        try:
+            playlist_index = int(playlist_id[len(PLAYLIST_ID_PREFIX):])
+        except ValueError:
+            return None
+
+        if not playlist_id.startswith(PLAYLIST_ID_PREFIX) or not 0 <= playlist_index < self.server.library.playlist_count:
+            return None
+
+        return playlist_index
+
+    def handle_liked_tracks(self, path_parts, query):
+        self.send_page(range(self.server.library.liked_count), query, "/v1/me/tracks")
+
+    def handle_playlist(self, path_parts, query):
+        playlist_index = self.get_playlist_index(path_parts[2])
+        if playlist_index is None:
+            self.send_json({"error": {"status": 404, "message": "Not found."}}, status=404)
+            return
+
+        self.send_json({
+            "id": path_parts[2],
+            "name": f"Playlist {playlist_index}",
+            "snapshot_id": f"snapshot-{playlist_index}-{self.server.library.version}",
+        })
+
+    def handle_playlist_tracks(self, path_parts, query):
+        playlist_index = self.get_playlist_index(path_parts[2])
+        if playlist_index is None:
+            self.send_json({"error": {"status": 404, "message": "Not found."}}, status=404)
+            return
+
+        self.send_page(
+            self.server.library.get_playlist_track_indexes(playlist_index), query, f"/v1/playlists/{path_parts[2]}/tracks")
+
+    def handle_tracks(self, path_parts, query):
+        library = self.server.library
+        base_url = self.get_base_url()
+        track_ids = query["ids"].split(",") if "ids" in query else path_parts[2:3]
+        indexes = [library.get_track_index(track_id) for track_id in track_ids]
+
+        if "ids" in query:
+            self.send_json({"tracks": [
+                library.build_track(index, base_url) if index is not None else None for index in indexes
+            ]})
+        elif indexes and indexes[0] is not None:
+            self.send_json(library.build_track(indexes[0], base_url))
+        else:
+            self.send_json({"error": {"status": 400, "message": "invalid id"}}, status=400)
+
+    def handle_artists(self, path_parts, query):
+        library = self.server.library
+
+        if "ids" in query:
+            self.send_json({"artists": [library.build_artist(artist_id) for artist_id in query["ids"].split(",")]})
+        elif len(path_parts) > 2:
+            self.send_json(library.build_artist(path_parts[2]))
+        else:
+            self.send_json({"error": {"status": 400, "message": "invalid id"}}, status=400)
+
+    def handle_lyrics(self, path_parts, query):
+        index = self.server.library.get_track_index(path_parts[3])
+
+        if index is None or index % 5 == 0:
+            self.send_json({"error": {"status": 404, "message": "lyrics not found"}}, status=404)
+            return
+
+        self.send_json({
+            "lyrics": {
+                "syncType": "LINE_SYNCED",
+                "lines": [
+                    {"startTimeMs": str(line * 4000), "words": f"Line {line} of track {index}"}
+                    for line in range(8)
+                ],
+            }
+        })
+
+    def handle_image(self, path_parts, query):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(COVER_JPEG)))
+        self.end_headers()
+        self.wfile.write(COVER_JPEG)
+
+
+def create_mock_server_from_args(args):
+    library = MockLibrary(args.liked, args.playlists, args.playlist_size)
+    return MockSpotifyServer(
+        library,
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000,
+        page_size=args.page_size,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+    )
+
+
+def add_mock_server_arguments(parser):
+    parser.add_argument("--liked", type=int, default=1000, help="Liked Songs in the mock library")
+    parser.add_argument("--playlists", type=int, default=10, help="Playlists in the mock library")
+    parser.add_argument("--playlist-size", type=int, default=100, help="Tracks per playlist")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every request")
+    parser.add_argument("--page-size", type=int, default=50, help="Largest page the server returns")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Answer every Nth API/lyrics request with 429 (0 disables)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Spotify Web API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = create_mock_server_from_args(args)
+    print(f"Mock Spotify listening on {server.url} (spotify_api_url: {server.url}/v1, spotify_client_url: {server.url})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import random
+import string
+
+# words mixing plain ASCII with accents, CJK, Cyrillic, curly quotes, dashes and full-width
+# forms, so normalize_text has the same work to do as on a real library
+TITLE_WORDS = [
+    "Love", "Night", "Dancing", "Queen", "Heart", "Summer", "Rain", "Fire", "Dream", "Home",
+    "Café", "Señorita", "Déjà", "Vu", "Über", "Ångström", "Noël", "São", "Paulo", "Ølstykke",
+    "夜", "東京", "サクラ", "사랑", "Любовь", "Ночь", "Ελπίδα", "שלום", "حب",
+    "Don’t", "It’s", "‘Round", "Live – Remastered", "Edit — Radio",
+    "ＦＵＬＬ", "Ｗｉｄｔｈ", "ﬁre", "Ⅻ",
+]
+ARTIST_WORDS = [
+    "The", "Beatles", "Björk", "Sigur", "Rós", "Beyoncé", "Motörhead", "Mötley", "Crüe",
+    "宇多田", "ヒカル", "BTS", "Кино", "Ελένη", "Røyksopp", "Daft", "Punk", "Queen", "Abba",
+]
+ALBUM_WORDS = ["Greatest", "Hits", "Live", "Deluxe", "Édition", "Remastered", "Vol.", "夏", "Ⅱ", "Unplugged"]
+
+DUPLICATE_RATE = 0.05
+RELINK_RATE = 0.05
+SAME_TITLE_RATE = 0.1
+
+
+def random_words(rng, words, count_range):
+    words = rng.choices(words, k=rng.randint(*count_range))
+    text = " ".join(words)
+
+    # stray whitespace as found in hand-edited tags
+    if rng.random() < 0.1:
+        text = f"  {text.replace(' ', '  ', 1)} "
+
+    return text
+
+
+def random_track_id(rng):
+    return "".join(rng.choices(string.ascii_letters + string.digits, k=22))
+
+
+def build_spotify_track(rng, index, title=None):
+    track_id = random_track_id(rng)
+    linked_from_id = random_track_id(rng) if rng.random() < RELINK_RATE else None
+    match_track_ids = {track_id} | ({linked_from_id} if linked_from_id else set())
+    artist = ", ".join(random_words(rng, ARTIST_WORDS, (1, 3)) for _ in range(rng.randint(1, 2)))
+
+    return {
+        "title": title or f"{random_words(rng, TITLE_WORDS, (1, 5))} {index}",
+        "artist": artist,
+        "album": random_words(rng, ALBUM_WORDS, (1, 3)),
+        "albumartist": artist.split(", ")[0],
+        "total_discs": 1,
+        "disc_number": 1,
+        "total_tracks": 12,
+        "track_number": rng.randint(1, 12),
+        "release_date": f"{rng.randint(1960, 2024)}-01-01",
+        "added_at": f"20{rng.randint(10, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+        "duration": rng.randint(90_000, 420_000),
+        "image_url": f"https://i.scdn.co/image/{track_id}",
+        "track_url": f"https://open.spotify.com/track/{track_id}",
+        "track_uri": f"spotify:track:{track_id}",
+        "track_id": track_id,
+        "linked_from_id": linked_from_id,
+        "linked_from_uri": f"spotify:track:{linked_from_id}" if linked_from_id else None,
+        "match_track_ids": match_track_ids,
+        "match_track_uris": {f"spotify:track:{alias}" for alias in match_track_ids},
+        "artist_ids": [random_track_id(rng)],
+        "is_local": False,
+        "is_playable": rng.random() > 0.02,
+        "save_as": "",
+    }
+
+
+def build_local_track(rng, spotify_track, folder):
+    # relinked tracks are tagged with the ID they had when they were downloaded
+    track_id = spotify_track["linked_from_id"] or spotify_track["track_id"]
+    track_uri = f"spotify:track:{track_id}"
+    file_name = spotify_track["title"].strip()
+
+    return {
+        "title": spotify_track["title"],
+        "artist": spotify_track["artist"],
+        "album": spotify_track["album"],
+        "track_uri": track_uri,
+        "track_id": track_id,
+        "match_track_ids": {track_id},
+        "match_track_uris": {track_uri},
+        "duration": spotify_track["duration"] + rng.randint(-1500, 1500),
+        "file_path": f"{folder}/{file_name}.mp3",
+        "file_dir": folder,
+        "file_name": file_name,
+        "file_extension": "mp3",
+    }
+
+
+def build_library(size, seed=0, folder="/nonexistent/unify-benchmark"):
+    """Return (spotify_tracks, local_tracks) with duplicates, relinked IDs and shared titles.
+
+    About 80% of the Spotify tracks are already downloaded, the local side also has files
+    no longer in the playlist and duplicate copies of some tracks. Paths never exist, so
+    disposal code paths skip the file system.
+    """
+    rng = random.Random(seed)
+    spotify_tracks = []
+
+    for index in range(size):
+        if spotify_tracks and rng.random() < DUPLICATE_RATE:
+            spotify_tracks.append(dict(rng.choice(spotify_tracks)))
+        elif spotify_tracks and rng.random() < SAME_TITLE_RATE:
+            spotify_tracks.append(build_spotify_track(rng, index, title=rng.choice(spotify_tracks)["title"]))
+        else:
+            spotify_tracks.append(build_spotify_track(rng, index))
+
+    local_tracks = [
+        build_local_track(rng, spotify_track, folder)
+        for spotify_track in spotify_tracks
+        if rng.random() < 0.8
+    ]
+    local_tracks.extend(
+        build_local_track(rng, build_spotify_track(rng, size + index), folder)
+        for index in range(size // 10)
+    )
+    local_tracks.extend(dict(rng.choice(local_tracks)) for _ in range(size // 50))
+    rng.shuffle(local_tracks)
+
+    return spotify_tracks, local_tracks
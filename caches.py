@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_VERSION = 1
+# covers fetched at the same time wait on one of this many locks, picked by URL hash
+COVER_FETCH_LOCK_COUNT = 64
+
+
+class PersistentCache:
+    """JSON-backed key -> value cache with a TTL and LRU eviction.
+
+    Entries older than ttl_seconds are treated as missing; once more than max_entries are
+    stored, or their sizes add up to more than max_size, the least recently used ones are
+    dropped and passed to on_evict. None values are never stored, so a None from get()
+    always means "not cached".
+    """
+
+    def __init__(self, cache_path, ttl_seconds=None, max_entries=None, max_size=None, on_evict=None):
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self.entries = OrderedDict()
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        # shared by the download pipeline's worker threads
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.entries = OrderedDict()
+
+        if os.path.isfile(self.cache_path):
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as cache_file:
+                    loaded_cache = json.load(cache_file)
+
+                if loaded_cache.get("version") == CACHE_VERSION:
+                    self.entries = OrderedDict(loaded_cache.get("entries", {}))
+            except Exception:
+                self.entries = OrderedDict()
+
+        self.total_size = sum(entry.get("size", 0) for entry in self.entries.values())
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+
+            payload = {
+                "version": CACHE_VERSION,
+                "entries": self.entries,
+            }
+
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+
+            temp_cache_path = f"{self.cache_path}.tmp"
+            with open(temp_cache_path, "w", encoding="utf-8") as cache_file:
+                json.dump(payload, cache_file)
+
+            os.replace(temp_cache_path, self.cache_path)
+            self.dirty = False
+
+    def is_expired(self, entry):
+        ttl_seconds = entry.get("ttl", self.ttl_seconds)
+        return ttl_seconds is not None and time.time() - entry["fetched_at"] > ttl_seconds
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and self.is_expired(entry):
+                self.remove_entry(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry["value"]
+
+    def put(self, key, value, size=None, ttl_seconds=None):
+        """Store value; size counts towards max_size, ttl_seconds overrides the cache's TTL."""
+        if value is None:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.remove_entry(key, evicted=False)
+
+            entry = {
+                "value": value,
+                "fetched_at": time.time(),
+            }
+            if size is not None:
+                entry["size"] = size
+                self.total_size += size
+            if ttl_seconds is not None:
+                entry["ttl"] = ttl_seconds
+
+            self.entries[key] = entry
+
+            while self.entries and (
+                (self.max_entries is not None and len(self.entries) > self.max_entries) or
+                (self.max_size is not None and self.total_size > self.max_size)
+            ):
+                self.remove_entry(next(iter(self.entries)))
+
+            self.dirty = True
+
+    def remove_entry(self, key, evicted=True):
+        entry = self.entries.pop(key)
+        self.total_size -= entry.get("size", 0)
+        self.dirty = True
+
+        if evicted and self.on_evict:
+            self.on_evict(key, entry["value"])
+
+    def get_hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class CoverArtCache:
+    """Album covers by image URL, in memory for this run and on disk for later runs.
+
+    Cover files are named after a hash of their URL and listed, with their content type,
+    in a PersistentCache index whose max_size bounds the bytes kept on disk. Concurrent
+    requests for the same cover wait for a single fetch.
+    """
+
+    def __init__(self, cache_folder, max_bytes=None, max_memory_bytes=64 * 1024 * 1024):
+        self.cache_folder = cache_folder
+        self.index = PersistentCache(
+            os.path.join(cache_folder, "index.json"),
+            max_size=max_bytes,
+            on_evict=self.remove_cover_file,
+        )
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.max_memory_bytes = max_memory_bytes
+        self.lookups = 0
+        self.hits = 0
+        self.fetches = 0
+        self.lock = threading.Lock()
+        self.fetch_locks = [threading.Lock() for _ in range(COVER_FETCH_LOCK_COUNT)]
+
+    def load(self):
+        self.index.load()
+
+    def save(self):
+        self.index.save()
+
+    def get_cover_file_path(self, file_name):
+        return os.path.join(self.cache_folder, file_name)
+
+    def remove_cover_file(self, image_url, cover_entry):
+        try:
+            os.remove(self.get_cover_file_path(cover_entry["file_name"]))
+        except OSError:
+            pass
+
+    def get_or_fetch(self, image_url, fetch_cover):
+        """Return (cover_bytes, content_type), calling fetch_cover(image_url) on a miss."""
+        with self.lock:
+            self.lookups += 1
+
+        # two URLs sharing a lock only means one fetch waits for the other
+        with self.fetch_locks[hash(image_url) % COVER_FETCH_LOCK_COUNT]:
+            cover = self.get(image_url)
+            if cover is None:
+                cover = fetch_cover(image_url)
+                self.fetches += 1
+                self.put(image_url, *cover)
+
+            return cover
+
+    def get(self, image_url):
+        with self.lock:
+            cover = self.memory.get(image_url)
+            if cover is not None:
+                self.memory.move_to_end(image_url)
+                self.hits += 1
+                return cover
+
+        cover_entry = self.index.get(image_url)
+        if cover_entry is None:
+            return None
+
+        try:
+            with open(self.get_cover_file_path(cover_entry["file_name"]), "rb") as cover_file:
+                cover = (cover_file.read(), cover_entry["content_type"])
+        except OSError:
+            return None
+
+        self.remember(image_url, cover)
+        with self.lock:
+            self.hits += 1
+        return cover
+
+    def put(self, image_url, cover_bytes, content_type):
+        file_name = hashlib.sha1(image_url.encode("utf-8")).hexdigest()
+        cover_path = self.get_cover_file_path(file_name)
+
+        os.makedirs(self.cache_folder, exist_ok=True)
+        temp_cover_path = f"{cover_path}.{threading.get_ident()}.tmp"
+        with open(temp_cover_path, "wb") as cover_file:
+            cover_file.write(cover_bytes)
+        os.replace(temp_cover_path, cover_path)
+
+        self.index.put(
+            image_url,
+            {"file_name": file_name, "content_type": content_type},
+            size=len(cover_bytes),
+        )
+        self.remember(image_url, (cover_bytes, content_type))
+
+    def remember(self, image_url, cover):
+        with self.lock:
+            if image_url in self.memory:
+                return
+
+            self.memory[image_url] = cover
+            self.memory_bytes += len(cover[0])
+
+            while self.memory_bytes > self.max_memory_bytes and len(self.memory) > 1:
+                _, (evicted_bytes, _) = self.memory.popitem(last=False)
+                self.memory_bytes -= len(evicted_bytes)
@@ -122,6 +122,77 @@ def parse_args():
         type=int,
         help="Number of retry attempts for failed requests",
     )
+    parser.add_argument(
+        "--fetch-concurrency",
+        type=int,
+        help="Number of playlist/Liked Songs pages requested from Spotify at the same time (1 pages serially)",
+    )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        help="Number of threads used to list folders and read tags when scanning local tracks (1 scans serially)",
+    )
+    parser.add_argument(
+        "--full-rescan",
+        action="store_true",
+        default=None,
+        help="Re-list every local folder and re-read every file's tags instead of reusing the library index",
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="download_jobs",
+        type=int,
+        help="Number of tracks downloaded at the same time",
+    )
+    parser.add_argument(
+        "--transcode-jobs",
+        type=int,
+        help="Number of tracks transcoded at the same time",
+    )
+    parser.add_argument(
+        "--transcode-priority",
+        choices=["normal", "low", "idle"],
+        help="CPU priority of ffmpeg transcodes",
+    )
+    parser.add_argument(
+        "--transcode-threads",
+        type=int,
+        help="Threads ffmpeg may use for each transcode (passed as -threads)",
+    )
+    parser.add_argument(
+        "--transcode-queue-size",
+        type=int,
+        help="Number of downloaded tracks that may wait for a free transcode job",
+    )
+    parser.add_argument(
+        "--stream-transcode",
+        action="store_true",
+        default=None,
+        help="Pipe the audio stream into ffmpeg while it downloads instead of writing a temp .ogg file first",
+    )
+    parser.add_argument(
+        "--tag-jobs",
+        type=int,
+        help="Number of tracks that fetch genres/lyrics and get tagged at the same time",
+    )
+    parser.add_argument(
+        "--content-store",
+        action="store_true",
+        default=None,
+        help="Keep one stored copy of each downloaded track and hardlink it into every folder that needs it",
+    )
+    parser.add_argument(
+        "--content-store-folder",
+        help="Folder for the content store (best on the same drive as the destination folders)",
+    )
+    parser.add_argument(
+        "--metrics-report",
+        help="Write wall time, calls, items and bytes of every sync stage and request kind to this JSON file",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        help="Prometheus textfile (.prom) for node-exporter's textfile collector, rewritten after each playlist and at the end",
+    )
     parser.add_argument(
         "--config-path",
         help="Optional path to a JSON config file with saved runtime settings",
@@ -152,6 +223,9 @@ def parse_args():
     args.config_path = normalize_cli_path(args.config_path)
     args.archive_folder = normalize_cli_path(args.archive_folder)
     args.temp_download_folder = normalize_cli_path(args.temp_download_folder)
+    args.content_store_folder = normalize_cli_path(args.content_store_folder)
+    args.metrics_report = normalize_cli_path(args.metrics_report)
+    args.metrics_textfile = normalize_cli_path(args.metrics_textfile)
 
     return args
 
@@ -211,13 +285,36 @@ def apply_config_overrides(app, args):
         "transcode_bitrate": args.transcode_bitrate,
         "chunk_size": args.chunk_size,
         "retry_attempts": args.retry_attempts,
+        "fetch_concurrency": args.fetch_concurrency,
+        "scan_workers": args.scan_workers,
+        "full_rescan": args.full_rescan,
+        "download_jobs": args.download_jobs,
+        "transcode_jobs": args.transcode_jobs,
+        "transcode_priority": args.transcode_priority,
+        "transcode_threads": args.transcode_threads,
+        "transcode_queue_size": args.transcode_queue_size,
+        "stream_transcode": args.stream_transcode,
+        "tag_jobs": args.tag_jobs,
         "temp_download_folder": args.temp_download_folder,
+        "content_store": args.content_store,
+        "content_store_folder": args.content_store_folder,
+        "metrics_report": args.metrics_report,
+        "metrics_textfile": args.metrics_textfile,
     }
 
     for key, value in config_overrides.items():
         if value is not None:
             app.config[key] = value
 
+    app.config["full_rescan"] = bool(normalize_config_bool(app.config.get("full_rescan"), "full_rescan"))
+    app.config["stream_transcode"] = bool(
+        normalize_config_bool(app.config.get("stream_transcode"), "stream_transcode"))
+    app.config["content_store"] = bool(
+        normalize_config_bool(app.config.get("content_store"), "content_store"))
+    app.config["track_store"] = bool(
+        normalize_config_bool(app.config.get("track_store"), "track_store"))
+    app.config["metrics_summary"] = bool(
+        normalize_config_bool(app.config.get("metrics_summary"), "metrics_summary"))
     app.set_file_mtime_from_added_at = bool(args.set_file_mtime_from_added_at)
 
     app.archive_enabled = bool(args.enable_archive)
@@ -225,6 +322,20 @@ def apply_config_overrides(app, args):
 
 
 def validate_runtime_options(args):
+    if args.scan_workers is not None and args.scan_workers < 1:
+        raise ValueError("--scan-workers must be at least 1.")
+
+    for option, value in (
+        ("--fetch-concurrency", args.fetch_concurrency),
+        ("--jobs", args.download_jobs),
+        ("--transcode-jobs", args.transcode_jobs),
+        ("--transcode-threads", args.transcode_threads),
+        ("--transcode-queue-size", args.transcode_queue_size),
+        ("--tag-jobs", args.tag_jobs),
+    ):
+        if value is not None and value < 1:
+            raise ValueError(f"{option} must be at least 1.")
+
     if args.archive_folder and not args.enable_archive:
         raise ValueError("--archive-folder requires --enable-archive or config enable_archive=true.")
 
@@ -293,6 +404,10 @@ def configure_playlist(app, args):
             if not app.playlist_id:
                 raise ValueError(f"Invalid --playlist-url provided: {playlist_url}")
 
+            # a playlist given twice would be synced twice into the same folder
+            if any(playlist_job["id"] == app.playlist_id for playlist_job in app.playlist_jobs):
+                continue
+
             app.playlist_jobs.append({
                 "url": playlist_url,
                 "id": app.playlist_id,
@@ -308,7 +423,12 @@ def configure_playlist(app, args):
             }
         ]
 
+    app.prefetch_playlist_names(app.playlist_jobs)
+
     for playlist_job in app.playlist_jobs:
+        if playlist_job["name"]:
+            continue
+
         app.playlist_url = playlist_job["url"]
         app.playlist_id = playlist_job["id"]
         app.get_playlist_name()
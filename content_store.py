@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl that clones a file's extents on copy-on-write filesystems (Btrfs, XFS)
+FICLONE = 0x40049409
+REFERENCES_VERSION = 1
+
+
+def reflink_file(source_path, destination_path):
+    """Clone source_path to destination_path, sharing its data blocks; False if unsupported."""
+    if fcntl is None:
+        return False
+
+    try:
+        with open(source_path, "rb") as source_file, open(destination_path, "wb") as destination_file:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    except OSError:
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        return False
+
+    shutil.copystat(source_path, destination_path)
+    return True
+
+
+class ContentStore:
+    """Downloaded tracks keyed by (track_id, format, quality), linked into playlist folders.
+
+    Every folder that holds a track gets a hardlink to the stored file, or a reflink/copy
+    when the folder is on another device. Each placed path is recorded in references.json
+    with how it was placed, since reflinks and copies leave the link count at 1.
+    collect_garbage() removes stored files that neither have another hardlink nor a
+    recorded path that still holds the track.
+    """
+
+    def __init__(self, store_folder):
+        self.store_folder = store_folder
+        self.references_path = os.path.join(store_folder, "references.json")
+        # entry path relative to the store -> {placed path: "hardlink", "reflink" or "copy"}
+        self.references = {}
+        # placed path -> entry key, so a file can be looked up without knowing which track it holds
+        self.entry_keys_by_path = {}
+        self.dirty = False
+        # links are placed from the download pipeline's finalize workers
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.references = {}
+
+        if os.path.isfile(self.references_path):
+            try:
+                with open(self.references_path, "r", encoding="utf-8") as references_file:
+                    loaded_references = json.load(references_file)
+
+                if loaded_references.get("version") == REFERENCES_VERSION:
+                    self.references = loaded_references.get("references", {})
+            except Exception:
+                self.references = {}
+
+        self.index_placed_paths()
+
+    def index_placed_paths(self):
+        self.entry_keys_by_path = {
+            placed_path: entry_key
+            for entry_key, references in self.references.items()
+            for placed_path in references
+        }
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+
+            payload = {
+                "version": REFERENCES_VERSION,
+                "references": self.references,
+            }
+
+            os.makedirs(self.store_folder, exist_ok=True)
+            temp_references_path = f"{self.references_path}.tmp"
+            with open(temp_references_path, "w", encoding="utf-8") as references_file:
+                json.dump(payload, references_file)
+
+            os.replace(temp_references_path, self.references_path)
+            self.dirty = False
+
+    def get_entry_key(self, entry_path):
+        return os.path.relpath(entry_path, self.store_folder)
+
+    def get_entry_path(self, track_id, download_format, quality):
+        return os.path.join(self.store_folder, download_format, quality, f"{track_id}.{download_format}")
+
+    def get(self, track_id, download_format, quality):
+        entry_path = self.get_entry_path(track_id, download_format, quality)
+        return entry_path if os.path.isfile(entry_path) else None
+
+    def add(self, file_path, track_id, download_format, quality):
+        """Move file_path into the store and return the stored path."""
+        entry_path = self.get_entry_path(track_id, download_format, quality)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # copied next to the entry first when the temp folder is on another device, so the entry appears atomically
+        temp_entry_path = f"{entry_path}.tmp"
+        shutil.move(file_path, temp_entry_path)
+        os.replace(temp_entry_path, entry_path)
+        return entry_path
+
+    def link(self, entry_path, destination_path):
+        """Place the stored file at destination_path; returns "hardlink", "reflink" or "copy"."""
+        if os.path.lexists(destination_path):
+            os.remove(destination_path)
+
+        # fails across devices and on filesystems without hardlinks (FAT, some network shares)
+        try:
+            os.link(entry_path, destination_path)
+            link_type = "hardlink"
+        except OSError:
+            if reflink_file(entry_path, destination_path):
+                link_type = "reflink"
+            else:
+                shutil.copy2(entry_path, destination_path)
+                link_type = "copy"
+
+        placed_path = os.path.abspath(destination_path)
+        entry_key = self.get_entry_key(entry_path)
+
+        with self.lock:
+            # the path no longer holds whatever was placed there before
+            previous_entry_key = self.entry_keys_by_path.get(placed_path)
+            if previous_entry_key is not None and previous_entry_key != entry_key:
+                self.references.get(previous_entry_key, {}).pop(placed_path, None)
+
+            self.references.setdefault(entry_key, {})[placed_path] = link_type
+            self.entry_keys_by_path[placed_path] = entry_key
+            self.dirty = True
+
+        return link_type
+
+    def holds(self, file_path):
+        """True if file_path was placed from a stored file and still holds it.
+
+        Looked up by path, since a file's tags may name a relinked track ID rather than
+        the one it was stored under.
+        """
+        placed_path = os.path.abspath(file_path)
+
+        with self.lock:
+            entry_key = self.entry_keys_by_path.get(placed_path)
+            link_type = self.references.get(entry_key, {}).get(placed_path)
+
+        if link_type is None:
+            return False
+
+        return is_reference_alive(os.path.join(self.store_folder, entry_key), placed_path, link_type)
+
+    def collect_garbage(self):
+        """Remove stored files no folder holds any more; returns (files, bytes) removed.
+
+        Recorded paths that no longer hold their track are dropped along the way.
+        """
+        removed_files = 0
+        removed_bytes = 0
+        live_references = {}
+
+        for folder, _, files in os.walk(self.store_folder):
+            for file in files:
+                file_path = os.path.join(folder, file)
+                if file_path in (self.references_path, f"{self.references_path}.tmp"):
+                    continue
+
+                entry_key = self.get_entry_key(file_path)
+                with self.lock:
+                    references = dict(self.references.get(entry_key, {}))
+                references = {
+                    placed_path: link_type
+                    for placed_path, link_type in references.items()
+                    if is_reference_alive(file_path, placed_path, link_type)
+                }
+
+                try:
+                    file_stat = os.stat(file_path)
+                    if (file_stat.st_nlink > 1 or references) and not file.endswith(".tmp"):
+                        live_references[entry_key] = references
+                        continue
+
+                    os.remove(file_path)
+                except OSError:
+                    continue
+
+                removed_files += 1
+                removed_bytes += file_stat.st_size
+
+        with self.lock:
+            self.references = {entry_key: references for entry_key, references in live_references.items() if references}
+            self.index_placed_paths()
+            self.dirty = True
+
+        self.save()
+        return removed_files, removed_bytes
+
+
+def is_reference_alive(entry_path, placed_path, link_type):
+    """True if placed_path still holds the stored file it was placed from as link_type.
+
+    A hardlink must still be the stored file itself. A reflink or copy is a file of its
+    own; stored files are tagged before they are placed, so one of the same size at the
+    recorded path is taken to be the track rather than another file saved there since.
+    """
+    try:
+        if link_type == "hardlink":
+            return os.path.samefile(placed_path, entry_path)
+
+        return os.path.isfile(placed_path) and os.path.getsize(placed_path) == os.path.getsize(entry_path)
+    except OSError:
+        return False
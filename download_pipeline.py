@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+import traceback
+
+
+class DownloadJob:
+    """Per-track state for one trip through the download pipeline."""
+
+    def __init__(self, spotify_track, targets=None):
+        self.spotify_track = spotify_track
+        # (owner, spotify_track) pairs the finished file is placed for; owner is opaque to the pipeline
+        self.targets = targets or []
+        # (owner, spotify_track, file_path) for every target the file was placed for
+        self.placed_files = []
+        self.temp_download_file = ''
+        self.temp_transcode_file = ''
+        # the content store's copy of the finished file, linked into each target folder
+        self.content_store_file = ''
+        self.downloaded_bytes = 0
+        self.genres = ''
+        self.lyrics = ''
+        self.succeeded = True
+        # set when a stage handler raised: the stage's name and the formatted traceback
+        self.error_stage = None
+        self.error = None
+        # set when the download already produced the output format (streamed through ffmpeg or ogg passthrough)
+        self.transcoded = False
+
+        # progress rows of the worker currently handling the job
+        self.download_progress_id = None
+        self.metadata_progress_id = None
+
+
+class PipelineStage:
+    def __init__(self, name, handler, workers=1, queue_size=None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        # size of the queue feeding this stage; None uses the pipeline default
+        self.queue_size = queue_size
+        self.seconds = 0.0
+        self.count = 0
+
+
+class DownloadPipeline:
+    """Run jobs through a chain of stages, each with its own worker threads.
+
+    Stages are connected by bounded queues, so a fast stage blocks instead of running
+    ahead of a slow one. A handler is called as handler(job, worker_index) and returns
+    False (or raises) to fail the job; failed jobs skip the remaining stages, and a raised
+    exception is kept on the job. on_finished is called with every job once it leaves the
+    last stage; if it raises, the traceback is kept in callback_errors.
+    """
+
+    STOP = object()
+
+    def __init__(self, stages, queue_size=2, on_finished=None):
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.on_finished = on_finished
+        self.callback_errors = []
+        self.stats_lock = threading.Lock()
+
+    def run_stage_worker(self, stage_index, worker_index, inbox, outbox):
+        stage = self.stages[stage_index]
+
+        while True:
+            job = inbox.get()
+            if job is self.STOP:
+                return
+
+            if job.succeeded:
+                started_at = time.perf_counter()
+                try:
+                    job.succeeded = stage.handler(job, worker_index) is not False
+                except Exception:
+                    job.succeeded = False
+                    job.error_stage = stage.name
+                    job.error = traceback.format_exc()
+
+                with self.stats_lock:
+                    stage.seconds += time.perf_counter() - started_at
+                    stage.count += 1
+
+            if outbox is not None:
+                outbox.put(job)
+            elif self.on_finished:
+                # a raising callback must not take the worker down, or run() never drains
+                try:
+                    self.on_finished(job)
+                except Exception:
+                    with self.stats_lock:
+                        self.callback_errors.append(traceback.format_exc())
+
+    def run(self, jobs):
+        queues = [
+            queue.Queue(maxsize=max(1, int(stage.queue_size or self.queue_size)))
+            for stage in self.stages
+        ]
+        stage_threads = []
+
+        for stage_index, stage in enumerate(self.stages):
+            inbox = queues[stage_index]
+            outbox = queues[stage_index + 1] if stage_index + 1 < len(queues) else None
+            threads = [
+                threading.Thread(
+                    target=self.run_stage_worker,
+                    args=(stage_index, worker_index, inbox, outbox),
+                    name=f"{stage.name}-{worker_index}",
+                    daemon=True,
+                )
+                for worker_index in range(stage.workers)
+            ]
+
+            for thread in threads:
+                thread.start()
+            stage_threads.append(threads)
+
+        for job in jobs:
+            queues[0].put(job)
+
+        # drain stage by stage: once every worker of a stage has stopped, nothing more
+        # can reach the next stage
+        for stage_index, threads in enumerate(stage_threads):
+            for _ in threads:
+                queues[stage_index].put(self.STOP)
+            for thread in threads:
+                thread.join()
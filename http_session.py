@@ -0,0 +1,62 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (5, 30)
+
+# Hosts hit once per downloaded track; the rest share the default pool size.
+SPOTIFY_LYRICS_HOST = "spclient.wg.spotify.com"
+SPOTIFY_IMAGE_HOST = "i.scdn.co"
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests made without one."""
+
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_http_adapter(pool_size, timeout, retries):
+    # Only connection-level failures are retried here; HTTP status handling (429s,
+    # retry_attempts) stays with the callers.
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=0,
+        backoff_factor=0.5,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+
+    return TimeoutHTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+        timeout=timeout,
+    )
+
+
+def create_http_session(pool_size=10, timeout=DEFAULT_TIMEOUT, retries=2, host_pool_sizes=None):
+    """Return a keep-alive requests.Session shared by every worker thread.
+
+    host_pool_sizes maps a host name to its own connection pool size. urllib3's pools are
+    thread-safe, and callers only issue stateless GETs on the session.
+    """
+    session = requests.Session()
+
+    default_adapter = build_http_adapter(pool_size, timeout, retries)
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    for host, host_pool_size in (host_pool_sizes or {}).items():
+        session.mount(f"https://{host}/", build_http_adapter(host_pool_size, timeout, retries))
+
+    return session
@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+LIBRARY_INDEX_VERSION = 1
+
+# Folder mtimes this close to the previous scan are not trusted, since a change made in
+# the same clock tick (2s on FAT/SMB shares) would leave the mtime unchanged.
+FOLDER_MTIME_GRANULARITY_NS = 2_000_000_000
+
+
+def list_library_folder(folder):
+    files = []
+    subfolders = []
+
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if not is_dir:
+                    files.append(entry.name)
+                # like os.walk, symlinked folders are not followed
+                elif not entry.is_symlink():
+                    subfolders.append(entry.path)
+    except OSError:
+        return None
+
+    return files, subfolders
+
+
+def walk_library_folder(root_folder, max_depth=None, executor=None, list_folder_entries=list_library_folder):
+    """Yield (folder, file_names) in the same top-down order as os.walk.
+
+    max_depth: None (scan everything, all subfolders), 0 (only root folder), 1 (root + one level deep), ...
+    With an executor, subfolders are listed concurrently as soon as their parent is known.
+    """
+    def list_folder(folder, depth):
+        listing = list_folder_entries(folder)
+        if listing is None:
+            return None
+
+        files, subfolders = listing
+        if max_depth is not None and depth >= max_depth:
+            subfolders = []
+
+        if executor is None:
+            return folder, files, [(subfolder, depth + 1) for subfolder in subfolders]
+
+        return folder, files, [executor.submit(list_folder, subfolder, depth + 1) for subfolder in subfolders]
+
+    def visit(listing):
+        if listing is None:
+            return
+
+        folder, files, children = listing
+        yield folder, files
+
+        for child in children:
+            yield from visit(child.result() if executor is not None else list_folder(*child))
+
+    if executor is None:
+        yield from visit(list_folder(root_folder, 0))
+    else:
+        yield from visit(executor.submit(list_folder, root_folder, 0).result())
+
+
+def get_folder_state(root_folder, max_depth=None):
+    """Every folder's mtime and a digest of its file names under root_folder, or None if one cannot be read.
+
+    The time it was read is kept with it, for folder_state_matches.
+    """
+    recorded_at_ns = time.time_ns()
+    folders = {}
+
+    for folder, files in walk_library_folder(root_folder, max_depth):
+        try:
+            folder_mtime_ns = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+
+        names_digest = hashlib.sha1("\0".join(sorted(files)).encode("utf-8")).hexdigest()
+        folders[os.path.relpath(folder, root_folder)] = [folder_mtime_ns, names_digest]
+
+    # the root itself could not be listed
+    if not folders:
+        return None
+
+    return {"recorded_at_ns": recorded_at_ns, "folders": folders}
+
+
+def folder_state_matches(root_folder, recorded_state, max_depth=None):
+    """True if no file was added, removed or renamed under root_folder since recorded_state was read.
+
+    The file names catch changes made in the same mtime tick as the recording (2s on
+    FAT/SMB shares), so a state read right after a sync can be trusted; the mtimes catch
+    a file replaced under the same name. A folder whose recorded mtime was that fresh only
+    counts as unchanged once its tick has passed.
+    """
+    if not recorded_state:
+        return False
+
+    current_state = get_folder_state(root_folder, max_depth)
+    if current_state is None or current_state["folders"] != recorded_state.get("folders"):
+        return False
+
+    recorded_at_ns = recorded_state["recorded_at_ns"]
+    has_fresh_mtimes = any(
+        folder_mtime_ns > recorded_at_ns - FOLDER_MTIME_GRANULARITY_NS
+        for folder_mtime_ns, _ in recorded_state["folders"].values()
+    )
+    return not has_fresh_mtimes or current_state["recorded_at_ns"] >= recorded_at_ns + FOLDER_MTIME_GRANULARITY_NS
+
+
+def get_index_path_key(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def get_file_signature(stat_result):
+    return (stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino)
+
+
+def can_detect_rename(signature):
+    # FAT and some SMB mounts report inode 0, so size and mtime alone would match unrelated files
+    return signature[2] != 0
+
+
+class LocalLibraryIndex:
+    """On-disk cache of the tags read from local audio files.
+
+    Entries are keyed by path and validated against the file's (size, mtime_ns, inode)
+    signature. A file whose path is unknown but whose signature matches an existing entry
+    was renamed or moved, so its tags are reused under the new path. Files without a real
+    inode number only match by path.
+
+    Each listed folder also gets a snapshot of its mtime and entries. A folder whose mtime
+    has not moved since is not listed again. Its files are still stat'ed and checked
+    against their signature, as retagging a file in place leaves the folder mtime alone.
+    full_rescan ignores both the snapshots and the cached tags.
+    """
+
+    def __init__(self, index_path, full_rescan=False):
+        self.index_path = index_path
+        self.full_rescan = full_rescan
+        self.scan_started_ns = time.time_ns()
+        self.entries = {}
+        self.entries_by_signature = {}
+        self.folders = {}
+        self.unchanged_folders = set()
+        self.visited_folders = set()
+        self.seen_paths = set()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        # lookups and stores happen from the scanner's worker threads
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.entries = {}
+        self.folders = {}
+
+        if os.path.isfile(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as index_file:
+                    loaded_index = json.load(index_file)
+
+                if loaded_index.get("version") == LIBRARY_INDEX_VERSION:
+                    self.entries = loaded_index.get("entries", {})
+                    self.folders = loaded_index.get("folders", {})
+            except Exception:
+                self.entries = {}
+                self.folders = {}
+
+        self.entries_by_signature = {
+            tuple(entry["signature"]): entry
+            for entry in self.entries.values()
+            if can_detect_rename(entry["signature"])
+        }
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        payload = {
+            "version": LIBRARY_INDEX_VERSION,
+            "entries": self.entries,
+            "folders": self.folders,
+        }
+
+        temp_index_path = f"{self.index_path}.tmp"
+        with open(temp_index_path, "w", encoding="utf-8") as index_file:
+            json.dump(payload, index_file)
+
+        os.replace(temp_index_path, self.index_path)
+        self.dirty = False
+
+    def list_folder(self, folder):
+        folder_key = get_index_path_key(folder)
+
+        # stat before listing, so a change made while listing shows up as a newer mtime next time
+        try:
+            folder_mtime_ns = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+
+        snapshot = self.folders.get(folder_key)
+        if (
+            not self.full_rescan and snapshot and
+            snapshot["mtime_ns"] == folder_mtime_ns and
+            folder_mtime_ns < snapshot["scanned_at_ns"] - FOLDER_MTIME_GRANULARITY_NS
+        ):
+            with self.lock:
+                self.unchanged_folders.add(folder_key)
+            return list(snapshot["files"]), list(snapshot["subfolders"])
+
+        listing = list_library_folder(folder)
+        if listing is None:
+            return None
+
+        files, subfolders = listing
+        with self.lock:
+            self.folders[folder_key] = {
+                "mtime_ns": folder_mtime_ns,
+                "entry_count": len(files) + len(subfolders),
+                "scanned_at_ns": self.scan_started_ns,
+                "files": files,
+                "subfolders": subfolders,
+            }
+            self.dirty = True
+
+        return listing
+
+    def is_folder_unchanged(self, folder):
+        return get_index_path_key(folder) in self.unchanged_folders
+
+    def mark_folder_visited(self, folder):
+        self.visited_folders.add(get_index_path_key(folder))
+
+    def mark_path_seen(self, file_path):
+        self.seen_paths.add(get_index_path_key(file_path))
+
+    def lookup(self, file_path, stat_result):
+        path_key = get_index_path_key(file_path)
+        signature = get_file_signature(stat_result)
+
+        with self.lock:
+            if self.full_rescan:
+                self.misses += 1
+                return None
+
+            entry = self.entries.get(path_key)
+            if entry and tuple(entry["signature"]) == signature:
+                self.hits += 1
+                return entry["tags"]
+
+            entry = self.entries_by_signature.get(signature) if can_detect_rename(signature) else None
+            if entry:
+                self.hits += 1
+                self.store_entry(path_key, signature, entry["tags"])
+                return entry["tags"]
+
+            self.misses += 1
+            return None
+
+    def store(self, file_path, stat_result, track_tags):
+        with self.lock:
+            self.store_entry(get_index_path_key(file_path), get_file_signature(stat_result), track_tags)
+
+    def store_entry(self, path_key, signature, track_tags):
+        entry = {
+            "signature": list(signature),
+            "tags": track_tags,
+        }
+
+        self.entries[path_key] = entry
+        if can_detect_rename(signature):
+            self.entries_by_signature[signature] = entry
+        self.dirty = True
+
+    def prune(self):
+        # Only forget files from folders this scan actually listed, so a shallow scan
+        # (max_depth) does not drop the entries of deeper folders.
+        stale_paths = [
+            path_key for path_key in self.entries
+            if os.path.dirname(path_key) in self.visited_folders and path_key not in self.seen_paths
+        ]
+
+        for path_key in stale_paths:
+            entry = self.entries.pop(path_key)
+            signature = tuple(entry["signature"])
+            if self.entries_by_signature.get(signature) is entry:
+                del self.entries_by_signature[signature]
+
+        stale_folders = [
+            folder_key for folder_key in self.folders
+            if os.path.dirname(folder_key) in self.visited_folders and folder_key not in self.visited_folders
+        ]
+
+        for folder_key in stale_folders:
+            del self.folders[folder_key]
+
+        if stale_paths or stale_folders:
+            self.dirty = True
+
+        self.visited_folders = set()
+        self.seen_paths = set()
@@ -1,48 +1,122 @@
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 from cli_args import configure_runtime_options, parse_args
 from unify import Unify
 from utils import pause_for_user
 
 
-def sync_current_selection(app):
+def prepare_sync(app):
+    """Fetch, scan and reconcile the current selection, leaving its downloads queued."""
     app.create_local_playlist_folder()
-    app.prepare_runtime_state()
 
-    app.update_window_title(app.playlist_name)
-    app.init_progress_bars()
+    if app.is_playlist_unchanged():
+        print(f"{app.playlist_name} has not changed since the last sync.")
+        app.playlist_unchanged = True
+        return True
 
-    if not app.get_spotify_tracks_raw():
-        app.update_window_title("Failed.")
+    with app.metrics.measure("spotify_fetch") as stage:
+        fetched = app.get_spotify_tracks_raw()
+        stage.items = len(app.spotify_tracks_raw)
+
+    if not fetched:
         return False
 
     if app.option_type != "track":
-        app.get_local_tracks_raw()
-
-        app.spotify_tracks_remove_uploaded()
-        app.spotify_tracks_remove_unavailable()
-        app.spotify_tracks_remove_duplicate()
-        app.spotify_tracks_fix_save_as()
-
-        app.local_tracks_delete_unmatched()
-        app.local_tracks_delete_duplicate()
-
-        app.get_spotify_tracks_to_download()
-        app.get_spotify_tracks_to_download_incomplete()
+        with app.metrics.measure("local_scan") as stage:
+            app.get_local_tracks_raw()
+            stage.items = len(app.local_tracks_raw)
+
+        with app.metrics.measure("cleanup") as stage:
+            stage.items = len(app.spotify_tracks_raw)
+            app.spotify_tracks_remove_uploaded()
+            app.spotify_tracks_remove_unavailable()
+            app.spotify_tracks_remove_duplicate()
+            app.spotify_tracks_fix_save_as()
+
+        with app.metrics.measure("matching") as stage:
+            stage.items = len(app.local_tracks_raw)
+            app.local_tracks_delete_unmatched()
+            app.local_tracks_delete_duplicate()
+
+            app.get_spotify_tracks_to_download()
+            app.get_spotify_tracks_to_download_incomplete()
     else:
         app.spotify_tracks_fix_save_as()
         app.spotify_tracks_to_download = list(app.spotify_tracks_raw)
 
-    sync_succeeded = app.download_handler()
+    return True
+
 
-    if sync_succeeded:
+def finish_sync(app, sync_succeeded):
+    app.record_sync_metrics(sync_succeeded)
+
+    if sync_succeeded and not app.playlist_unchanged:
         app.remember_liked_tracks_scan_timestamp()
+        app.remember_playlist_snapshot()
+
+
+def sync_current_selection(app):
+    app.prepare_runtime_state()
+
+    app.update_window_title(app.playlist_name)
+    app.init_progress_bars()
+
+    if not prepare_sync(app):
+        app.record_sync_metrics(False)
+        app.update_window_title("Failed.")
+        return False
+
+    app.write_metrics_textfile()
+    sync_succeeded = app.download_handler()
+    finish_sync(app, sync_succeeded)
 
     app.remove_temp_download_folder()
 
     return sync_succeeded
 
 
+def get_playlist_folder_names(app, playlist_jobs):
+    """Return a subfolder name per playlist job, unique even where playlist names collide.
+
+    Playlists sharing a folder would count each other's tracks as extra and remove them,
+    so a name used by several playlists gets each playlist's ID appended. Names are
+    compared case-insensitively, as the destination may be on such a file system.
+    """
+    folder_names = [app.sanitize_path_component(playlist_job["name"], "Playlist") for playlist_job in playlist_jobs]
+    name_counts = Counter(folder_name.casefold() for folder_name in folder_names)
+
+    return [
+        f"{folder_name} [{playlist_job['id']}]" if name_counts[folder_name.casefold()] > 1 else folder_name
+        for folder_name, playlist_job in zip(folder_names, playlist_jobs)
+    ]
+
+
+def prepare_playlist_apps(app, playlist_jobs):
+    """Fetch, scan and reconcile every playlist concurrently, each in its own subfolder.
+
+    Returns the playlist apps and, for each, whether its preparation succeeded.
+    """
+    destination_root = app.local_playlist_folder
+
+    # every playlist scans into one library index, saved once all of them are done
+    app.shared_library_index = app.load_library_index()
+    playlist_apps = [
+        app.create_playlist_app(playlist_job, os.path.join(destination_root, folder_name))
+        for playlist_job, folder_name in zip(playlist_jobs, get_playlist_folder_names(app, playlist_jobs))
+    ]
+
+    try:
+        with ThreadPoolExecutor(max_workers=app.get_fetch_concurrency()) as executor:
+            prepared = list(executor.map(prepare_sync, playlist_apps))
+    finally:
+        app.save_library_index(app.shared_library_index)
+        app.shared_library_index = None
+
+    return playlist_apps, prepared
+
+
 def sync_playlist_jobs(app):
     playlist_jobs = app.playlist_jobs or [
         {
@@ -55,21 +129,30 @@ def sync_playlist_jobs(app):
     if len(playlist_jobs) == 1:
         return sync_current_selection(app)
 
-    destination_root = app.local_playlist_folder
+    app.prepare_runtime_state()
+    app.update_window_title(f"{len(playlist_jobs)} playlists")
+    app.init_progress_bars()
+
+    playlist_apps, prepared = prepare_playlist_apps(app, playlist_jobs)
+    app.write_metrics_textfile()
+
+    # one download queue for every playlist, so a shared track is downloaded and transcoded once
+    ready_apps = [playlist_app for playlist_app, ready in zip(playlist_apps, prepared) if ready]
+    app.queue_playlist_downloads(ready_apps)
+    app.download_handler()
+
     all_succeeded = True
+    for playlist_app, ready in zip(playlist_apps, prepared):
+        if ready:
+            playlist_succeeded = not playlist_app.spotify_tracks_failed
+            finish_sync(playlist_app, playlist_succeeded)
+        else:
+            playlist_succeeded = False
+            playlist_app.record_sync_metrics(False)
 
-    for playlist_job in playlist_jobs:
-        app.reset_sync_collections()
-        app.playlist_url = playlist_job["url"]
-        app.playlist_id = playlist_job["id"]
-        app.playlist_name = playlist_job["name"]
-        app.local_playlist_folder = os.path.join(
-            destination_root,
-            app.sanitize_path_component(app.playlist_name, "Playlist")
-        )
+        all_succeeded = all_succeeded and playlist_succeeded
 
-        if not sync_current_selection(app):
-            all_succeeded = False
+    app.remove_temp_download_folder()
 
     return all_succeeded
 
@@ -78,8 +161,8 @@ def main():
     args = parse_args()
     app = Unify()
 
-    app.create_spotipy_session()
     app.load_config(args.config_path)
+    app.create_spotipy_session()
     configure_runtime_options(app, args)
 
     if app.option_type == "move_playlist_matches":
@@ -90,12 +173,19 @@ def main():
         return
 
     app.login_to_librespot()
+    app.metrics.mark_started()
+    # replaces the last run's file, so a run that crashes is not reported as completed
+    app.write_metrics_textfile()
 
     if app.option_type == "playlist":
         sync_playlist_jobs(app)
     else:
         sync_current_selection(app)
 
+    app.collect_content_store_garbage()
+    app.report_cache_stats()
+    app.report_metrics()
+    app.write_metrics_textfile(run_completed=True)
     app.update_window_title("Finished.")
     pause_for_user()
 
@@ -0,0 +1,251 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from rich.table import Table
+
+# upper bounds (seconds) of the stage duration histogram buckets, from one tag write to a large library scan
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+TRACK_STATES = ("fetched", "matched", "downloaded", "failed", "removed")
+
+
+class StageSample:
+    """Filled in by the code inside SyncMetrics.measure; added to the stage on exit."""
+
+    def __init__(self):
+        self.items = 0
+        self.bytes = 0
+
+
+class SyncMetrics:
+    """Wall time, calls, items and bytes of every sync stage and remote request kind.
+
+    Pipeline workers and playlists prepared concurrently report into one instance, so a
+    stage's seconds are summed over every thread that ran it and can exceed the wall time
+    of the sync. Requests are grouped as (kind, name), e.g. ('spotipy', 'playlist_items')
+    or ('http', 'spclient.wg.spotify.com'); rate_limited counts their 429 answers,
+    including ones retried before the caller saw a response. Track and playlist counts
+    are added as each playlist finishes.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages = {}
+        self.requests = {}
+        self.tracks = dict.fromkeys(TRACK_STATES, 0)
+        self.playlists = {}
+        self.lock = threading.Lock()
+
+    def mark_started(self):
+        """Start the wall clock now, e.g. once interactive prompts are answered."""
+        self.started_at = time.time()
+
+    @contextmanager
+    def measure(self, stage_name):
+        sample = StageSample()
+        started_at = time.perf_counter()
+
+        try:
+            yield sample
+        finally:
+            self.add_stage(stage_name, time.perf_counter() - started_at, sample.items, sample.bytes)
+
+    def add_stage(self, stage_name, seconds, items=0, bytes_count=0):
+        with self.lock:
+            stage = self.stages.setdefault(stage_name, {
+                "stage": stage_name,
+                "calls": 0,
+                "seconds": 0.0,
+                "items": 0,
+                "bytes": 0,
+                # calls per DURATION_BUCKETS bound, plus one for anything slower
+                "buckets": [0] * (len(DURATION_BUCKETS) + 1),
+            })
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+            stage["items"] += items
+            stage["bytes"] += bytes_count
+            stage["buckets"][bisect_left(DURATION_BUCKETS, seconds)] += 1
+
+    def add_tracks(self, state, count):
+        with self.lock:
+            self.tracks[state] += count
+
+    def add_playlist(self, result):
+        with self.lock:
+            self.playlists[result] = self.playlists.get(result, 0) + 1
+
+    def record_request(self, kind, name, seconds, status=None, bytes_count=0, rate_limited=0):
+        """Count one request; status None means it failed without an HTTP answer."""
+        with self.lock:
+            request = self.requests.setdefault((kind, name), {
+                "kind": kind,
+                "name": name,
+                "calls": 0,
+                "seconds": 0.0,
+                "errors": 0,
+                "rate_limited": 0,
+                "bytes": 0,
+            })
+            request["calls"] += 1
+            request["seconds"] += seconds
+            request["errors"] += status is None or status >= 400
+            request["rate_limited"] += rate_limited
+            request["bytes"] += bytes_count
+
+    def get_report(self):
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "wall_seconds": time.time() - self.started_at,
+                "stages": [dict(stage, buckets=list(stage["buckets"])) for stage in self.stages.values()],
+                "tracks": dict(self.tracks),
+                "playlists": dict(self.playlists),
+                "requests": sorted(
+                    (dict(request) for request in self.requests.values()),
+                    key=lambda request: request["seconds"],
+                    reverse=True,
+                ),
+            }
+
+    def write_report(self, report_path):
+        report_folder = os.path.dirname(report_path)
+        if report_folder:
+            os.makedirs(report_folder, exist_ok=True)
+
+        write_file_atomically(report_path, json.dumps(self.get_report(), indent=2))
+
+    def write_textfile(self, textfile_path, cache_stats=None, run_completed=False):
+        """Replace a node-exporter textfile (.prom) with the current metrics."""
+        write_file_atomically(textfile_path, format_textfile(self.get_report(), cache_stats or {}, run_completed))
+
+    def build_summary_tables(self, format_bytes):
+        report = self.get_report()
+
+        stage_table = Table(title=f"Sync stages ({report['wall_seconds']:.1f}s wall time)", title_justify="left")
+        for column in ("Stage", "Calls", "Seconds", "Items", "Bytes"):
+            stage_table.add_column(column, justify="left" if column == "Stage" else "right")
+        for stage in report["stages"]:
+            stage_table.add_row(
+                stage["stage"],
+                str(stage["calls"]),
+                f"{stage['seconds']:.2f}",
+                str(stage["items"]) if stage["items"] else "",
+                format_bytes(stage["bytes"]) if stage["bytes"] else "",
+            )
+
+        request_table = Table(title="Requests", title_justify="left")
+        for column in ("Request", "Calls", "Seconds", "Errors", "429s", "Bytes"):
+            request_table.add_column(column, justify="left" if column == "Request" else "right")
+        for request in report["requests"]:
+            request_table.add_row(
+                f"{request['kind']}: {request['name']}",
+                str(request["calls"]),
+                f"{request['seconds']:.2f}",
+                str(request["errors"]),
+                str(request["rate_limited"]),
+                format_bytes(request["bytes"]) if request["bytes"] else "",
+            )
+
+        return stage_table, request_table
+
+
+def write_file_atomically(file_path, content):
+    folder = os.path.dirname(file_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    # readers only ever see the old or the new file; the temp name does not end in .prom,
+    # so the textfile collector skips it
+    temp_file_path = f"{file_path}.tmp"
+    with open(temp_file_path, "w", encoding="utf-8") as temp_file:
+        temp_file.write(content)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+
+    os.replace(temp_file_path, file_path)
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_sample(name, labels, value):
+    value_text = repr(value) if isinstance(value, float) else str(value)
+    if not labels:
+        return f"{name} {value_text}"
+
+    label_text = ",".join(f'{label}="{escape_label_value(label_value)}"' for label, label_value in labels.items())
+    return f"{name}{{{label_text}}} {value_text}"
+
+
+def format_textfile(report, cache_stats, run_completed=False):
+    """Render a metrics report in the Prometheus text format read by node-exporter's textfile collector.
+
+    cache_stats maps a cache name to (hits, lookups).
+    """
+    lines = []
+
+    def add_metric(name, metric_type, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(format_sample(sample_name, labels, value) for sample_name, labels, value in samples)
+
+    add_metric("unify_run_started_timestamp_seconds", "gauge", "Start of the current or last run.",
+               [("unify_run_started_timestamp_seconds", {}, float(report["started_at"]))])
+    add_metric("unify_run_wall_seconds", "gauge", "Wall time of the run so far.",
+               [("unify_run_wall_seconds", {}, float(report["wall_seconds"]))])
+    add_metric("unify_run_completed", "gauge", "1 once the run has finished, 0 while playlists are still syncing.",
+               [("unify_run_completed", {}, int(run_completed))])
+    add_metric("unify_playlists_total", "counter", "Playlists finished in this run by result.",
+               [("unify_playlists_total", {"result": result}, count) for result, count in sorted(report["playlists"].items())])
+    add_metric("unify_tracks_total", "counter", "Tracks fetched, matched, downloaded, failed and removed in this run.",
+               [("unify_tracks_total", {"state": state}, count) for state, count in report["tracks"].items()])
+    add_metric("unify_downloaded_bytes_total", "counter", "Audio bytes downloaded in this run.",
+               [("unify_downloaded_bytes_total", {}, sum(
+                   stage["bytes"] for stage in report["stages"] if stage["stage"] == "download"))])
+
+    histogram_samples = []
+    for stage in report["stages"]:
+        cumulative_count = 0
+        for bound, count in zip(DURATION_BUCKETS + ("+Inf",), stage["buckets"]):
+            cumulative_count += count
+            histogram_samples.append(
+                ("unify_stage_duration_seconds_bucket", {"stage": stage["stage"], "le": bound}, cumulative_count))
+        histogram_samples.append(("unify_stage_duration_seconds_sum", {"stage": stage["stage"]}, float(stage["seconds"])))
+        histogram_samples.append(("unify_stage_duration_seconds_count", {"stage": stage["stage"]}, stage["calls"]))
+    add_metric("unify_stage_duration_seconds", "histogram", "Duration of each call of a sync stage.", histogram_samples)
+    add_metric("unify_stage_items_total", "counter", "Items handled by each sync stage.",
+               [("unify_stage_items_total", {"stage": stage["stage"]}, stage["items"]) for stage in report["stages"]])
+
+    for key, name, help_text in (
+        ("calls", "unify_requests_total", "Spotify Web API calls (call_spotipy) and HTTP fetches (fetch_url)."),
+        ("errors", "unify_request_errors_total", "Requests answered with an error or not answered at all."),
+        ("rate_limited", "unify_requests_rate_limited_total", "429 answers, including automatically retried ones."),
+        ("bytes", "unify_request_bytes_total", "Response bytes received."),
+    ):
+        add_metric(name, "counter", help_text, [
+            (name, {"kind": request["kind"], "name": request["name"]}, request[key]) for request in report["requests"]])
+    add_metric("unify_request_seconds_total", "counter", "Time spent waiting for requests.", [
+        ("unify_request_seconds_total", {"kind": request["kind"], "name": request["name"]}, float(request["seconds"]))
+        for request in report["requests"]])
+
+    add_metric("unify_cache_lookups_total", "counter", "Cache lookups in this run.",
+               [("unify_cache_lookups_total", {"cache": cache}, lookups) for cache, (_, lookups) in cache_stats.items()])
+    add_metric("unify_cache_hits_total", "counter", "Cache hits in this run.",
+               [("unify_cache_hits_total", {"cache": cache}, hits) for cache, (hits, _) in cache_stats.items()])
+    add_metric("unify_cache_hit_ratio", "gauge", "Share of cache lookups that were hits.", [
+        ("unify_cache_hit_ratio", {"cache": cache}, float(hits / lookups))
+        for cache, (hits, lookups) in cache_stats.items() if lookups])
+
+    return "\n".join(lines) + "\n"
+
+
+def count_rate_limited_responses(response):
+    """Number of 429 answers behind a requests response, including ones urllib3 retried."""
+    retries = getattr(response.raw, "retries", None)
+    history = getattr(retries, "history", None) or ()
+    return sum(1 for attempt in history if attempt.status == 429) + (response.status_code == 429)
@@ -0,0 +1,424 @@
+import os
+import re
+import struct
+
+import mutagen.mp3
+
+# Reads just the fields local track matching needs (title, artist, album, comment and
+# length) straight from the tag headers, seeking over artwork instead of loading it.
+# Anything unexpected makes the reader return None so the caller can fall back to a
+# full music_tag parse.
+
+ID3_TEXT_FRAMES = {
+    b"TIT2": "title",
+    b"TPE1": "artist",
+    b"TALB": "album",
+}
+MP4_TEXT_ATOMS = {
+    b"\xa9nam": "title",
+    b"\xa9ART": "artist",
+    b"\xa9alb": "album",
+    b"\xa9cmt": "comment",
+}
+VORBIS_COMMENT_KEYS = {"title", "artist", "album", "comment"}
+ID3_FRAME_ID_PATTERN = re.compile(rb"[A-Z0-9]{4}")
+OGG_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+OGG_TAIL_READ_SIZE = 65536
+
+
+class TagReaderError(Exception):
+    pass
+
+
+def join_tag_values(values):
+    # music_tag renders multi-value tags the same way
+    return ", ".join(values)
+
+
+def build_track_tags(values, length):
+    return {
+        "title": join_tag_values(values.get("title", [])),
+        "artist": join_tag_values(values.get("artist", [])),
+        "album": join_tag_values(values.get("album", [])),
+        "comment": join_tag_values(values.get("comment", [])),
+        "length": length,
+    }
+
+
+def read_exact(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise TagReaderError("Unexpected end of file")
+    return data
+
+
+######################################################
+
+
+def decode_syncsafe_int(data):
+    value = 0
+    for byte in data:
+        if byte & 0x80:
+            raise TagReaderError("Invalid syncsafe integer")
+        value = (value << 7) | byte
+    return value
+
+
+def split_id3_text(encoding, data):
+    codecs = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+    if encoding not in codecs:
+        raise TagReaderError("Unknown ID3 text encoding")
+
+    terminator = b"\x00\x00" if encoding in (1, 2) else b"\x00"
+    values = []
+
+    while data:
+        index = data.find(terminator)
+        # UTF-16 terminators have to sit on a character boundary
+        while len(terminator) == 2 and index != -1 and index % 2:
+            index = data.find(terminator, index + 1)
+
+        if index == -1:
+            value, data = data, b""
+        else:
+            value, data = data[:index], data[index + len(terminator):]
+
+        values.append(value.decode(codecs[encoding], errors="replace"))
+
+    return values
+
+
+def read_id3_comment(frame_data):
+    encoding = frame_data[0]
+    terminator = b"\x00\x00" if encoding in (1, 2) else b"\x00"
+
+    # skip the language code and the (terminated) description
+    index = frame_data.find(terminator, 4)
+    while len(terminator) == 2 and index != -1 and (index - 4) % 2:
+        index = frame_data.find(terminator, index + 1)
+
+    if index == -1:
+        return []
+
+    return split_id3_text(encoding, frame_data[index + len(terminator):])
+
+
+def read_mp3_tags(file, file_size):
+    header = file.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return None
+
+    major_version, _, tag_flags = header[3], header[4], header[5]
+    tag_size = decode_syncsafe_int(header[6:10])
+
+    # unsynchronised tags and ID3v2.2 are rare enough to leave to music_tag
+    if major_version not in (3, 4) or tag_flags & 0x80:
+        return None
+
+    tag_end = 10 + tag_size
+    audio_offset = tag_end + (10 if major_version == 4 and tag_flags & 0x10 else 0)
+    if tag_end > file_size:
+        raise TagReaderError("ID3 tag is larger than the file")
+
+    if tag_flags & 0x40:
+        extended_size = read_exact(file, 4)
+        if major_version == 4:
+            file.seek(decode_syncsafe_int(extended_size) - 4, os.SEEK_CUR)
+        else:
+            file.seek(struct.unpack(">I", extended_size)[0], os.SEEK_CUR)
+
+    values = {}
+
+    while file.tell() + 10 <= tag_end:
+        frame_header = read_exact(file, 10)
+        frame_id = frame_header[:4]
+
+        if not ID3_FRAME_ID_PATTERN.fullmatch(frame_id):
+            break  # padding
+
+        if major_version == 4:
+            frame_size = decode_syncsafe_int(frame_header[4:8])
+            unsupported_flags = frame_header[9] & 0x4f
+        else:
+            frame_size = struct.unpack(">I", frame_header[4:8])[0]
+            unsupported_flags = frame_header[9] & 0xe0
+
+        if file.tell() + frame_size > tag_end:
+            raise TagReaderError("ID3 frame runs past the tag")
+
+        if frame_id not in ID3_TEXT_FRAMES and frame_id != b"COMM":
+            # APIC and everything else is skipped without being read
+            file.seek(frame_size, os.SEEK_CUR)
+            continue
+
+        if unsupported_flags:
+            return None
+
+        frame_data = read_exact(file, frame_size)
+        if not frame_data:
+            continue
+
+        if frame_id == b"COMM":
+            values.setdefault("comment", []).extend(read_id3_comment(frame_data))
+        else:
+            values.setdefault(ID3_TEXT_FRAMES[frame_id], []).extend(
+                split_id3_text(frame_data[0], frame_data[1:]))
+
+    try:
+        stream_info = mutagen.mp3.MPEGInfo(file, audio_offset)
+    except mutagen.mp3.HeaderNotFoundError as e:
+        raise TagReaderError(e)
+
+    return build_track_tags(values, stream_info.length)
+
+
+######################################################
+
+
+def iter_mp4_atoms(file, start, end):
+    offset = start
+    while offset + 8 <= end:
+        file.seek(offset)
+        size, name = struct.unpack(">I4s", read_exact(file, 8))
+        header_size = 8
+
+        if size == 1:
+            size = struct.unpack(">Q", read_exact(file, 8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+
+        if size < header_size or offset + size > end:
+            raise TagReaderError("Invalid MP4 atom size")
+
+        yield name, offset + header_size, offset + size
+        offset += size
+
+
+def find_mp4_atom(file, start, end, name):
+    for atom_name, atom_start, atom_end in iter_mp4_atoms(file, start, end):
+        if atom_name == name:
+            return atom_start, atom_end
+    return None
+
+
+def read_mp4_track_length(file, trak_start, trak_end):
+    mdia = find_mp4_atom(file, trak_start, trak_end, b"mdia")
+    if not mdia:
+        return None
+
+    hdlr = find_mp4_atom(file, *mdia, b"hdlr")
+    if not hdlr:
+        return None
+
+    file.seek(hdlr[0])
+    if read_exact(file, 12)[8:12] != b"soun":
+        return None
+
+    mdhd = find_mp4_atom(file, *mdia, b"mdhd")
+    if not mdhd:
+        raise TagReaderError("Audio track has no mdhd atom")
+
+    file.seek(mdhd[0])
+    version = read_exact(file, 4)[0]
+    if version == 0:
+        file.seek(8, os.SEEK_CUR)
+        timescale, duration = struct.unpack(">2I", read_exact(file, 8))
+    elif version == 1:
+        file.seek(16, os.SEEK_CUR)
+        timescale, duration = struct.unpack(">IQ", read_exact(file, 12))
+    else:
+        raise TagReaderError("Unknown mdhd version")
+
+    return float(duration) / timescale if timescale else 0
+
+
+def read_mp4_tags(file, file_size):
+    moov = find_mp4_atom(file, 0, file_size, b"moov")
+    if not moov:
+        return None
+
+    length = None
+    values = {}
+
+    for atom_name, atom_start, atom_end in iter_mp4_atoms(file, *moov):
+        if atom_name == b"trak" and length is None:
+            length = read_mp4_track_length(file, atom_start, atom_end)
+
+        elif atom_name == b"udta":
+            meta = find_mp4_atom(file, atom_start, atom_end, b"meta")
+            # meta is a full atom: skip its version and flags
+            ilst = meta and find_mp4_atom(file, meta[0] + 4, meta[1], b"ilst")
+            if not ilst:
+                continue
+
+            for item_name, item_start, item_end in iter_mp4_atoms(file, *ilst):
+                # covr and everything else is skipped without being read
+                if item_name not in MP4_TEXT_ATOMS:
+                    continue
+
+                for data_name, data_start, data_end in iter_mp4_atoms(file, item_start, item_end):
+                    if data_name != b"data":
+                        continue
+
+                    file.seek(data_start)
+                    data = read_exact(file, data_end - data_start)
+                    data_type = struct.unpack(">I", data[:4])[0] & 0xffffff
+                    codec = {1: "utf-8", 2: "utf-16-be"}.get(data_type)
+                    if not codec:
+                        return None
+
+                    values.setdefault(MP4_TEXT_ATOMS[item_name], []).append(
+                        data[8:].decode(codec, errors="replace"))
+
+    if length is None:
+        return None
+
+    return build_track_tags(values, length)
+
+
+######################################################
+
+
+class OggStreamReader:
+    """Read the body bytes of one logical Ogg stream, seeking over pages and skipped data."""
+
+    def __init__(self, file, serial):
+        self.file = file
+        self.serial = serial
+        self.page_remaining = 0
+
+    def next_page(self):
+        while True:
+            header = read_ogg_page_header(self.file)
+            body_size = sum(read_exact(self.file, header["segments"]))
+
+            if header["serial"] == self.serial:
+                self.page_remaining = body_size
+                return
+
+            self.file.seek(body_size, os.SEEK_CUR)
+
+    def read(self, size):
+        chunks = []
+        while size:
+            if not self.page_remaining:
+                self.next_page()
+            chunk = read_exact(self.file, min(size, self.page_remaining))
+            chunks.append(chunk)
+            self.page_remaining -= len(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def skip(self, size):
+        while size:
+            if not self.page_remaining:
+                self.next_page()
+            step = min(size, self.page_remaining)
+            self.file.seek(step, os.SEEK_CUR)
+            self.page_remaining -= step
+            size -= step
+
+
+def read_ogg_page_header(file):
+    header = read_exact(file, OGG_PAGE_HEADER.size)
+    magic, version, _, position, serial, _, _, segments = OGG_PAGE_HEADER.unpack(header)
+    if magic != b"OggS" or version != 0:
+        raise TagReaderError("Invalid Ogg page")
+
+    return {"position": position, "serial": serial, "segments": segments}
+
+
+def find_last_ogg_position(file, file_size, serial):
+    tail_offset = max(0, file_size - OGG_TAIL_READ_SIZE)
+    file.seek(tail_offset)
+    tail = file.read()
+
+    index = tail.rfind(b"OggS")
+    while index != -1:
+        header = tail[index:index + OGG_PAGE_HEADER.size]
+        if len(header) == OGG_PAGE_HEADER.size:
+            _, version, _, position, page_serial, _, _, _ = OGG_PAGE_HEADER.unpack(header)
+            if version == 0 and page_serial == serial and position >= 0:
+                return position
+
+        index = tail.rfind(b"OggS", 0, index)
+
+    raise TagReaderError("Could not find the last Ogg page")
+
+
+def read_ogg_tags(file, file_size):
+    header = read_ogg_page_header(file)
+    serial = header["serial"]
+    segment_table = read_exact(file, header["segments"])
+    first_packet = read_exact(file, segment_table[0] if segment_table else 0)
+
+    if first_packet.startswith(b"\x01vorbis"):
+        sample_rate = struct.unpack("<I", first_packet[12:16])[0]
+        pre_skip = 0
+        comment_magic = b"\x03vorbis"
+    elif first_packet.startswith(b"OpusHead"):
+        sample_rate = 48000
+        pre_skip = struct.unpack("<H", first_packet[10:12])[0]
+        comment_magic = b"OpusTags"
+    else:
+        return None
+
+    # the identification header sits alone on the first page; comments start on the next one
+    file.seek(sum(segment_table[1:]), os.SEEK_CUR)
+    stream = OggStreamReader(file, serial)
+
+    if stream.read(len(comment_magic)) != comment_magic:
+        return None
+
+    stream.skip(struct.unpack("<I", stream.read(4))[0])  # vendor string
+    comment_count = struct.unpack("<I", stream.read(4))[0]
+    values = {}
+
+    for _ in range(comment_count):
+        comment_size = struct.unpack("<I", stream.read(4))[0]
+        if comment_size > file_size:
+            raise TagReaderError("Invalid Vorbis comment size")
+
+        # read just enough to see the key; METADATA_BLOCK_PICTURE and the like are skipped
+        prefix = stream.read(min(comment_size, 32))
+        key, separator, value = prefix.partition(b"=")
+        key = key.decode("ascii", errors="replace").lower()
+
+        if not separator or key not in VORBIS_COMMENT_KEYS:
+            stream.skip(comment_size - len(prefix))
+            continue
+
+        value += stream.read(comment_size - len(prefix))
+        values.setdefault(key, []).append(value.decode("utf-8", errors="replace"))
+
+    if not sample_rate:
+        raise TagReaderError("Invalid sample rate")
+
+    last_position = find_last_ogg_position(file, file_size, serial)
+    return build_track_tags(values, (last_position - pre_skip) / float(sample_rate))
+
+
+######################################################
+
+
+TAG_READERS = {
+    "mp3": read_mp3_tags,
+    "m4a": read_mp4_tags,
+    "ogg": read_ogg_tags,
+    "opus": read_ogg_tags,
+}
+
+
+def read_track_tags(file_path):
+    """Return title, artist, album, comment and length (seconds), or None if the file needs a full parse."""
+    file_extension = os.path.splitext(file_path)[1][1:].lower()
+    tag_reader = TAG_READERS.get(file_extension)
+    if not tag_reader:
+        return None
+
+    try:
+        with open(file_path, "rb") as file:
+            return tag_reader(file, os.fstat(file.fileno()).st_size)
+    except (TagReaderError, OSError, struct.error, IndexError):
+        return None
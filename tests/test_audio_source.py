@@ -0,0 +1,35 @@
+from audio_source import LibrespotAudioSource
+
+
+class FakeInputStream:
+    size = 3
+
+    def stream(self):
+        return self
+
+
+class FakeContentFeeder:
+    def __init__(self):
+        self.loaded = []
+
+    def load(self, track_id, audio_quality_picker, preload, halt_listener):
+        self.loaded.append((track_id.hex_id(), audio_quality_picker))
+        return type("LoadedStream", (), {"input_stream": FakeInputStream()})()
+
+
+class FakeSession:
+    def __init__(self):
+        self.feeder = FakeContentFeeder()
+
+    def content_feeder(self):
+        return self.feeder
+
+
+def test_librespot_source_opens_the_track_at_the_configured_quality():
+    session = FakeSession()
+
+    size, reader = LibrespotAudioSource(session).open("4uLU6hMCjMI75M1A2tKUQC", "high")
+
+    assert size == 3
+    assert isinstance(reader, FakeInputStream)
+    assert session.feeder.loaded[0][0] == "93bc414a606747b2b612491ef83d5a3e"
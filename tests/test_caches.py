@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+from caches import CoverArtCache, PersistentCache
+
+
+def test_cache_persists_and_evicts_least_recently_used(tmp_path):
+    cache_path = str(tmp_path / "unify-cache" / "artist-genres.json")
+
+    cache = PersistentCache(cache_path, max_entries=2)
+    cache.put("queen", ["rock", "glam rock"])
+    cache.put("abba", ["europop"])
+    assert cache.get("queen") == ["rock", "glam rock"]
+    cache.put("coldplay", [])
+    cache.save()
+
+    cache = PersistentCache(cache_path, max_entries=2)
+    cache.load()
+    assert cache.get("abba") is None
+    assert cache.get("queen") == ["rock", "glam rock"]
+    assert cache.get("coldplay") == []
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert round(cache.get_hit_rate(), 2) == 0.67
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = PersistentCache(str(tmp_path / "artist-genres.json"), ttl_seconds=60)
+    cache.put("queen", ["rock"])
+    cache.entries["queen"]["fetched_at"] = time.time() - 120
+
+    assert cache.get("queen") is None
+    assert len(cache) == 0
+
+
+def test_cover_cache_fetches_each_cover_once_and_evicts_by_size(tmp_path):
+    cache_folder = str(tmp_path / "unify-cache" / "covers")
+    fetched = []
+
+    def fetch_cover(image_url):
+        fetched.append(image_url)
+        return image_url.encode("ascii") * 10, "image/jpeg"
+
+    cover_cache = CoverArtCache(cache_folder, max_bytes=500)
+    cover_cache.load()
+    for image_url in ["https://i.scdn.co/image/a", "https://i.scdn.co/image/a", "https://i.scdn.co/image/b"]:
+        cover_cache.get_or_fetch(image_url, fetch_cover)
+    cover_cache.save()
+
+    assert fetched == ["https://i.scdn.co/image/a", "https://i.scdn.co/image/b"]
+    assert (cover_cache.hits, cover_cache.lookups) == (1, 3)
+
+    cover_cache = CoverArtCache(cache_folder, max_bytes=500)
+    cover_cache.load()
+    assert cover_cache.get_or_fetch("https://i.scdn.co/image/b", fetch_cover) == (
+        b"https://i.scdn.co/image/b" * 10, "image/jpeg")
+    assert len(fetched) == 2
+
+    def fail_fetch(image_url):
+        raise OSError("offline")
+
+    # a failed fetch is a miss, not a hit
+    with pytest.raises(OSError):
+        cover_cache.get_or_fetch("https://i.scdn.co/image/d", fail_fetch)
+    assert (cover_cache.hits, cover_cache.lookups, cover_cache.fetches) == (1, 2, 0)
+
+    # a third 250 byte cover pushes out the least recently used one, file included
+    cover_cache.get_or_fetch("https://i.scdn.co/image/c", fetch_cover)
+    assert cover_cache.index.get("https://i.scdn.co/image/a") is None
+    assert len(os.listdir(cache_folder)) == 3  # two covers + index.json
@@ -11,6 +11,7 @@ class FakePlaylistApp:
         self.playlist_id = ""
         self.playlist_name = ""
         self.playlist_jobs = []
+        self.prefetched_names = {}
 
     def get_playlist_id(self):
         self.playlist_id = self.playlist_url.rsplit("/", 1)[-1].split("?", 1)[0]
@@ -18,6 +19,10 @@ class FakePlaylistApp:
     def get_playlist_name(self):
         self.playlist_name = f"Playlist {self.playlist_id}"
 
+    def prefetch_playlist_names(self, playlist_jobs):
+        for playlist_job in playlist_jobs:
+            playlist_job["name"] = self.prefetched_names.get(playlist_job["id"])
+
 
 def build_args(**overrides):
     defaults = {
@@ -57,3 +62,17 @@ def test_config_playlist_url_string_expands_to_ordered_playlist_jobs():
     assert app.playlist_url == "https://open.spotify.com/playlist/first?si=1"
     assert app.playlist_id == "first"
     assert app.playlist_name == "Playlist first"
+
+
+def test_prefetched_playlist_names_are_kept_and_missing_ones_resolved():
+    app = FakePlaylistApp()
+    app.prefetched_names = {"first": "Road Trip"}
+    args = build_args(playlist_url=[
+        "https://open.spotify.com/playlist/first",
+        "https://open.spotify.com/playlist/second",
+    ])
+
+    configure_playlist(app, args)
+
+    assert [job["name"] for job in app.playlist_jobs] == ["Road Trip", "Playlist second"]
+    assert app.playlist_name == "Road Trip"
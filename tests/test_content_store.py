@@ -0,0 +1,104 @@
+import os
+
+from content_store import ContentStore
+
+
+def test_links_share_the_stored_file_and_garbage_collection_keeps_linked_entries(tmp_path):
+    store = ContentStore(str(tmp_path / "unify-store"))
+    downloaded_file = tmp_path / "temp.mp3"
+    downloaded_file.write_bytes(b"audio")
+
+    entry_path = store.add(str(downloaded_file), "track1", "mp3", "high")
+    assert store.get("track1", "mp3", "high") == entry_path
+    assert store.get("track1", "mp3", "normal") is None
+
+    first_link = str(tmp_path / "Road Trip.mp3")
+    second_link = str(tmp_path / "Liked.mp3")
+    assert store.link(entry_path, first_link) == "hardlink"
+    assert store.link(entry_path, second_link) == "hardlink"
+    assert store.holds(first_link)
+    assert os.stat(entry_path).st_nlink == 3
+
+    os.remove(first_link)
+    assert store.collect_garbage() == (0, 0)
+
+    os.remove(second_link)
+    assert store.collect_garbage() == (1, 5)
+    assert store.get("track1", "mp3", "high") is None
+
+
+def test_link_falls_back_to_a_copy_when_hardlinks_fail(tmp_path, monkeypatch):
+    store = ContentStore(str(tmp_path / "unify-store"))
+    downloaded_file = tmp_path / "temp.mp3"
+    downloaded_file.write_bytes(b"audio")
+    entry_path = store.add(str(downloaded_file), "track1", "mp3", "high")
+
+    def cross_device_link(source, destination):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device_link)
+    monkeypatch.setattr("content_store.reflink_file", lambda source, destination: False)
+
+    copied_file = str(tmp_path / "Road Trip.mp3")
+    assert store.link(entry_path, copied_file) == "copy"
+    assert open(copied_file, "rb").read() == b"audio"
+    assert store.holds(copied_file)
+    assert not store.holds(str(tmp_path / "temp.mp3"))
+
+
+def test_garbage_collection_keeps_entries_whose_copies_are_still_placed(tmp_path, monkeypatch):
+    store_folder = str(tmp_path / "unify-store")
+    store = ContentStore(store_folder)
+    store.load()
+    downloaded_file = tmp_path / "temp.mp3"
+    downloaded_file.write_bytes(b"audio")
+    entry_path = store.add(str(downloaded_file), "track1", "mp3", "high")
+
+    def cross_device_link(source, destination):
+        raise OSError(18, "Invalid cross-device link")
+
+    # a destination on another drive: no hardlink, no reflink, so the link count stays at 1
+    monkeypatch.setattr(os, "link", cross_device_link)
+    monkeypatch.setattr("content_store.reflink_file", lambda source, destination: False)
+
+    copied_file = tmp_path / "Road Trip.mp3"
+    store.link(entry_path, str(copied_file))
+    store.save()
+    assert os.stat(entry_path).st_nlink == 1
+
+    # the references survive into the next run
+    store = ContentStore(store_folder)
+    store.load()
+    assert store.collect_garbage() == (0, 0)
+    assert store.get("track1", "mp3", "high") == entry_path
+
+    # another file saved at the same path later is not the track
+    copied_file.write_bytes(b"another track")
+    assert store.collect_garbage() == (1, 5)
+    assert store.get("track1", "mp3", "high") is None
+    assert store.references == {}
+
+
+def test_placed_files_are_recognised_by_path_and_follow_their_latest_entry(tmp_path):
+    store_folder = str(tmp_path / "unify-store")
+    store = ContentStore(store_folder)
+    for track_id in ("playable", "other"):
+        downloaded_file = tmp_path / f"{track_id}.mp3"
+        downloaded_file.write_bytes(track_id.encode("ascii"))
+        store.add(str(downloaded_file), track_id, "mp3", "high")
+
+    # stored under the queued (playable) ID; the file's tags may name the relinked one
+    placed_file = str(tmp_path / "Road Trip.mp3")
+    store.link(store.get_entry_path("playable", "mp3", "high"), placed_file)
+    store.save()
+
+    store = ContentStore(store_folder)
+    store.load()
+    assert store.holds(placed_file)
+    assert not store.holds(str(tmp_path / "Liked.mp3"))
+
+    # the path now holds another track, so only that entry keeps a reference to it
+    store.link(store.get_entry_path("other", "mp3", "high"), placed_file)
+    assert store.collect_garbage() == (1, 8)
+    assert store.get("playable", "mp3", "high") is None
+    assert store.holds(placed_file)
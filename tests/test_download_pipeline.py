@@ -0,0 +1,67 @@
+import threading
+import time
+
+from download_pipeline import DownloadJob, DownloadPipeline, PipelineStage
+
+
+def test_failed_jobs_skip_later_stages_and_every_job_finishes():
+    tagged = []
+    finished = []
+
+    def download(job, worker_index):
+        return job.spotify_track["track_id"] != "2"
+
+    def tag(job, worker_index):
+        tagged.append(job.spotify_track["track_id"])
+
+    pipeline = DownloadPipeline(
+        [PipelineStage("download", download, 3), PipelineStage("tag", tag, 2)],
+        on_finished=finished.append,
+    )
+    pipeline.run(DownloadJob({"track_id": str(index)}) for index in range(6))
+
+    assert sorted(tagged) == ["0", "1", "3", "4", "5"]
+    assert sorted(job.spotify_track["track_id"] for job in finished) == [str(index) for index in range(6)]
+    assert [job.succeeded for job in finished if job.spotify_track["track_id"] == "2"] == [False]
+    assert pipeline.stages[0].count == 6
+    assert pipeline.stages[1].count == 5
+
+
+def test_stage_workers_run_concurrently():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def download(job, worker_index):
+        with lock:
+            active.append(worker_index)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(worker_index)
+
+    pipeline = DownloadPipeline([PipelineStage("download", download, 3)])
+    pipeline.run(DownloadJob({"track_id": str(index)}) for index in range(6))
+
+    assert max(peak) == 3
+
+
+def test_handler_exceptions_are_kept_and_raising_callbacks_do_not_hang():
+    finished = []
+
+    def download(job, worker_index):
+        if job.spotify_track["track_id"] == "1":
+            raise KeyError("save_as")
+
+    def on_finished(job):
+        finished.append(job)
+        raise RuntimeError("progress bar gone")
+
+    pipeline = DownloadPipeline([PipelineStage("download", download, 2)], on_finished=on_finished)
+    pipeline.run(DownloadJob({"track_id": str(index)}) for index in range(3))
+
+    failed_job = next(job for job in finished if job.spotify_track["track_id"] == "1")
+    assert (failed_job.succeeded, failed_job.error_stage) == (False, "download")
+    assert "KeyError: 'save_as'" in failed_job.error
+    assert len(finished) == 3
+    assert len(pipeline.callback_errors) == 3
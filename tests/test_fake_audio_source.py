@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from benchmarks.fake_audio_source import FakeAudioSource, FakeAudioSourceError, ThrottledReader
+
+
+def read_all(reader, chunk_size=1000):
+    chunks = []
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def test_reader_is_throttled_to_its_bandwidth():
+    started_at = time.perf_counter()
+    data = read_all(ThrottledReader(b"x" * 5000, bandwidth=50000))
+
+    assert data == b"x" * 5000
+    assert time.perf_counter() - started_at >= 0.09
+
+
+def test_failing_reader_raises_after_the_failure_point():
+    reader = ThrottledReader(b"x" * 5000, fail_at=2500)
+
+    assert reader.read(3000) == b"x" * 2500
+    with pytest.raises(FakeAudioSourceError):
+        reader.read(3000)
+
+
+def test_the_same_tracks_fail_on_every_run():
+    def failing_tracks(seed):
+        source = FakeAudioSource(failure_rate=0.3, seed=seed)
+        # skips rendering with ffmpeg
+        source.templates["high"] = b"x" * 100
+        failing = set()
+
+        for index in range(50):
+            size, reader = source.open(f"track{index}", "high")
+            assert size == 100
+            try:
+                read_all(reader)
+            except FakeAudioSourceError:
+                failing.add(index)
+
+        assert source.streams_failing == len(failing)
+        return failing
+
+    assert failing_tracks(0) == failing_tracks(0)
+    assert 0 < len(failing_tracks(0)) < 50
+    assert failing_tracks(0) != failing_tracks(1)
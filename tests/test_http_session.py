@@ -0,0 +1,46 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_session import create_http_session
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(1)
+
+        body = str(self.client_address[1]).encode("ascii")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_connections_and_applies_default_timeout(server_url):
+    session = create_http_session(timeout=(1, 0.2), retries=0, host_pool_sizes={"i.scdn.co": 4})
+
+    # the server echoes the client port, so a kept-alive connection answers the same twice
+    assert session.get(f"{server_url}/fast").text == session.get(f"{server_url}/fast").text
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(f"{server_url}/slow")
+
+    assert session.get_adapter("https://i.scdn.co/image/ab67").poolmanager.connection_pool_kw["maxsize"] == 4
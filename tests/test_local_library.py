@@ -0,0 +1,182 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from local_library import (
+    FOLDER_MTIME_GRANULARITY_NS,
+    LocalLibraryIndex,
+    folder_state_matches,
+    get_folder_state,
+    walk_library_folder,
+)
+
+TRACK_TAGS = {
+    "title": "Yellow",
+    "artist": "Coldplay",
+    "album": "Parachutes",
+    "track_uri": "spotify:track:3AJwUDP919kvQ9QcozQPxg",
+    "track_id": "3AJwUDP919kvQ9QcozQPxg",
+    "duration": 266773,
+}
+
+
+def write_file(path, content=b"audio"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+def test_index_serves_unchanged_and_moved_files_across_runs(tmp_path):
+    index_path = str(tmp_path / "unify-library-index.json")
+    file_path = str(tmp_path / "Liked" / "Yellow.mp3")
+    write_file(file_path)
+
+    library_index = LocalLibraryIndex(index_path)
+    library_index.load()
+    assert library_index.lookup(file_path, os.stat(file_path)) is None
+    library_index.store(file_path, os.stat(file_path), TRACK_TAGS)
+    library_index.save()
+
+    moved_path = str(tmp_path / "Road Trip" / "Yellow.mp3")
+    os.makedirs(os.path.dirname(moved_path))
+    os.rename(file_path, moved_path)
+
+    library_index = LocalLibraryIndex(index_path)
+    library_index.load()
+    assert library_index.lookup(moved_path, os.stat(moved_path)) == TRACK_TAGS
+    assert (library_index.hits, library_index.misses) == (1, 0)
+
+    write_file(moved_path, b"re-tagged audio")
+    assert library_index.lookup(moved_path, os.stat(moved_path)) is None
+    assert (library_index.hits, library_index.misses) == (1, 1)
+
+
+def test_prune_only_forgets_files_from_visited_folders(tmp_path):
+    library_index = LocalLibraryIndex(str(tmp_path / "unify-library-index.json"))
+    root_file = str(tmp_path / "Gone.mp3")
+    nested_file = str(tmp_path / "Nested" / "Kept.mp3")
+    write_file(root_file)
+    write_file(nested_file, b"other audio")
+
+    library_index.store(root_file, os.stat(root_file), TRACK_TAGS)
+    library_index.store(nested_file, os.stat(nested_file), TRACK_TAGS)
+
+    library_index.mark_folder_visited(str(tmp_path))
+    library_index.prune()
+
+    assert list(library_index.entries) == [os.path.normcase(nested_file)]
+
+
+def test_walk_matches_os_walk_order_and_depth(tmp_path):
+    for folder in ("b", "a/deep/deeper", "a/other", "c"):
+        os.makedirs(tmp_path / folder)
+    for file in ("1.mp3", "b/2.mp3", "a/3.mp3", "a/deep/4.mp3", "a/deep/deeper/5.mp3", "c/6.mp3"):
+        write_file(str(tmp_path / file))
+
+    root_folder = str(tmp_path)
+
+    for max_depth in (None, 0, 1, 2):
+        expected = []
+        for folder, subfolders, files in os.walk(root_folder):
+            if max_depth is not None and folder[len(root_folder):].count(os.sep) >= max_depth:
+                subfolders[:] = []
+            expected.append((folder, files))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert list(walk_library_folder(root_folder, max_depth, executor)) == expected
+
+        assert list(walk_library_folder(root_folder, max_depth)) == expected
+
+
+def test_unchanged_folders_are_served_from_their_snapshot(tmp_path):
+    index_path = str(tmp_path / "unify-library-index.json")
+    folder = tmp_path / "Liked"
+    file_path = str(folder / "Yellow.mp3")
+    write_file(file_path)
+    os.utime(folder, ns=(1_000_000_000, 1_000_000_000))
+
+    library_index = LocalLibraryIndex(index_path)
+    assert library_index.list_folder(str(folder)) == (["Yellow.mp3"], [])
+    library_index.store(file_path, os.stat(file_path), TRACK_TAGS)
+    library_index.save()
+
+    library_index = LocalLibraryIndex(index_path)
+    library_index.load()
+    assert library_index.list_folder(str(folder)) == (["Yellow.mp3"], [])
+    assert library_index.is_folder_unchanged(str(folder))
+    assert library_index.lookup(file_path, os.stat(file_path)) == TRACK_TAGS
+
+    # retagging in place leaves the folder's mtime alone, but not the file's signature
+    write_file(file_path, b"retagged audio")
+    os.utime(folder, ns=(1_000_000_000, 1_000_000_000))
+
+    library_index = LocalLibraryIndex(index_path)
+    library_index.load()
+    assert library_index.list_folder(str(folder)) == (["Yellow.mp3"], [])
+    assert library_index.is_folder_unchanged(str(folder))
+    assert library_index.lookup(file_path, os.stat(file_path)) is None
+
+    write_file(str(folder / "Clocks.mp3"))
+
+    library_index = LocalLibraryIndex(index_path)
+    library_index.load()
+    assert sorted(library_index.list_folder(str(folder))[0]) == ["Clocks.mp3", "Yellow.mp3"]
+    assert not library_index.is_folder_unchanged(str(folder))
+
+    os.utime(folder, ns=(1_000_000_000, 1_000_000_000))
+    library_index.list_folder(str(folder))
+    library_index.save()
+
+    library_index = LocalLibraryIndex(index_path, full_rescan=True)
+    library_index.load()
+    library_index.list_folder(str(folder))
+    assert not library_index.is_folder_unchanged(str(folder))
+
+
+def test_folder_state_read_right_after_a_sync_is_trusted_once_its_tick_has_passed(tmp_path):
+    folder = tmp_path / "Road Trip"
+    write_file(str(folder / "Yellow.mp3"))
+
+    # read straight after the sync wrote the folder, as its state is saved
+    folder_state = json.loads(json.dumps(get_folder_state(str(tmp_path))))
+    assert not folder_state_matches(str(tmp_path), folder_state)
+
+    # the next run comes after the mtime tick has passed
+    folder_state["recorded_at_ns"] -= FOLDER_MTIME_GRANULARITY_NS
+    assert folder_state_matches(str(tmp_path), folder_state)
+
+    # a file added within the same tick keeps the folder mtime, but not its file names
+    folder_mtime_ns = os.stat(folder).st_mtime_ns
+    write_file(str(folder / "Clocks.mp3"))
+    os.utime(folder, ns=(folder_mtime_ns, folder_mtime_ns))
+    assert not folder_state_matches(str(tmp_path), folder_state)
+
+    os.remove(str(folder / "Clocks.mp3"))
+    os.utime(folder, ns=(folder_mtime_ns, folder_mtime_ns))
+    assert folder_state_matches(str(tmp_path), folder_state)
+
+    # same names, but the folder was written again
+    os.utime(folder, ns=(folder_mtime_ns + 1, folder_mtime_ns + 1))
+    assert not folder_state_matches(str(tmp_path), folder_state)
+    assert get_folder_state(str(tmp_path / "missing")) is None
+
+
+def test_files_without_inode_numbers_only_match_by_path(tmp_path):
+    library_index = LocalLibraryIndex(str(tmp_path / "unify-library-index.json"))
+    first_path = str(tmp_path / "Yellow.mp3")
+    other_path = str(tmp_path / "Clocks.mp3")
+    write_file(first_path)
+    write_file(other_path)
+    # same size and mtime, as on a FAT drive where st_ino is always 0
+    mtime_ns = os.stat(first_path).st_mtime_ns
+    os.utime(other_path, ns=(mtime_ns, mtime_ns))
+
+    def stat_without_inode(path):
+        stat_result = os.stat(path)
+        return SimpleNamespace(st_size=stat_result.st_size, st_mtime_ns=stat_result.st_mtime_ns, st_ino=0)
+
+    library_index.store(first_path, stat_without_inode(first_path), TRACK_TAGS)
+
+    assert library_index.lookup(first_path, stat_without_inode(first_path)) == TRACK_TAGS
+    assert library_index.lookup(other_path, stat_without_inode(other_path)) is None
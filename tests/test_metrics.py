@@ -0,0 +1,92 @@
+import json
+from types import SimpleNamespace
+
+from urllib3.util.retry import RequestHistory
+
+from metrics import SyncMetrics, count_rate_limited_responses, format_textfile
+
+
+def test_stages_and_requests_add_up_across_calls(tmp_path):
+    metrics = SyncMetrics()
+
+    for _ in range(2):
+        with metrics.measure("download") as stage:
+            stage.items = 1
+            stage.bytes = 1000
+    metrics.record_request("spotipy", "playlist_items", 0.5, 200, 300)
+    metrics.record_request("spotipy", "playlist_items", 1.5, 429, rate_limited=1)
+    metrics.record_request("http", "spclient.wg.spotify.com", 0.1)
+
+    report_path = tmp_path / "reports" / "metrics.json"
+    metrics.write_report(str(report_path))
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+
+    download_stage = report["stages"][0]
+    assert (download_stage["stage"], download_stage["calls"], download_stage["items"], download_stage["bytes"]) == (
+        "download", 2, 2, 2000)
+    assert download_stage["buckets"][0] == 2
+    assert report["requests"][0] == {
+        "kind": "spotipy",
+        "name": "playlist_items",
+        "calls": 2,
+        "seconds": 2.0,
+        "errors": 1,
+        "rate_limited": 1,
+        "bytes": 300,
+    }
+    # no HTTP answer at all counts as an error
+    assert report["requests"][1]["errors"] == 1
+    assert not (tmp_path / "reports" / "metrics.json.tmp").exists()
+
+
+def test_stage_is_recorded_when_its_code_raises():
+    metrics = SyncMetrics()
+
+    try:
+        with metrics.measure("tagging"):
+            raise ValueError("broken file")
+    except ValueError:
+        pass
+
+    assert metrics.get_report()["stages"][0]["calls"] == 1
+
+
+def test_retried_rate_limits_are_counted():
+    history = (
+        RequestHistory("GET", "/v1/me/tracks", None, 429, None),
+        RequestHistory("GET", "/v1/me/tracks", None, 502, None),
+    )
+    response = SimpleNamespace(status_code=200, raw=SimpleNamespace(retries=SimpleNamespace(history=history)))
+
+    assert count_rate_limited_responses(response) == 1
+    assert count_rate_limited_responses(SimpleNamespace(status_code=429, raw=None)) == 1
+
+
+def test_textfile_has_cumulative_histograms_and_escaped_labels(tmp_path):
+    metrics = SyncMetrics()
+    metrics.add_stage("download", 0.03, items=1, bytes_count=500)
+    metrics.add_stage("download", 7.0, items=1, bytes_count=700)
+    metrics.add_tracks("downloaded", 2)
+    metrics.add_playlist("succeeded")
+    metrics.record_request("spotipy", 'odd "name"', 0.2, 429, rate_limited=1)
+
+    text = format_textfile(metrics.get_report(), {"lyrics": (3, 4), "covers": (0, 0)}, run_completed=True)
+    lines = text.splitlines()
+
+    assert 'unify_stage_duration_seconds_bucket{stage="download",le="0.01"} 0' in lines
+    assert 'unify_stage_duration_seconds_bucket{stage="download",le="0.05"} 1' in lines
+    assert 'unify_stage_duration_seconds_bucket{stage="download",le="+Inf"} 2' in lines
+    assert 'unify_stage_duration_seconds_count{stage="download"} 2' in lines
+    assert "unify_downloaded_bytes_total 1200" in lines
+    assert 'unify_tracks_total{state="downloaded"} 2' in lines
+    assert 'unify_playlists_total{result="succeeded"} 1' in lines
+    assert 'unify_requests_rate_limited_total{kind="spotipy",name="odd \\"name\\""} 1' in lines
+    assert 'unify_cache_hit_ratio{cache="lyrics"} 0.75' in lines
+    assert not any(line.startswith('unify_cache_hit_ratio{cache="covers"') for line in lines)
+    assert "unify_run_completed 1" in lines
+    assert text.endswith("\n")
+
+    textfile_path = tmp_path / "unify.prom"
+    metrics.write_textfile(str(textfile_path), run_completed=True)
+    assert textfile_path.read_text(encoding="utf-8").startswith("# HELP unify_run_started_timestamp_seconds")
+    assert [path.name for path in tmp_path.iterdir()] == ["unify.prom"]
@@ -0,0 +1,66 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from benchmarks.mock_spotify import MockLibrary, MockSpotifyServer, get_mock_playlist_id
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**kwargs):
+        server = MockSpotifyServer(MockLibrary(liked_count=5, playlist_count=2, playlist_size=4), **kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch_json(url):
+    with urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def test_liked_tracks_are_paged_with_next_links(start_server):
+    server = start_server(page_size=2)
+    url = f"{server.url}/v1/me/tracks?limit=50"
+    track_ids = []
+
+    while url:
+        page = fetch_json(url)
+        assert page["total"] == 5
+        track_ids.extend(item["track"]["id"] for item in page["items"])
+        url = page["next"]
+
+    assert len(track_ids) == len(set(track_ids)) == 5
+    assert server.get_stats()["requests"]["me/tracks"] == 3
+
+
+def test_neighbouring_playlists_share_half_of_their_tracks(start_server):
+    server = start_server()
+    first, second = (
+        [item["track"]["id"] for item in fetch_json(f"{server.url}/v1/playlists/{get_mock_playlist_id(index)}/tracks")["items"]]
+        for index in range(2)
+    )
+
+    assert first[2:] == second[:2]
+    assert fetch_json(f"{server.url}/v1/playlists/{get_mock_playlist_id(1)}")["name"] == "Playlist 1"
+
+
+def test_rate_limited_requests_carry_retry_after(start_server):
+    server = start_server(rate_limit_every=2, retry_after=3)
+
+    fetch_json(f"{server.url}/v1/me/tracks")
+    with pytest.raises(HTTPError) as error:
+        fetch_json(f"{server.url}/v1/me/tracks")
+
+    assert error.value.code == 429
+    assert error.value.headers["Retry-After"] == "3"
+    assert server.get_stats()["total_rate_limited"] == 1
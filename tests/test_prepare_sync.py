@@ -0,0 +1,109 @@
+import copy
+import os
+import time
+
+from mutagen.id3 import COMM, ID3, TALB, TIT2, TPE1
+
+import local_library
+import unify
+from main import finish_sync, prepare_sync
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames of silence, 1152 samples each
+MP3_FRAME = b"\xff\xfb\x90\x00" + b"\x00" * 413
+MP3_FRAME_COUNT = 400
+MP3_DURATION = round(MP3_FRAME_COUNT * 1152 / 44100 * 1000)
+
+
+def build_spotify_track(track_id, title, album="Parachutes"):
+    return {
+        "title": title,
+        "artist": "Coldplay",
+        "album": album,
+        "duration": MP3_DURATION,
+        "added_at": "2024-01-01T00:00:00Z",
+        "track_id": track_id,
+        "track_uri": f"spotify:track:{track_id}",
+        "match_track_ids": {track_id},
+        "match_track_uris": {f"spotify:track:{track_id}"},
+        "artist_ids": ["coldplay"],
+        "is_local": False,
+        "is_playable": True,
+        "save_as": "",
+    }
+
+
+def write_track_file(folder, file_name, spotify_track):
+    file_path = os.path.join(folder, file_name)
+    with open(file_path, "wb") as file:
+        file.write(MP3_FRAME * MP3_FRAME_COUNT)
+
+    tags = ID3()
+    tags.add(TIT2(encoding=3, text=spotify_track["title"]))
+    tags.add(TPE1(encoding=3, text=spotify_track["artist"]))
+    tags.add(TALB(encoding=3, text=spotify_track["album"]))
+    tags.add(COMM(encoding=3, lang="eng", desc="", text=spotify_track["track_uri"]))
+    tags.save(file_path)
+    return file_path
+
+
+class FolderUnify(unify.Unify):
+    """Syncs a fixed track list into a folder, with the playlist snapshot check and Spotify left out."""
+
+    def __init__(self, runtime_folder, playlist_folder, spotify_tracks):
+        self.runtime_folder = runtime_folder
+        super().__init__()
+        self.config["download_format"] = "mp3"
+        self.option_type = "playlist"
+        self.playlist_id = "37i9dQZF1DXcBWIGoYBM5M"
+        self.local_playlist_folder = playlist_folder
+        self.spotify_tracks = spotify_tracks
+
+    def get_runtime_base_folder(self):
+        return self.runtime_folder
+
+    def is_playlist_unchanged(self):
+        return False
+
+    def get_spotify_tracks_raw(self):
+        for spotify_track in copy.deepcopy(self.spotify_tracks):
+            self.spotify_tracks_raw.append(spotify_track)
+            self.spotify_track_ids.update(spotify_track["match_track_ids"])
+
+        return True
+
+
+class SnapshotFolderUnify(FolderUnify):
+    """FolderUnify that checks the playlist snapshot, answered with a fixed snapshot_id."""
+
+    is_playlist_unchanged = unify.Unify.is_playlist_unchanged
+
+    def call_spotipy(self, method_name, *args, **kwargs):
+        assert method_name == "playlist"
+        return {"snapshot_id": "snapshot-1"}
+
+
+def test_next_run_skips_a_playlist_the_last_sync_changed(tmp_path, monkeypatch):
+    monkeypatch.setattr(unify, "send2trash", os.remove)
+    monkeypatch.setattr(local_library, "FOLDER_MTIME_GRANULARITY_NS", 50_000_000)
+    runtime_folder = str(tmp_path / "runtime")
+    folder = str(tmp_path / "Road Trip")
+    os.makedirs(runtime_folder)
+    os.makedirs(folder)
+
+    yellow = build_spotify_track("yellow", "Yellow")
+    write_track_file(folder, "Yellow.mp3", yellow)
+    write_track_file(folder, "Sparks.mp3", build_spotify_track("sparks", "Sparks"))
+
+    # the sync removes Sparks, so the folder's mtime is fresh when its state is saved
+    app = SnapshotFolderUnify(runtime_folder, folder, [yellow])
+    app.prepare_runtime_state()
+    assert prepare_sync(app)
+    assert not app.playlist_unchanged
+    finish_sync(app, True)
+
+    time.sleep(0.1)
+    next_run = SnapshotFolderUnify(runtime_folder, folder, [yellow])
+    next_run.get_spotify_tracks_raw = None
+    next_run.prepare_runtime_state()
+    assert prepare_sync(next_run)
+    assert next_run.playlist_unchanged
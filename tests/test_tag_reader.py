@@ -0,0 +1,145 @@
+import base64
+import struct
+
+import music_tag
+import pytest
+from mutagen.flac import Picture
+from mutagen.id3 import APIC, COMM, ID3, TALB, TIT2, TPE1
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.ogg import OggPage
+from mutagen.oggvorbis import OggVorbis
+
+from tag_reader import read_track_tags
+
+
+def build_ogg_page(packets, sequence, position, first=False, last=False):
+    page = OggPage()
+    page.serial = 1234
+    page.sequence = sequence
+    page.position = position
+    page.first = first
+    page.last = last
+    page.packets = packets
+    return page.write()
+
+
+def write_silent_ogg_vorbis(path, seconds):
+    sample_rate = 44100
+    identification = (
+        b"\x01vorbis" + struct.pack("<IBIiiiBB", 0, 2, sample_rate, 0, 160000, 0, 0xb8, 1))
+    comment = b"\x03vorbis" + struct.pack("<I", 4) + b"test" + struct.pack("<I", 0) + b"\x01"
+    setup = b"\x05vorbis" + b"\x00" * 32
+
+    with open(path, "wb") as file:
+        file.write(build_ogg_page([identification], 0, 0, first=True))
+        file.write(build_ogg_page([comment, setup], 1, 0))
+        file.write(build_ogg_page([b"\x00" * 64], 2, sample_rate * seconds, last=True))
+
+
+def write_silent_mp3(path, frame_count):
+    # MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames of silence
+    frame = b"\xff\xfb\x90\x00" + b"\x00" * 413
+    with open(path, "wb") as file:
+        file.write(frame * frame_count)
+
+
+def build_mp4_atom(name, body):
+    return struct.pack(">I4s", 8 + len(body), name) + body
+
+
+def write_silent_m4a(path, seconds):
+    sample_rate = 44100
+    matrix = struct.pack(">9I", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    mvhd = build_mp4_atom(
+        b"mvhd",
+        struct.pack(">4x4I", 0, 0, 1000, seconds * 1000) + struct.pack(">IH10x", 0x10000, 0x100) + matrix +
+        b"\x00" * 24 + struct.pack(">I", 2))
+    mdhd = build_mp4_atom(b"mdhd", struct.pack(">4x4I2H", 0, 0, sample_rate, sample_rate * seconds, 0x55c4, 0))
+    hdlr = build_mp4_atom(b"hdlr", struct.pack(">4xI4s12x", 0, b"soun") + b"SoundHandler\x00")
+
+    with open(path, "wb") as file:
+        file.write(build_mp4_atom(b"ftyp", b"M4A \x00\x00\x00\x00M4A mp42isom"))
+        file.write(build_mp4_atom(b"moov", mvhd + build_mp4_atom(b"trak", build_mp4_atom(b"mdia", mdhd + hdlr))))
+        file.write(build_mp4_atom(b"mdat", b""))
+
+
+def build_cover():
+    return b"\xff\xd8" + b"\x00" * 150000
+
+
+def get_music_tag_values(file_path):
+    music_file = music_tag.load_file(file_path)
+    return {
+        "title": str(music_file["tracktitle"]),
+        "artist": str(music_file["artist"]),
+        "album": str(music_file["album"]),
+        "comment": str(music_file["comment"]),
+        "length": float(str(music_file["#length"])),
+    }
+
+
+@pytest.mark.parametrize("id3_version", [3, 4])
+def test_mp3_header_reader_matches_music_tag_and_skips_cover(tmp_path, id3_version):
+    file_path = str(tmp_path / "Song.mp3")
+    write_silent_mp3(file_path, 200)
+
+    id3_tag = ID3()
+    id3_tag.add(TIT2(encoding=3, text="Don’t  Stop Me Now "))
+    id3_tag.add(TPE1(encoding=1, text=["Queen", "Freddie Mercury"]))
+    id3_tag.add(TALB(encoding=0, text="Jazz"))
+    id3_tag.add(COMM(encoding=3, lang="eng", desc="", text="spotify:track:7hQJA50XrCWABAu5v6QZ4i"))
+    # larger than 127 bytes, so its v2.4 syncsafe size differs from a plain one
+    id3_tag.add(APIC(encoding=0, mime="image/jpeg", type=3, desc="", data=build_cover()))
+    id3_tag.save(file_path, v2_version=id3_version)
+
+    assert read_track_tags(file_path) == get_music_tag_values(file_path)
+
+
+def test_m4a_header_reader_matches_music_tag_and_skips_cover(tmp_path):
+    file_path = str(tmp_path / "Song.m4a")
+    write_silent_m4a(file_path, 183)
+
+    mp4_file = MP4(file_path)
+    mp4_file["\xa9nam"] = "Don’t  Stop Me Now "
+    mp4_file["\xa9ART"] = ["Queen", "Freddie Mercury"]
+    mp4_file["\xa9alb"] = "Jazz"
+    mp4_file["\xa9cmt"] = "spotify:track:7hQJA50XrCWABAu5v6QZ4i"
+    mp4_file["covr"] = [MP4Cover(build_cover(), MP4Cover.FORMAT_JPEG)]
+    mp4_file.save()
+
+    assert read_track_tags(file_path) == get_music_tag_values(file_path)
+
+
+def test_ogg_header_reader_matches_music_tag_and_skips_cover(tmp_path):
+    file_path = str(tmp_path / "Song.ogg")
+    write_silent_ogg_vorbis(file_path, 183)
+
+    picture = Picture()
+    picture.type = 3
+    picture.mime = "image/jpeg"
+    picture.data = b"\xff\xd8" + b"\x00" * 150000
+
+    ogg_file = OggVorbis(file_path)
+    ogg_file["title"] = "Don’t  Stop Me Now "
+    ogg_file["artist"] = ["Queen", "Freddie Mercury"]
+    ogg_file["album"] = "Jazz"
+    ogg_file["comment"] = "spotify:track:7hQJA50XrCWABAu5v6QZ4i"
+    ogg_file["metadata_block_picture"] = base64.b64encode(picture.write()).decode("ascii")
+    ogg_file.save()
+
+    music_file = music_tag.load_file(file_path)
+
+    assert read_track_tags(file_path) == {
+        "title": str(music_file["tracktitle"]),
+        "artist": str(music_file["artist"]),
+        "album": str(music_file["album"]),
+        "comment": str(music_file["comment"]),
+        "length": float(str(music_file["#length"])),
+    }
+
+
+def test_unrecognised_files_fall_back_to_full_parse(tmp_path):
+    file_path = tmp_path / "Song.mp3"
+    file_path.write_bytes(b"\xff\xfb" + b"\x00" * 100)
+
+    assert read_track_tags(str(file_path)) is None
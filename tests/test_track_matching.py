@@ -0,0 +1,74 @@
+import random
+
+from track_matching import TrackMatchIndex, tracks_match
+
+TITLES = ["Yellow", "yellow ", "Don’t Stop", "Don't Stop", "Café", "Café"]
+ARTISTS = ["Coldplay", "COLDPLAY", "Queen", "Sigur Rós"]
+ALBUMS = ["Parachutes", "Jazz", "( )"]
+
+
+def build_track(rng, prefix, index):
+    track_id = f"id{rng.randrange(40)}"
+    track = {
+        "title": rng.choice(TITLES),
+        "artist": rng.choice(ARTISTS),
+        "album": rng.choice(ALBUMS),
+        "duration": rng.randrange(180000, 190000),
+        "track_id": track_id,
+        "track_uri": f"spotify:track:{track_id}",
+        "match_track_ids": {track_id},
+        "match_track_uris": {f"spotify:track:{track_id}"},
+        "file_path": f"{prefix}-{index}",
+    }
+
+    if rng.random() < 0.2:
+        linked_id = f"id{rng.randrange(40)}"
+        track["match_track_ids"].add(linked_id)
+        track["match_track_uris"].add(f"spotify:track:{linked_id}")
+
+    if rng.random() < 0.2:
+        # local files without a Spotify URI comment
+        track["track_id"] = ""
+        track["track_uri"] = ""
+        track["match_track_ids"] = set()
+        track["match_track_uris"] = set()
+
+    return track
+
+
+def test_index_returns_same_first_match_as_linear_scan():
+    rng = random.Random(7)
+    spotify_tracks = [build_track(rng, "spotify", index) for index in range(300)]
+    local_tracks = [build_track(rng, "local", index) for index in range(300)]
+
+    local_tracks_index = TrackMatchIndex(local_tracks)
+    matched_paths = set()
+
+    for spotify_track in spotify_tracks:
+        expected = next(
+            (
+                local_track for local_track in local_tracks
+                if local_track["file_path"] not in matched_paths and tracks_match(spotify_track, local_track)
+            ),
+            None
+        )
+
+        assert local_tracks_index.find(spotify_track) is expected
+
+        if expected is not None:
+            matched_paths.add(expected["file_path"])
+            local_tracks_index.remove(expected)
+
+
+def test_index_applies_duration_tolerance_across_buckets():
+    local_track = {
+        "title": "Song", "artist": "Artist", "album": "Album", "duration": 201999,
+        "track_id": "", "track_uri": "", "match_track_ids": set(), "match_track_uris": set(),
+    }
+    local_tracks_index = TrackMatchIndex([local_track])
+
+    query = dict(local_track, track_id="other", match_track_ids={"other"}, match_track_uris={"spotify:track:other"})
+
+    assert local_tracks_index.find(dict(query, duration=203999)) is local_track
+    assert local_tracks_index.find(dict(query, duration=199999)) is local_track
+    assert local_tracks_index.find(dict(query, duration=204000)) is None
@@ -0,0 +1,62 @@
+from track_store import TrackStore
+
+
+def build_track(track_id, title, added_at):
+    return {
+        "track_id": track_id,
+        "title": title,
+        "artist": "Queen",
+        "album": "A Night at the Opera",
+        "albumartist": "Queen",
+        "disc_number": 1,
+        "total_tracks": 12,
+        "track_number": 11,
+        "release_date": "1975-11-21",
+        "duration": 354000,
+        "image_url": "https://i.scdn.co/image/cover",
+        "track_url": f"https://open.spotify.com/track/{track_id}",
+        "track_uri": f"spotify:track:{track_id}",
+        "linked_from_id": None,
+        "linked_from_uri": None,
+        "artist_ids": ["queen"],
+        "match_track_ids": {track_id},
+        "match_track_uris": {f"spotify:track:{track_id}"},
+        "is_playable": True,
+        "added_at": added_at,
+    }
+
+
+def test_source_is_loaded_back_only_for_the_same_snapshot(tmp_path):
+    store = TrackStore(str(tmp_path / "unify-tracks.sqlite3"))
+    tracks = [
+        build_track("b", "Bohemian Rhapsody", "2024-01-02T00:00:00Z"),
+        build_track("a", "Love of My Life", "2024-01-01T00:00:00Z"),
+    ]
+
+    assert store.save_source("playlist:1", tracks, "snap1", "US") == 2
+
+    assert store.load_source("playlist:1", "snap1", "US") == tracks
+    assert store.load_source("playlist:1", "snap2", "US") is None
+    assert store.load_source("playlist:1", "snap1", "DE") is None
+    assert store.load_source("liked", None) is None
+
+
+def test_source_older_than_max_age_is_not_loaded(tmp_path):
+    store = TrackStore(str(tmp_path / "unify-tracks.sqlite3"))
+    tracks = [build_track("a", "Love of My Life", "2024-01-01T00:00:00Z")]
+    store.save_source("playlist:1", tracks, "snap1")
+
+    assert store.load_source("playlist:1", "snap1", max_age_seconds=3600) == tracks
+    assert store.load_source("playlist:1", "snap1", max_age_seconds=-1) is None
+
+
+def test_only_changed_tracks_are_rewritten(tmp_path):
+    store = TrackStore(str(tmp_path / "unify-tracks.sqlite3"))
+    tracks = [build_track("a", "Love of My Life", "2024-01-01T00:00:00Z")]
+    store.save_source("playlist:1", tracks, "snap1")
+
+    assert store.save_source("playlist:2", tracks, "snap1") == 0
+
+    tracks[0]["is_playable"] = False
+    assert store.save_source("playlist:2", tracks, "snap2") == 1
+    assert store.load_source("playlist:1", "snap1")[0]["is_playable"] is False
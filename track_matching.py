@@ -0,0 +1,129 @@
+import re
+import unicodedata
+from collections import defaultdict, deque
+
+DURATION_TOLERANCE_MS = 2000
+
+
+def normalize_text(value):
+    normalized = unicodedata.normalize('NFKC', str(value or ''))
+    normalized = normalized.replace('\u2019', "'").replace('\u2018', "'")
+    normalized = normalized.replace('\u2013', "-").replace('\u2014', "-")
+    normalized = re.sub(r'\s+', ' ', normalized)
+    return normalized.strip().lower()
+
+
+def get_track_match_keys(track):
+    track_ids = track.get('match_track_ids') or {track.get('track_id')}
+    track_uris = track.get('match_track_uris') or {track.get('track_uri')}
+    return track_ids, track_uris
+
+
+def get_track_metadata_key(track):
+    return (
+        normalize_text(track['title']),
+        normalize_text(track['artist']),
+        normalize_text(track['album']),
+    )
+
+
+def get_duration_bucket(duration):
+    return int(duration // DURATION_TOLERANCE_MS)
+
+
+def tracks_match(spotify_track, local_track):
+    spotify_track_ids, spotify_track_uris = get_track_match_keys(spotify_track)
+    local_track_ids, local_track_uris = get_track_match_keys(local_track)
+
+    if spotify_track_ids & local_track_ids:
+        return True
+
+    if spotify_track_uris & local_track_uris:
+        return True
+
+    return (
+        normalize_text(spotify_track['title']) == normalize_text(local_track['title']) and
+        normalize_text(spotify_track['artist']) == normalize_text(local_track['artist']) and
+        normalize_text(spotify_track['album']) == normalize_text(local_track['album']) and
+        abs(spotify_track['duration'] - local_track['duration']) <= DURATION_TOLERANCE_MS
+    )
+
+
+class TrackMatchIndex:
+    """Answer `tracks_match` lookups against a fixed track list without scanning it.
+
+    `find` returns the same track `next(t for t in tracks if tracks_match(query, t))`
+    would, i.e. the earliest match in list order, skipping tracks passed to `remove`.
+    """
+
+    def __init__(self, tracks):
+        self.tracks = list(tracks)
+        self.removed_positions = set()
+        self.positions_by_track = {id(track): position for position, track in enumerate(self.tracks)}
+
+        # deques, so removed positions are dropped from the front in O(1)
+        self.positions_by_id = defaultdict(deque)
+        self.positions_by_uri = defaultdict(deque)
+        # (title, artist, album) -> duration bucket -> positions
+        self.positions_by_metadata = defaultdict(lambda: defaultdict(list))
+
+        for position, track in enumerate(self.tracks):
+            track_ids, track_uris = get_track_match_keys(track)
+
+            for track_id in track_ids:
+                self.positions_by_id[track_id].append(position)
+
+            for track_uri in track_uris:
+                self.positions_by_uri[track_uri].append(position)
+
+            metadata_buckets = self.positions_by_metadata[get_track_metadata_key(track)]
+            metadata_buckets[get_duration_bucket(track['duration'])].append(position)
+
+    def __len__(self):
+        return len(self.tracks) - len(self.removed_positions)
+
+    def get_first_available_position(self, positions):
+        # Removed positions never come back, so drop them from the front as we go.
+        while positions and positions[0] in self.removed_positions:
+            positions.popleft()
+
+        return positions[0] if positions else None
+
+    def find_position(self, track):
+        candidates = []
+        track_ids, track_uris = get_track_match_keys(track)
+
+        for track_id in track_ids:
+            position = self.get_first_available_position(self.positions_by_id.get(track_id))
+            if position is not None:
+                candidates.append(position)
+
+        for track_uri in track_uris:
+            position = self.get_first_available_position(self.positions_by_uri.get(track_uri))
+            if position is not None:
+                candidates.append(position)
+
+        metadata_buckets = self.positions_by_metadata.get(get_track_metadata_key(track))
+        if metadata_buckets:
+            duration = track['duration']
+            bucket = get_duration_bucket(duration)
+
+            for nearby_bucket in (bucket - 1, bucket, bucket + 1):
+                for position in metadata_buckets.get(nearby_bucket, ()):
+                    if position in self.removed_positions:
+                        continue
+
+                    if abs(self.tracks[position]['duration'] - duration) <= DURATION_TOLERANCE_MS:
+                        candidates.append(position)
+                        break
+
+        return min(candidates) if candidates else None
+
+    def find(self, track):
+        position = self.find_position(track)
+        return self.tracks[position] if position is not None else None
+
+    def remove(self, track):
+        position = self.positions_by_track.get(id(track))
+        if position is not None:
+            self.removed_positions.add(position)
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+TRACK_STORE_VERSION = 1
+
+# normalized columns of a Spotify track; list-valued ones are stored as JSON
+TRACK_COLUMNS = (
+    "track_id",
+    "title",
+    "artist",
+    "album",
+    "albumartist",
+    "disc_number",
+    "total_tracks",
+    "track_number",
+    "release_date",
+    "duration",
+    "image_url",
+    "track_url",
+    "track_uri",
+    "linked_from_id",
+    "linked_from_uri",
+    "artist_ids",
+    "match_track_ids",
+    "match_track_uris",
+    "is_playable",
+)
+LIST_COLUMNS = {"artist_ids", "match_track_ids", "match_track_uris"}
+SET_COLUMNS = {"match_track_ids", "match_track_uris"}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tracks (
+    {", ".join(f"{column}{' PRIMARY KEY' if column == 'track_id' else ''}" for column in TRACK_COLUMNS)},
+    record_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    snapshot_id TEXT,
+    region TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS memberships (
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    added_at TEXT,
+    PRIMARY KEY (source, position)
+);
+"""
+
+
+def get_track_row(spotify_track):
+    row = []
+
+    for column in TRACK_COLUMNS:
+        value = spotify_track[column]
+        if column in LIST_COLUMNS:
+            value = json.dumps(sorted(value) if column in SET_COLUMNS else list(value))
+        row.append(value)
+
+    record_hash = hashlib.sha1(json.dumps(row).encode("utf-8")).hexdigest()
+    return row + [record_hash]
+
+
+def get_track_record(row):
+    record = {}
+
+    for column, value in zip(TRACK_COLUMNS, row):
+        if column in LIST_COLUMNS:
+            value = json.loads(value)
+            if column in SET_COLUMNS:
+                value = set(value)
+        elif column == "is_playable" and value is not None:
+            value = bool(value)
+        record[column] = value
+
+    return record
+
+
+class TrackStore:
+    """SQLite snapshot cache of normalized Spotify tracks and the order of each playlist.
+
+    A source is one playlist. Its membership is saved with the snapshot_id and market it
+    was fetched with, so a later sync of an unchanged playlist can rebuild its tracks from
+    the store instead of paging through the Web API. Availability (is_playable,
+    linked_from) can change without a new snapshot_id, so callers bound how old a
+    reused source may be. Each call uses its own connection, so playlists synced
+    concurrently can share a store.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.initialized = False
+        self.lock = threading.Lock()
+
+    def connect(self):
+        with self.lock:
+            if not self.initialized:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                self.initialize(sqlite3.connect(self.db_path, timeout=30))
+                self.initialized = True
+
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def initialize(self, connection):
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != TRACK_STORE_VERSION:
+                connection.executescript(
+                    "DROP TABLE IF EXISTS tracks; DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS memberships;")
+                connection.execute(f"PRAGMA user_version = {TRACK_STORE_VERSION}")
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+
+    def save_source(self, source, spotify_tracks, snapshot_id=None, region=None):
+        """Upsert the tracks and replace the source's membership; returns the rows that changed."""
+        track_rows = {}
+        for spotify_track in spotify_tracks:
+            track_rows[spotify_track["track_id"]] = get_track_row(spotify_track)
+
+        placeholders = ", ".join("?" for _ in range(len(TRACK_COLUMNS) + 2))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in TRACK_COLUMNS[1:])
+        now = time.time()
+
+        connection = self.connect()
+        try:
+            with connection:
+                changes_before = connection.total_changes
+                # rows whose normalized record is unchanged are left alone
+                connection.executemany(
+                    f"INSERT INTO tracks ({', '.join(TRACK_COLUMNS)}, record_hash, updated_at) "
+                    f"VALUES ({placeholders}) "
+                    f"ON CONFLICT(track_id) DO UPDATE SET {updates}, "
+                    "record_hash = excluded.record_hash, updated_at = excluded.updated_at "
+                    "WHERE tracks.record_hash != excluded.record_hash",
+                    (row + [now] for row in track_rows.values()),
+                )
+                changed_tracks = connection.total_changes - changes_before
+
+                connection.execute("DELETE FROM memberships WHERE source = ?", (source,))
+                connection.executemany(
+                    "INSERT INTO memberships (source, position, track_id, added_at) VALUES (?, ?, ?, ?)",
+                    (
+                        (source, position, spotify_track["track_id"], spotify_track["added_at"])
+                        for position, spotify_track in enumerate(spotify_tracks)
+                    ),
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO sources (source, snapshot_id, region, updated_at) VALUES (?, ?, ?, ?)",
+                    (source, snapshot_id, region, now),
+                )
+        finally:
+            connection.close()
+
+        return changed_tracks
+
+    def load_source(self, source, snapshot_id, region=None, max_age_seconds=None):
+        """Return the source's tracks in saved order with their added_at.
+
+        None if the snapshot or market differs, or the source was saved more than
+        max_age_seconds ago.
+        """
+        if not snapshot_id:
+            return None
+
+        connection = self.connect()
+        try:
+            saved_source = connection.execute(
+                "SELECT snapshot_id, region, updated_at FROM sources WHERE source = ?", (source,)).fetchone()
+            if saved_source is None or saved_source[:2] != (snapshot_id, region):
+                return None
+
+            if max_age_seconds is not None and time.time() - saved_source[2] > max_age_seconds:
+                return None
+
+            rows = connection.execute(
+                f"SELECT {', '.join(f't.{column}' for column in TRACK_COLUMNS)}, m.added_at "
+                "FROM memberships m JOIN tracks t ON t.track_id = m.track_id "
+                "WHERE m.source = ? ORDER BY m.position",
+                (source,),
+            ).fetchall()
+        finally:
+            connection.close()
+
+        spotify_tracks = []
+        for row in rows:
+            spotify_track = get_track_record(row[:-1])
+            spotify_track["added_at"] = row[-1]
+            spotify_tracks.append(spotify_track)
+
+        return spotify_tracks
@@ -1,35 +1,40 @@
 # Built-in
 import os
+import base64
 import re
 import json
 import math
 import sys
 import time
+import copy
 import ctypes
 import platform
-import unicodedata
 import shutil
+import itertools
+import subprocess
+import threading
 import webbrowser
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from tkinter import Tk, filedialog
+from urllib.parse import urlsplit
 
 # 3rd-party
-import ffmpy
 import music_tag
 import mutagen.id3
-import requests
+import mutagen.flac
+import mutagen.oggvorbis
 import spotipy
 
 from dotenv import load_dotenv
 from librespot.core import Session
-from librespot.metadata import TrackId
-from librespot.audio.decoders import AudioQuality, VorbisOnlyAudioQuality
 from send2trash import send2trash
 from spotipy import SpotifyException
 from spotipy.oauth2 import SpotifyOAuth
 
-from rich.console import Group
+from rich.console import Console, Group
 from rich.live import Live
 from rich.panel import Panel
 from rich.progress import (
@@ -43,6 +48,17 @@ from rich.progress import (
     TimeRemainingColumn
 )
 
+from audio_source import LibrespotAudioSource
+from caches import CoverArtCache, PersistentCache
+from content_store import ContentStore
+from download_pipeline import DownloadJob, DownloadPipeline, PipelineStage
+from http_session import SPOTIFY_IMAGE_HOST, SPOTIFY_LYRICS_HOST, create_http_session
+from local_library import LocalLibraryIndex, folder_state_matches, get_folder_state, walk_library_folder
+from metrics import SyncMetrics, count_rate_limited_responses
+from tag_reader import read_track_tags
+from track_store import TrackStore
+from track_matching import TrackMatchIndex, normalize_text, tracks_match
+
 VALID_DOWNLOAD_FORMATS = frozenset({"mp3", "m4a", "ogg", "opus"})
 LEGACY_DOWNLOAD_FORMAT_ALIASES = {
     "aac": "m4a",
@@ -50,6 +66,29 @@ LEGACY_DOWNLOAD_FORMAT_ALIASES = {
     "vorbis": "ogg",
 }
 
+# lines of a streaming ffmpeg's stderr kept for the error message
+FFMPEG_STDERR_TAIL_LINES = 20
+
+# seconds between metrics textfile rewrites while downloads finish
+METRICS_TEXTFILE_INTERVAL = 15
+
+# transcode_priority -> (POSIX nice increment, Windows priority class)
+TRANSCODE_PRIORITIES = {
+    "normal": (0, 0x00000020),
+    "low": (10, 0x00004000),
+    "idle": (19, 0x00000040),
+}
+
+
+class FetchUrlError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LyricsNotAvailableError(ValueError):
+    pass
+
 
 def normalize_download_format(value):
     if value is None:
@@ -126,6 +165,34 @@ class Unify:
             "transcode_bitrate": "auto",
             "chunk_size": 20000,
             "retry_attempts": 0,
+            "fetch_concurrency": 4,
+            "spotify_api_url": None,
+            "spotify_client_url": "https://spclient.wg.spotify.com",
+            "http_pool_size": 16,
+            "http_connect_timeout": 5,
+            "http_read_timeout": 30,
+            "scan_workers": 8,
+            "full_rescan": False,
+            "download_jobs": 1,
+            "transcode_jobs": None,
+            "transcode_priority": "normal",
+            "transcode_threads": None,
+            "transcode_queue_size": 2,
+            "stream_transcode": False,
+            "genre_cache_ttl_days": 30,
+            "genre_cache_max_entries": 50000,
+            "cover_cache_max_mb": 200,
+            "lyrics_cache_ttl_days": 90,
+            "lyrics_cache_miss_ttl_hours": 24,
+            "lyrics_cache_max_entries": 50000,
+            "tag_jobs": 2,
+            "content_store": False,
+            "track_store": False,
+            "track_store_max_age_hours": 24,
+            "metrics_summary": True,
+            "metrics_report": None,
+            "metrics_textfile": None,
+            "content_store_folder": None,
             "archive_folder": None,
             "temp_download_folder": self.get_default_temp_download_folder(),
         }
@@ -169,22 +236,43 @@ class Unify:
         self.local_track_ids = set()
 
         # Download handler
-        self.temp_download_file = ''
-        self.temp_transcode_file = ''
-        self.final_output_file = ''
-        self.currently_downloading_track = {}
-        self.newly_downloaded_track = {}
-        self.newly_downloaded_track_genres = ''
-        self.newly_downloaded_track_lyrics = ''
+        self.spotify_tracks_failed = []
+        self.spotify_tracks_downloaded = []
+        # (spotify track, stage, traceback) of every job a stage handler raised for
+        self.download_errors = []
+        self.track_matches = []
+        self.artist_genres = {}
+        self.genre_cache = None
+        self.cover_cache = None
+        self.lyrics_cache = None
+        self.http_session = None
+        self.content_store = None
+        self.track_store = None
+        self.download_pipeline = None
+        self.metrics = SyncMetrics()
+        self.metrics_textfile_lock = threading.Lock()
+        self.metrics_textfile_written_at = 0.0
+        # 429s and bytes of the last Spotify Web API response, per thread
+        self.spotipy_response_stats = threading.local()
+        # where downloads read Ogg Vorbis from; None uses librespot
+        self.audio_source = None
+        # track ID -> [(playlist app, spotify track)] when several playlists share one download queue
+        self.download_targets = {}
+        # set while several playlist apps scan their folders into one library index
+        self.shared_library_index = None
 
         # Progress
         self.completed_index = 0
+        self.progress_lock = threading.Lock()
         self.progress_bar_text = ''
 
         # Other
         self.set_file_mtime_from_added_at = False
         self.did_partial_library_scan = False
         self.liked_tracks_cache_state = {}
+        self.playlist_snapshot_state = {}
+        self.current_playlist_snapshot_id = None
+        self.playlist_unchanged = False
         self.current_liked_tracks_cache_key = None
         self.current_liked_tracks_latest_added_at = None
 
@@ -223,21 +311,30 @@ class Unify:
 
         return client_id, client_secret, redirect_uri
 
+    def create_spotipy_auth_manager(self):
+        client_id, client_secret, redirect_uri = self.load_spotify_env()
+
+        scope = "user-library-read playlist-read-private playlist-read-collaborative"
+        return SpotifyOAuth(
+            client_id=client_id,
+            client_secret=client_secret,
+            redirect_uri=redirect_uri,
+            scope=scope,
+            cache_path=self.get_runtime_file_path(".cache-spotipy"),
+            open_browser=True
+        )
+
     def create_spotipy_session(self, verbose=True):
         try:
-            client_id, client_secret, redirect_uri = self.load_spotify_env()
-
-            scope = "user-library-read playlist-read-private playlist-read-collaborative"
-            self.spotipy_auth_manager = SpotifyOAuth(
-                client_id=client_id,
-                client_secret=client_secret,
-                redirect_uri=redirect_uri,
-                scope=scope,
-                cache_path=self.get_runtime_file_path(".cache-spotipy"),
-                open_browser=True
-            )
-
+            self.spotipy_auth_manager = self.create_spotipy_auth_manager()
             self.spotipy_session = spotipy.Spotify(auth_manager=self.spotipy_auth_manager)
+            # spotipy retries 429s itself; the response hook still sees them in the retry history
+            self.spotipy_session._session.hooks['response'].append(self.record_spotipy_response)
+
+            # e.g. a local mock server for load testing
+            if self.config.get('spotify_api_url'):
+                self.spotipy_session.prefix = f"{self.config['spotify_api_url'].rstrip('/')}/"
+
             self.ensure_spotipy_token()
 
             if verbose:
@@ -263,11 +360,38 @@ class Unify:
         if not validated_token:
             self.spotipy_auth_manager.get_access_token(as_dict=False)
 
+    def record_spotipy_response(self, response, *args, **kwargs):
+        self.spotipy_response_stats.rate_limited = count_rate_limited_responses(response)
+        self.spotipy_response_stats.bytes = len(response.content)
+
+    def call_spotipy_method(self, method_name, *args, **kwargs):
+        self.spotipy_response_stats.rate_limited = 0
+        self.spotipy_response_stats.bytes = 0
+        started_at = time.perf_counter()
+        status = 200
+
+        try:
+            return getattr(self.spotipy_session, method_name)(*args, **kwargs)
+        except SpotifyException as e:
+            status = e.http_status
+            raise
+        except Exception:
+            status = None
+            raise
+        finally:
+            self.metrics.record_request(
+                'spotipy',
+                method_name,
+                time.perf_counter() - started_at,
+                status,
+                self.spotipy_response_stats.bytes,
+                self.spotipy_response_stats.rate_limited,
+            )
+
     def call_spotipy(self, method_name, *args, retry_count=0, **kwargs):
         try:
             self.ensure_spotipy_token()
-            method = getattr(self.spotipy_session, method_name)
-            return method(*args, **kwargs)
+            return self.call_spotipy_method(method_name, *args, **kwargs)
 
         except SpotifyException as e:
             if e.http_status == 401 and retry_count < 1:
@@ -356,7 +480,7 @@ class Unify:
                 f"Warning: invalid download_format in config; using 'mp3'.")
             self.config["download_format"] = "mp3"
 
-        for path_key in ("temp_download_folder", "archive_folder"):
+        for path_key in ("temp_download_folder", "archive_folder", "content_store_folder"):
             if self.config.get(path_key):
                 self.config[path_key] = os.path.abspath(
                     os.path.expanduser(self.config[path_key]))
@@ -409,6 +533,10 @@ class Unify:
         self.spotify_track_ids = set()
         self.local_track_ids = set()
 
+        self.spotify_tracks_failed = []
+        self.spotify_tracks_downloaded = []
+        self.download_errors = []
+        self.track_matches = []
         self.completed_index = 0
         self.progress_bar_text = ''
 
@@ -420,6 +548,7 @@ class Unify:
 
         if not os.path.isfile(state_path):
             self.liked_tracks_cache_state = {}
+            self.playlist_snapshot_state = {}
             return
 
         try:
@@ -428,13 +557,18 @@ class Unify:
 
             liked_state = loaded_state.get("liked_tracks_last_scan", {})
             self.liked_tracks_cache_state = liked_state if isinstance(liked_state, dict) else {}
+
+            playlist_state = loaded_state.get("playlist_snapshots", {})
+            self.playlist_snapshot_state = playlist_state if isinstance(playlist_state, dict) else {}
         except Exception:
             self.liked_tracks_cache_state = {}
+            self.playlist_snapshot_state = {}
 
     def save_state(self):
         state_path = self.get_state_file_path()
         payload = {
-            "liked_tracks_last_scan": self.liked_tracks_cache_state
+            "liked_tracks_last_scan": self.liked_tracks_cache_state,
+            "playlist_snapshots": self.playlist_snapshot_state,
         }
 
         with open(state_path, "w", encoding="utf-8") as state_file:
@@ -469,6 +603,47 @@ class Unify:
         self.liked_tracks_cache_state[self.current_liked_tracks_cache_key] = self.current_liked_tracks_latest_added_at
         self.save_state()
 
+    def get_playlist_snapshot_key(self):
+        destination = os.path.abspath(self.local_playlist_folder or "")
+        return destination.lower()
+
+    def get_playlist_snapshot_record(self):
+        return {
+            "playlist_id": self.playlist_id,
+            "snapshot_id": self.current_playlist_snapshot_id,
+            "download_format": self.config['download_format'],
+        }
+
+    def is_playlist_unchanged(self):
+        """True when the playlist snapshot and its folder both match the last successful sync."""
+        self.current_playlist_snapshot_id = None
+
+        if self.option_type != "playlist" or self.config.get('full_rescan'):
+            return False
+
+        try:
+            response = self.call_spotipy('playlist', self.playlist_id, fields="snapshot_id")
+            self.current_playlist_snapshot_id = response['snapshot_id']
+        except Exception as e:
+            self.show_status(f"MINOR: Could not retrieve playlist snapshot. ({e})")
+            return False
+
+        last_record = dict(self.playlist_snapshot_state.get(self.get_playlist_snapshot_key()) or {})
+        folder_state = last_record.pop("folder_state", None)
+        if last_record != self.get_playlist_snapshot_record():
+            return False
+
+        return folder_state_matches(self.local_playlist_folder, folder_state)
+
+    def remember_playlist_snapshot(self):
+        if self.option_type != "playlist" or not self.current_playlist_snapshot_id:
+            return
+
+        # taken after the sync, so the files it downloaded or removed are part of the folder state
+        self.playlist_snapshot_state[self.get_playlist_snapshot_key()] = dict(
+            self.get_playlist_snapshot_record(), folder_state=get_folder_state(self.local_playlist_folder))
+        self.save_state()
+
     def prepare_runtime_state(self):
         self.load_state()
 
@@ -511,10 +686,23 @@ class Unify:
         self.playlist_completed_id = self.playlist_completed.add_task(
             "", visible=False)
 
-        # One row each: re-used every track so the live view does not grow without bound
+        # One row per pipeline worker: re-used every track so the live view does not grow without bound
         self.song_progress_id = self.song_progress.add_task("Preparing…")
-        self.download_progress_id = self.download_progress.add_task("", total=None, visible=False)
-        self.metadata_progress_id = self.metadata_progress.add_task("", visible=False)
+        self.download_progress_ids = [
+            self.download_progress.add_task("", total=None, visible=False)
+            for _ in range(self.get_stage_workers('download_jobs'))
+        ]
+        self.metadata_progress_ids = {
+            stage: [
+                self.metadata_progress.add_task("", visible=False)
+                for _ in range(workers)
+            ]
+            for stage, workers in (
+                ('transcode', self.get_stage_workers('transcode_jobs')),
+                ('tag', self.get_stage_workers('tag_jobs')),
+                ('finalize', 1),
+            )
+        }
 
         # PROGRESS PANEL (status_bar last so messages stay at the bottom of the live view)
         self.progress_panel = Panel(
@@ -671,6 +859,65 @@ class Unify:
             self.show_status(
                 f"ERROR: Could not retrieve playlist name. ({e})")
 
+    def prefetch_playlist_names(self, playlist_jobs):
+        """Resolve the names of several playlist jobs at once.
+
+        Names that could not be fetched stay None and are left to get_playlist_name.
+        """
+        pending_jobs = [playlist_job for playlist_job in playlist_jobs if not playlist_job["name"]]
+        if len(pending_jobs) < 2:
+            return
+
+        def fetch_playlist_name(playlist_job):
+            try:
+                return self.call_spotipy('playlist', playlist_job["id"], fields="name")['name']
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.get_fetch_concurrency()) as executor:
+            for playlist_job, playlist_name in zip(pending_jobs, executor.map(fetch_playlist_name, pending_jobs)):
+                playlist_job["name"] = playlist_name
+
+    def create_playlist_app(self, playlist_job, local_playlist_folder):
+        """Return a copy of this app that syncs one playlist of a multi-playlist run.
+
+        The copy shares the config, sessions, caches, state and progress bars with this app
+        and gets its own sync collections.
+        """
+        # created before copying, so every playlist app shares one instance
+        self.get_content_store()
+        self.get_track_store()
+
+        playlist_app = copy.copy(self)
+        playlist_app.reset_sync_collections()
+        playlist_app.playlist_url = playlist_job["url"]
+        playlist_app.playlist_id = playlist_job["id"]
+        playlist_app.playlist_name = playlist_job["name"]
+        playlist_app.local_playlist_folder = local_playlist_folder
+        playlist_app.playlist_unchanged = False
+        return playlist_app
+
+    def queue_playlist_downloads(self, playlist_apps):
+        """Collect the pending downloads of several playlist apps into this app's queue.
+
+        A track pending in several playlists is queued once; download_targets lists every
+        playlist folder it is placed in afterwards.
+        """
+        self.reset_sync_collections()
+        self.download_targets = {}
+        self.playlist_name = f"{len(playlist_apps)} playlists"
+
+        for playlist_app in playlist_apps:
+            self.spotify_tracks_raw.extend(playlist_app.spotify_tracks_raw)
+            self.local_tracks_unmatched.extend(playlist_app.local_tracks_unmatched)
+            self.local_tracks_duplicate.extend(playlist_app.local_tracks_duplicate)
+
+            for spotify_track in playlist_app.spotify_tracks_to_download:
+                download_targets = self.download_targets.setdefault(spotify_track['track_id'], [])
+                if not download_targets:
+                    self.spotify_tracks_to_download.append(spotify_track)
+                download_targets.append((playlist_app, spotify_track))
+
     def get_track_name(self):
         try:
             response = self.call_spotipy('track', self.track_id, market=self.config['region'])
@@ -696,80 +943,26 @@ class Unify:
 
     def get_spotify_tracks_raw(self):
         try:
-            print("Fetching items from Spotify...")
-            tracks_fetched = self.fetch_option_tracks()
+            spotify_tracks = self.load_stored_spotify_tracks()
 
-            for track in tracks_fetched:
-                if not track.get('track'):
-                    continue
+            if spotify_tracks is None:
+                print("Fetching items from Spotify...")
+                spotify_tracks = []
 
-                if track['track']['duration_ms'] == 0 or track['track']['is_local']:
-                    continue
+                for track in self.fetch_option_tracks():
+                    if not track.get('track'):
+                        continue
+
+                    if track['track']['duration_ms'] == 0 or track['track']['is_local']:
+                        continue
+
+                    spotify_tracks.append(self.build_spotify_track(track))
 
-                track_data = track['track']
-                title = track_data['name']
-                artist = ", ".join([artist['name']
-                                   for artist in track_data['artists']])
-                album = track_data['album']['name']
-                albumartist = track_data['album']['artists'][0]['name']
-                total_discs = 1
-                disc_number = track_data['disc_number']
-                total_tracks = track_data['album']['total_tracks']
-                track_number = track_data['track_number']
-                release_date = track_data['album']['release_date']
-                added_at = track.get('added_at') or datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-                duration = track_data['duration_ms']
-                track_url = track_data['external_urls'].get(
-                    'spotify', False)
-                track_uri = track_data['uri']
-                track_id = track_data['id']
-                linked_from = track_data.get('linked_from') or {}
-                linked_from_id = linked_from.get('id')
-                linked_from_uri = linked_from.get('uri')
-                match_track_ids, match_track_uris = self.get_track_aliases(track_data)
-                artist_ids = [artist['id']
-                              for artist in track_data['artists']]
-                is_local = track_data['is_local']
-                is_playable = track_data.get('is_playable', True)
-                save_as = ''
-
-                # 'save_as' will be updated in 'spotify_tracks_fix_save_as' function
-                # 'is_playable' value is 'false' for unavailable tracks and 'None' for uploaded tracks
-
-                image = track_data['album']['images'][0]
-                for i in track_data['album']['images']:
-                    if i['width'] > image['width']:
-                        image = i
-                image_url = image['url']
-
-                spotify_track = {
-                    'title': title,
-                    'artist': artist,
-                    'album': album,
-                    'albumartist': albumartist,
-                    'total_discs': total_discs,
-                    'disc_number': disc_number,
-                    'total_tracks': total_tracks,
-                    'track_number': track_number,
-                    'release_date': release_date,
-                    'added_at': added_at,
-                    'duration': duration,
-                    'image_url': image_url,
-                    'track_url': track_url,
-                    'track_uri': track_uri,
-                    'track_id': track_id,
-                    'linked_from_id': linked_from_id,
-                    'linked_from_uri': linked_from_uri,
-                    'match_track_ids': match_track_ids,
-                    'match_track_uris': match_track_uris,
-                    'artist_ids': artist_ids,
-                    'is_local': is_local,
-                    'is_playable': is_playable,
-                    'save_as': save_as
-                }
+                self.save_stored_spotify_tracks(spotify_tracks)
 
+            for spotify_track in spotify_tracks:
                 self.spotify_tracks_raw.append(spotify_track)
-                self.spotify_track_ids.update(match_track_ids)
+                self.spotify_track_ids.update(spotify_track['match_track_ids'])
 
             # Older liked songs should download first.
             self.spotify_tracks_raw.sort(key=lambda a: a.get('added_at') or '')
@@ -781,6 +974,123 @@ class Unify:
 
         return True
 
+    def build_spotify_track(self, track):
+        track_data = track['track']
+        title = track_data['name']
+        artist = ", ".join([artist['name']
+                           for artist in track_data['artists']])
+        album = track_data['album']['name']
+        albumartist = track_data['album']['artists'][0]['name']
+        total_discs = 1
+        disc_number = track_data['disc_number']
+        total_tracks = track_data['album']['total_tracks']
+        track_number = track_data['track_number']
+        release_date = track_data['album']['release_date']
+        added_at = track.get('added_at') or datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        duration = track_data['duration_ms']
+        track_url = track_data['external_urls'].get(
+            'spotify', False)
+        track_uri = track_data['uri']
+        track_id = track_data['id']
+        linked_from = track_data.get('linked_from') or {}
+        linked_from_id = linked_from.get('id')
+        linked_from_uri = linked_from.get('uri')
+        match_track_ids, match_track_uris = self.get_track_aliases(track_data)
+        artist_ids = [artist['id']
+                      for artist in track_data['artists']]
+        is_local = track_data['is_local']
+        is_playable = track_data.get('is_playable', True)
+        save_as = ''
+
+        # 'save_as' will be updated in 'spotify_tracks_fix_save_as' function
+        # 'is_playable' value is 'false' for unavailable tracks and 'None' for uploaded tracks
+
+        image = track_data['album']['images'][0]
+        for i in track_data['album']['images']:
+            if i['width'] > image['width']:
+                image = i
+        image_url = image['url']
+
+        return {
+            'title': title,
+            'artist': artist,
+            'album': album,
+            'albumartist': albumartist,
+            'total_discs': total_discs,
+            'disc_number': disc_number,
+            'total_tracks': total_tracks,
+            'track_number': track_number,
+            'release_date': release_date,
+            'added_at': added_at,
+            'duration': duration,
+            'image_url': image_url,
+            'track_url': track_url,
+            'track_uri': track_uri,
+            'track_id': track_id,
+            'linked_from_id': linked_from_id,
+            'linked_from_uri': linked_from_uri,
+            'match_track_ids': match_track_ids,
+            'match_track_uris': match_track_uris,
+            'artist_ids': artist_ids,
+            'is_local': is_local,
+            'is_playable': is_playable,
+            'save_as': save_as
+        }
+
+    def get_track_store(self):
+        if self.track_store is None and self.config.get('track_store'):
+            self.track_store = TrackStore(self.get_runtime_file_path("unify-tracks.sqlite3"))
+
+        return self.track_store
+
+    def get_track_store_source(self):
+        # only a playlist sync reads its snapshot_id, so no other copy could be reused
+        if self.option_type == 'playlist':
+            return f"playlist:{self.playlist_id}"
+
+        return None
+
+    def load_stored_spotify_tracks(self):
+        """Tracks of a playlist whose snapshot_id matches the stored one, without fetching its items."""
+        track_store = self.get_track_store()
+        source = self.get_track_store_source()
+
+        if not track_store or not source or self.config.get('full_rescan'):
+            return None
+
+        try:
+            max_age_hours = self.config.get('track_store_max_age_hours')
+            stored_tracks = track_store.load_source(
+                source,
+                self.current_playlist_snapshot_id,
+                self.config['region'],
+                max_age_hours * 3600 if max_age_hours is not None else None,
+            )
+        except Exception as e:
+            self.show_status(f"MINOR: Could not read track store. ({e})")
+            return None
+
+        if stored_tracks is None:
+            return None
+
+        for spotify_track in stored_tracks:
+            spotify_track.update({'total_discs': 1, 'is_local': False, 'save_as': ''})
+
+        print(f"Items loaded from track store: {len(stored_tracks)} (playlist unchanged on Spotify)")
+        return stored_tracks
+
+    def save_stored_spotify_tracks(self, spotify_tracks):
+        track_store = self.get_track_store()
+        source = self.get_track_store_source()
+
+        if not track_store or not source:
+            return
+
+        try:
+            track_store.save_source(source, spotify_tracks, self.current_playlist_snapshot_id, self.config['region'])
+        except Exception as e:
+            self.show_status(f"MINOR: Could not update track store. ({e})")
+
     def fetch_option_tracks(self):
         if self.option_type in {'playlist', 'move_playlist_matches'}:
             return self.fetch_playlist_tracks()
@@ -799,7 +1109,13 @@ class Unify:
             'current_user_saved_tracks', limit=50, offset=0, market=self.config['region'])
         tracks_fetched = []
 
-        while True:
+        # later pages are fetched speculatively; leaving the loop early cancels the rest
+        pages = self.iter_offset_pages(
+            response,
+            lambda offset: self.call_spotipy(
+                'current_user_saved_tracks', limit=50, offset=offset, market=self.config['region']))
+
+        for response in pages:
             should_stop = False
 
             for item in response['items']:
@@ -814,24 +1130,67 @@ class Unify:
 
                 tracks_fetched.append(item)
 
-            if should_stop or not response['next']:
+            if should_stop:
+                pages.close()
                 break
 
-            response = self.call_spotipy('next', response)
-
         return tracks_fetched
 
     def fetch_playlist_tracks(self):
         response = self.call_spotipy(
             'playlist_tracks', self.playlist_id, market=self.config['region'])
-        tracks_fetched = response['items']
+        tracks_fetched = []
 
-        while response['next']:
-            response = self.call_spotipy('next', response)
+        for response in self.iter_offset_pages(
+            response,
+            lambda offset: self.call_spotipy(
+                'playlist_tracks', self.playlist_id, market=self.config['region'], offset=offset),
+        ):
             tracks_fetched.extend(response['items'])
 
         return tracks_fetched
 
+    def iter_offset_pages(self, response, fetch_page):
+        """Yield response and every following page in order.
+
+        The first page's total and limit give every remaining offset, so up to fetch_concurrency
+        pages are requested at once. With fetch_concurrency 1 the 'next' links are followed one by one.
+        """
+        yield response
+
+        page_size = response.get('limit') or len(response['items'])
+        total = response.get('total') or 0
+        concurrency = self.get_fetch_concurrency()
+
+        if concurrency > 1 and page_size and response['next']:
+            offsets = iter(range(response.get('offset', 0) + page_size, total, page_size))
+
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                pending = deque(
+                    executor.submit(fetch_page, offset)
+                    for offset in itertools.islice(offsets, concurrency))
+
+                try:
+                    while pending:
+                        response = pending.popleft().result()
+
+                        next_offset = next(offsets, None)
+                        if next_offset is not None:
+                            pending.append(executor.submit(fetch_page, next_offset))
+
+                        yield response
+                finally:
+                    for page in pending:
+                        page.cancel()
+
+        # items added while paging (or concurrency 1) continue through the 'next' links
+        while response['next']:
+            response = self.call_spotipy('next', response)
+            yield response
+
+    def get_fetch_concurrency(self):
+        return max(1, int(self.config.get('fetch_concurrency') or 1))
+
     def fetch_track(self):
         response = self.call_spotipy('track', self.track_id, market=self.config['region'])
         return [{
@@ -839,71 +1198,153 @@ class Unify:
             'track': response,
         }]
 
+    def get_library_index_file_path(self):
+        return self.get_runtime_file_path("unify-library-index.json")
+
+    def read_local_track_tags(self, file_path):
+        # header-only read first; the full music_tag parse is only needed for files without a Spotify URI
+        header_tags = read_track_tags(file_path)
+        if header_tags and header_tags['comment']:
+            return self.build_local_track_tags(
+                header_tags['title'].strip(),
+                header_tags['artist'],
+                header_tags['album'],
+                header_tags['comment'],
+                header_tags['length'])
+
+        music_file = music_tag.load_file(file_path)
+
+        tracktitle = str(music_file['tracktitle']).strip()
+
+        return self.build_local_track_tags(
+            tracktitle or str(music_file['title']).strip(),
+            str(music_file['artist']),
+            str(music_file['album']),
+            str(music_file['comment']),
+            float(str(music_file['#length'])))
+
+    def build_local_track_tags(self, title, artist, album, track_uri, length):
+        return {
+            "title": title,
+            "artist": artist,
+            "album": album,
+            "track_uri": track_uri,
+            "track_id": track_uri.split(":")[-1],
+            "duration": round(length * 1000),
+        }
+
+    def build_local_track(self, file_path, track_tags):
+        file_dir, file = os.path.split(file_path)
+        file_name, file_extension = os.path.splitext(file)
+        match_track_ids, match_track_uris = self.get_local_track_aliases(
+            track_tags['track_uri'], track_tags['track_id'])
+
+        return {
+            "title": track_tags['title'],
+            "artist": track_tags['artist'],
+            "album": track_tags['album'],
+            "track_uri": track_tags['track_uri'],
+            "track_id": track_tags['track_id'],
+            "match_track_ids": match_track_ids,
+            "match_track_uris": match_track_uris,
+            "duration": track_tags['duration'],
+            "file_path": file_path,
+            "file_dir": file_dir,
+            "file_name": file_name,
+            "file_extension": file_extension[1:]
+        }
+
+    def get_scan_workers(self):
+        return max(1, int(self.config.get('scan_workers') or 1))
+
+    def load_local_track(self, file_path, library_index):
+        """Return the local track and whether its tags came from the library index."""
+        # unchanged files are served from the library index instead of re-reading their tags
+        file_stat = os.stat(file_path)
+        track_tags = library_index.lookup(file_path, file_stat)
+
+        if track_tags is not None:
+            return self.build_local_track(file_path, track_tags), True
+
+        track_tags = self.read_local_track_tags(file_path)
+        library_index.store(file_path, file_stat, track_tags)
+        return self.build_local_track(file_path, track_tags), False
+
+    def load_library_index(self):
+        library_index = LocalLibraryIndex(
+            self.get_library_index_file_path(), full_rescan=self.config.get('full_rescan', False))
+        library_index.load()
+        return library_index
+
+    def save_library_index(self, library_index):
+        library_index.prune()
+
+        try:
+            library_index.save()
+        except Exception as e:
+            self.show_status(
+                f"MINOR: Could not save local library index. ({e})")
+
     def get_local_tracks_raw(self, root_folder=None, max_depth=None):
+        # a shared index is pruned and saved by its owner once every folder has been scanned
+        library_index = self.shared_library_index or self.load_library_index()
+
+        scan_workers = self.get_scan_workers()
+        executor = ThreadPoolExecutor(max_workers=scan_workers) if scan_workers > 1 else None
+
         try:
             root_folder = root_folder or self.local_playlist_folder
             root_folder = os.path.abspath(root_folder)
+            download_extension = self.config['download_format'].lower()
+            file_paths = []
+            # counted here rather than read from the index, which other playlists may be scanning into
+            unchanged_folder_count = 0
+            index_hits = 0
 
-            for folder, subfolders, files in os.walk(root_folder):
-                # calculate depth
-                current_depth = folder[len(root_folder):].count(os.sep)
-
-                # max_depth: None (scan everything, all subfolders), 0 (only root folder), 1 (root + one level deep), 2 (root + 2 levels deep)
-
-                if max_depth is not None and current_depth >= max_depth:
-                    subfolders[:] = []  # stop deeper traversal
+            # max_depth: None (scan everything, all subfolders), 0 (only root folder), 1 (root + one level deep), 2 (root + 2 levels deep)
+            for folder, files in walk_library_folder(root_folder, max_depth, executor, library_index.list_folder):
+                library_index.mark_folder_visited(folder)
+                unchanged_folder_count += library_index.is_folder_unchanged(folder)
 
                 for file in files:
                     file_path = os.path.join(folder, file)
-                    file_dir = folder
-                    file_name = os.path.splitext(file)[0]
-                    file_extension = os.path.splitext(file)[1][1:]
-
-                    if file_extension.lower() == self.config['download_format'].lower():
-                        music_file = music_tag.load_file(file_path)
-
-                        tracktitle = str(music_file['tracktitle']).strip()
-                        title = tracktitle or str(music_file['title']).strip()
-                        artist = str(music_file['artist'])
-                        album = str(music_file['album'])
-                        track_uri = str(music_file['comment'])
-                        track_id = str(music_file['comment']).split(":")[-1]
-                        match_track_ids, match_track_uris = self.get_local_track_aliases(track_uri, track_id)
-                        duration = round(
-                            float(str(music_file['#length'])) * 1000)
-
-                        local_track = {
-                            "title": title,
-                            "artist": artist,
-                            "album": album,
-                            "track_uri": track_uri,
-                            "track_id": track_id,
-                            "match_track_ids": match_track_ids,
-                            "match_track_uris": match_track_uris,
-                            "duration": duration,
-                            "file_path": file_path,
-                            "file_dir": file_dir,
-                            "file_name": file_name,
-                            "file_extension": file_extension
-                        }
-
-                        self.local_tracks_raw.append(local_track)
-                        self.local_track_ids.update(match_track_ids)
+                    library_index.mark_path_seen(file_path)
+
+                    if os.path.splitext(file)[1][1:].lower() == download_extension:
+                        file_paths.append(file_path)
+
+            # map keeps the walk order, so ties in the sort below stay in the same order as a serial scan
+            if executor:
+                local_tracks = executor.map(
+                    lambda file_path: self.load_local_track(file_path, library_index), file_paths)
+            else:
+                local_tracks = (self.load_local_track(file_path, library_index) for file_path in file_paths)
+
+            for local_track, from_index in local_tracks:
+                index_hits += from_index
+                self.local_tracks_raw.append(local_track)
+                self.local_track_ids.update(local_track['match_track_ids'])
 
             # sort by title, but if titles are same then sort by artist
             self.local_tracks_raw.sort(key=lambda a: (
                 a['title'].lower(), a['artist'].lower()))
 
+            print(
+                f"Local tracks: {len(self.local_tracks_raw)} | From library index: {index_hits} | Read from file: {len(file_paths) - index_hits} | Unchanged folders: {unchanged_folder_count}")
+
         except Exception as e:
             self.status_bar.update(
                 self.status_bar_id, description=f"ERROR: Could not get local tracks. ({e})", visible=True)
 
+        finally:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+            if library_index is not self.shared_library_index:
+                self.save_library_index(library_index)
+
     def normalize_text(self, value):
-        normalized = unicodedata.normalize('NFKC', str(value or ''))
-        normalized = normalized.replace('\u2019', "'").replace('\u2018', "'")
-        normalized = normalized.replace('\u2013', "-").replace('\u2014', "-")
-        normalized = re.sub(r'\s+', ' ', normalized)
-        return normalized.strip().lower()
+        return normalize_text(value)
 
     def get_track_aliases(self, track_data):
         track_ids = set()
@@ -940,23 +1381,7 @@ class Unify:
         return track_ids, track_uris
 
     def tracks_match(self, spotify_track, local_track):
-        spotify_track_ids = spotify_track.get('match_track_ids') or {spotify_track.get('track_id')}
-        spotify_track_uris = spotify_track.get('match_track_uris') or {spotify_track.get('track_uri')}
-        local_track_ids = local_track.get('match_track_ids') or {local_track.get('track_id')}
-        local_track_uris = local_track.get('match_track_uris') or {local_track.get('track_uri')}
-
-        if spotify_track_ids & local_track_ids:
-            return True
-
-        if spotify_track_uris & local_track_uris:
-            return True
-
-        return (
-            self.normalize_text(spotify_track['title']) == self.normalize_text(local_track['title']) and
-            self.normalize_text(spotify_track['artist']) == self.normalize_text(local_track['artist']) and
-            self.normalize_text(spotify_track['album']) == self.normalize_text(local_track['album']) and
-            abs(spotify_track['duration'] - local_track['duration']) <= 2000
-        )
+        return tracks_match(spotify_track, local_track)
 
     def get_track_signature(self, track):
         return (
@@ -1027,6 +1452,12 @@ class Unify:
             self.archive_local_track(local_track)
             return
 
+        # only this folder's link is removed; the stored file goes once nothing links to it
+        content_store = self.get_content_store()
+        if content_store and content_store.holds(local_track['file_path']):
+            os.remove(local_track['file_path'])
+            return
+
         send2trash(local_track['file_path'])
 
     def spotify_tracks_remove_uploaded(self):
@@ -1101,12 +1532,10 @@ class Unify:
         if self.did_partial_library_scan:
             return
 
+        spotify_tracks_index = TrackMatchIndex(self.spotify_tracks_raw)
+
         for local_track in self.local_tracks_raw:
-            matched_spotify_track = next(
-                (spotify_track for spotify_track in self.spotify_tracks_raw if self.tracks_match(
-                    spotify_track, local_track)),
-                None
-            )
+            matched_spotify_track = spotify_tracks_index.find(local_track)
 
             if not matched_spotify_track:
                 self.local_tracks_unmatched.append(local_track)
@@ -1123,7 +1552,7 @@ class Unify:
 
             if local_track_signature in checked_ids:
                 self.local_tracks_duplicate.append(local_track)
-                send2trash(local_track['file_path'])
+                self.dispose_local_track(local_track)
 
             else:
                 checked_ids.add(local_track_signature)
@@ -1154,22 +1583,17 @@ class Unify:
 
         moved_count = 0
         skipped_count = 0
-        matched_paths = set()
+        local_tracks_index = TrackMatchIndex(self.local_tracks_raw)
 
         with Live(self.progress_panel_alt, refresh_per_second=10):
             for spotify_track in self.spotify_tracks_raw:
-                matched_local_track = next(
-                    (
-                        local_track for local_track in self.local_tracks_raw
-                        if local_track['file_path'] not in matched_paths and self.tracks_match(spotify_track, local_track)
-                    ),
-                    None
-                )
+                matched_local_track = local_tracks_index.find(spotify_track)
 
                 if not matched_local_track:
                     continue
 
-                matched_paths.add(matched_local_track['file_path'])
+                # each local file can only be moved for one Spotify track
+                local_tracks_index.remove(matched_local_track)
 
                 if os.path.abspath(matched_local_track['file_dir']) == os.path.abspath(destination_folder):
                     skipped_count += 1
@@ -1198,15 +1622,14 @@ class Unify:
     ######################################################
 
     def get_spotify_tracks_to_download(self):
+        local_tracks_index = TrackMatchIndex(self.local_tracks_raw)
+
         for spotify_track in self.spotify_tracks_raw:
-            matched_local_track = next(
-                (local_track for local_track in self.local_tracks_raw if self.tracks_match(
-                    spotify_track, local_track)),
-                None
-            )
+            matched_local_track = local_tracks_index.find(spotify_track)
 
             if matched_local_track:
                 self.spotify_tracks_already_downloaded.append(spotify_track)
+                self.track_matches.append((spotify_track, matched_local_track))
             else:
                 self.spotify_tracks_to_download.append(spotify_track)
 
@@ -1215,51 +1638,77 @@ class Unify:
 
     ######################################################
 
+    def get_stage_workers(self, key):
+        if key == 'transcode_jobs' and not self.config.get(key):
+            # ffmpeg runs in its own process, so one job per core keeps every core busy
+            return os.cpu_count() or 1
+
+        return max(1, int(self.config.get(key) or 1))
+
+    def start_ffmpeg(self, command, **popen_options):
+        priority = str(self.config.get('transcode_priority') or 'normal').lower()
+        nice_increment, priority_class = TRANSCODE_PRIORITIES.get(priority, TRANSCODE_PRIORITIES['normal'])
+
+        if nice_increment and platform.system() == "Windows":
+            popen_options['creationflags'] = priority_class
+
+        process = subprocess.Popen(command, **popen_options)
+
+        # reniced after the spawn: preexec_fn is not safe while the pipeline's threads run
+        if nice_increment and hasattr(os, 'setpriority'):
+            try:
+                os.setpriority(
+                    os.PRIO_PROCESS, process.pid, os.getpriority(os.PRIO_PROCESS, 0) + nice_increment)
+            except OSError:
+                pass  # already exited
+
+        return process
+
+    def update_playlist_progress(self):
+        self.playlist_progress.update(
+            self.playlist_progress_id, description=f"{self.playlist_name} | Total Songs: {len(self.spotify_tracks_raw)} | To Download: {len(self.spotify_tracks_to_download) - self.completed_index} | Removed: {len(self.local_tracks_unmatched) + len(self.local_tracks_duplicate)} |")
+
     def download_handler(self):
         all_downloads_succeeded = True
 
         if self.spotify_tracks_to_download:
             with Live(self.progress_panel, refresh_per_second=10):
-                for spotify_track in self.spotify_tracks_to_download:
-                    self.currently_downloading_track = spotify_track
-
-                    self.status_bar.update(self.status_bar_id, description="", visible=False)
-                    self.song_progress.update(
-                        self.song_progress_id,
-                        description=f"{spotify_track['title']} is downloading")
-                    self.metadata_progress.update(self.metadata_progress_id, visible=False)
-
-                    self.playlist_progress.update(
-                        self.playlist_progress_id, description=f"{self.playlist_name} | Total Songs: {len(self.spotify_tracks_raw)} | To Download: {len(self.spotify_tracks_to_download) - self.completed_index} | Removed: {len(self.local_tracks_unmatched) + len(self.local_tracks_duplicate)} |")
-
-                    # RUN TASKS
-                    download_succeeded = self.downloader()
-                    all_downloads_succeeded = all_downloads_succeeded and download_succeeded
-
-                    if download_succeeded:
-                        if self.set_file_mtime_from_added_at:
-                            self.change_modification_date_to_added_date()
-                        self.move_downloaded_track()
-
-                    self.newly_downloaded_track_genres = ''
-                    self.newly_downloaded_track_lyrics = ''
-                    self.completed_index += 1
-
-                    # UPDATE PROGRESS AFTER SONG DOWNLOAD
-                    self.metadata_progress.update(
-                        self.metadata_progress_id, visible=False)
-
-                    self.song_progress.update(
-                        self.song_progress_id,
-                        description=(
-                            f"[bold green]{spotify_track['title']} downloaded"
-                            if download_succeeded
-                            else f"[bold red]{spotify_track['title']} failed"
+                self.update_playlist_progress()
+                self.prefetch_artist_genres()
+
+                # shared by the pipeline's workers, so they are created before any worker starts
+                self.get_http_session()
+                self.get_audio_source()
+                self.get_content_store()
+                self.get_lyrics_cache()
+                self.get_cover_cache()
+
+                # download -> transcode -> genres/lyrics/tags -> move, each stage with its own workers
+                self.download_pipeline = DownloadPipeline(
+                    [
+                        PipelineStage("download", self.run_download_stage, self.get_stage_workers('download_jobs')),
+                        PipelineStage(
+                            "transcode",
+                            self.run_transcode_stage,
+                            self.get_stage_workers('transcode_jobs'),
+                            # bounds how many downloaded .ogg files can wait for an encoder
+                            queue_size=self.config.get('transcode_queue_size'),
                         ),
+                        PipelineStage("tag", self.run_tag_stage, self.get_stage_workers('tag_jobs')),
+                        PipelineStage("finalize", self.run_finalize_stage, 1),
+                    ],
+                    on_finished=self.finish_download_job,
+                )
+                self.download_pipeline.run(
+                    DownloadJob(
+                        spotify_track,
+                        self.download_targets.get(spotify_track['track_id'], [(self, spotify_track)]),
                     )
+                    for spotify_track in self.spotify_tracks_to_download
+                )
 
-                    self.playlist_progress.update(
-                        self.playlist_progress_id, description=f"{self.playlist_name} | Total Songs: {len(self.spotify_tracks_raw)} | To Download: {len(self.spotify_tracks_to_download) - self.completed_index} | Removed: {len(self.local_tracks_unmatched) + len(self.local_tracks_duplicate)} |")
+                all_downloads_succeeded = not self.spotify_tracks_failed
+                self.save_caches()
 
                 # PLAYLIST COMPLETED MESSAGE
                 self.playlist_progress.update(
@@ -1267,6 +1716,8 @@ class Unify:
                 self.playlist_completed.update(
                     self.playlist_completed_id, description=f"[bold green]{self.playlist_name} sync completed", visible=True)
 
+            self.report_download_errors()
+
         else:
             with Live(self.progress_panel_alt, refresh_per_second=10):
                 self.playlist_completed.update(
@@ -1274,147 +1725,312 @@ class Unify:
 
         return all_downloads_succeeded
 
-    def downloader(self):
-        spotify_track = self.currently_downloading_track
+    def report_download_errors(self):
+        # printed once the live display is gone, so the tracebacks stay readable
+        for spotify_track, stage_name, error in self.download_errors:
+            print(f"\nERROR: '{spotify_track['title']}' failed in the {stage_name} stage.\n{error}")
+
+        for error in self.download_pipeline.callback_errors:
+            print(f"\nERROR: Could not record a finished download.\n{error}")
+
+    def finish_download_job(self, job):
+        spotify_track = job.spotify_track
+
+        with self.progress_lock:
+            if not job.succeeded:
+                self.spotify_tracks_failed.append(spotify_track)
+            if job.error:
+                self.download_errors.append((spotify_track, job.error_stage, job.error))
+
+            placed_files = {id(target_track): file_path for _, target_track, file_path in job.placed_files}
+            for target_app, target_track in job.targets:
+                file_path = placed_files.get(id(target_track))
+                if file_path:
+                    target_app.spotify_tracks_downloaded.append((target_track, file_path))
+                elif target_app is not self:
+                    target_app.spotify_tracks_failed.append(target_track)
+
+            self.completed_index += 1
+
+            # UPDATE PROGRESS AFTER SONG DOWNLOAD
+            self.song_progress.update(
+                self.song_progress_id,
+                description=(
+                    f"[bold green]{spotify_track['title']} downloaded"
+                    if job.succeeded
+                    else f"[bold red]{spotify_track['title']} failed"
+                ),
+            )
+
+            self.update_playlist_progress()
+
+        self.write_metrics_textfile_periodically()
+
+    def run_download_stage(self, job, worker_index):
+        job.download_progress_id = self.download_progress_ids[worker_index]
+        self.status_bar.update(self.status_bar_id, description="", visible=False)
+        self.song_progress.update(
+            self.song_progress_id,
+            description=f"{job.spotify_track['title']} is downloading")
+
+        try:
+            with self.metrics.measure("download") as stage:
+                if self.use_stored_track(job):
+                    return True
+
+                self.prepare_download_job(job)
+                downloaded = self.download_audio_stream(job)
+                stage.items = 1
+                stage.bytes = job.downloaded_bytes
+                return downloaded
+        finally:
+            self.download_progress.update(job.download_progress_id, visible=False)
+
+    def run_transcode_stage(self, job, worker_index):
+        job.metadata_progress_id = self.metadata_progress_ids['transcode'][worker_index]
+
+        try:
+            with self.metrics.measure("transcode") as stage:
+                stage.items = not job.transcoded
+                return self.transcode_audio(job)
+        finally:
+            self.metadata_progress.update(job.metadata_progress_id, visible=False)
+
+    def run_tag_stage(self, job, worker_index):
+        job.metadata_progress_id = self.metadata_progress_ids['tag'][worker_index]
+
+        # stored tracks were tagged before they went into the store
+        if job.content_store_file:
+            return True
+
+        try:
+            with self.metrics.measure("genres"):
+                self.fetch_genres(job)
+            with self.metrics.measure("lyrics") as stage:
+                self.fetch_lyrics(job)
+                stage.items = bool(job.lyrics)
+            with self.metrics.measure("tagging"):
+                return self.add_metadata(job)
+        finally:
+            self.metadata_progress.update(job.metadata_progress_id, visible=False)
+
+    def run_finalize_stage(self, job, worker_index):
+        job.metadata_progress_id = self.metadata_progress_ids['finalize'][worker_index]
+
+        try:
+            with self.metrics.measure("move") as stage:
+                content_store = self.get_content_store()
+                if content_store and not job.content_store_file:
+                    self.store_downloaded_track(job, content_store)
+
+                # a track queued by several playlists is copied into each folder; the last one gets the file itself
+                for target_index, (target_app, spotify_track) in enumerate(job.targets):
+                    keep_file = target_index < len(job.targets) - 1
+                    target_app.place_downloaded_track(job, spotify_track, keep_file)
+
+                stage.items = len(job.placed_files)
+        finally:
+            self.metadata_progress.update(job.metadata_progress_id, visible=False)
+
+    def update_job_progress(self, job, description):
+        self.metadata_progress.update(
+            job.metadata_progress_id, description=f"{description} | {job.spotify_track['title']}", visible=True)
+
+    def prepare_download_job(self, job):
+        spotify_track = job.spotify_track
         temp_basename = f"{spotify_track['track_id']}_{spotify_track['save_as']}"
         temp_basename = re.sub(r'[\\/*?:"<>|]', "", temp_basename).strip()
 
-        self.temp_download_file = os.path.join(
+        job.temp_download_file = os.path.join(
             self.config['temp_download_folder'], f"{temp_basename}.ogg")
-        self.temp_transcode_file = os.path.join(
+        job.temp_transcode_file = os.path.join(
             self.config['temp_download_folder'], f"{temp_basename}.{self.config['download_format']}")
-        self.final_output_file = os.path.join(
-            self.local_playlist_folder, f"{spotify_track['save_as']}.{self.config['download_format']}")
 
         # create temp folder
         if not os.path.exists(self.config['temp_download_folder']):
-            os.makedirs(self.config['temp_download_folder'])
+            os.makedirs(self.config['temp_download_folder'], exist_ok=True)
             self.hide_path_if_supported(self.config['temp_download_folder'])
 
         # clear stale temp files for this track
-        for temp_file in (self.temp_download_file, self.temp_transcode_file):
+        for temp_file in (job.temp_download_file, job.temp_transcode_file):
             if os.path.exists(temp_file):
                 Path(temp_file).unlink()
 
-        # download audio, transcode temp downloaded file to a useable format, fetch genres and lyrics, add metadata
-        if not self.download_audio_stream():
-            return False
-
-        if not self.transcode_audio():
-            return False
-
-        self.fetch_genres()
-        self.fetch_lyrics()
+    def get_audio_source(self):
+        if self.audio_source is None:
+            self.audio_source = LibrespotAudioSource(self.librespot_session)
 
-        if not self.add_metadata():
-            return False
+        return self.audio_source
 
-        return True
+    def download_audio_stream(self, job):
+        ffmpeg_process = None
 
-    def download_audio_stream(self):
         try:
-            spotify_track = self.currently_downloading_track
+            spotify_track = job.spotify_track
 
-            quality_options = {
-                'normal': AudioQuality.NORMAL,
-                'high': AudioQuality.HIGH,
-            }
-            download_quality = quality_options[self.config['download_quality']]
+            stream_size, stream_iter = self.get_audio_source().open(
+                spotify_track['track_id'], self.config['download_quality'])
 
-            track_signature = TrackId.from_base62(spotify_track['track_id'])
-            stream = self.librespot_session.content_feeder().load(track_signature,
-                                                                  VorbisOnlyAudioQuality(
-                                                                      download_quality),
-                                                                  False, None)
+            total_for_bar = stream_size if stream_size and stream_size > 0 else None
+            self.download_progress.reset(
+                job.download_progress_id,
+                total=total_for_bar,
+                completed=0,
+                visible=True,
+                description=spotify_track['title'],
+            )
 
-            stream_size = stream.input_stream.size
-            stream_iter = stream.input_stream.stream()
+            # ogg passthrough: the stream already is Ogg Vorbis, so it goes straight to the staging file
+            if self.uses_ogg_passthrough():
+                file = open(job.temp_transcode_file, 'wb')
 
-            total_for_bar = stream_size if stream_size and stream_size > 0 else None
-            if hasattr(self.download_progress, "reset"):
-                self.download_progress.reset(
-                    self.download_progress_id,
-                    total=total_for_bar,
-                    completed=0,
-                    visible=True,
-                    description="Downloading audio stream",
-                )
+            # streaming mode: encode while downloading instead of writing a temp .ogg first
+            elif self.config.get('stream_transcode'):
+                try:
+                    ffmpeg_process = self.start_streaming_transcode(job)
+                except FileNotFoundError:
+                    self.status_bar.update(
+                        self.status_bar_id, description=f"Skipping {self.get_transcode_codec().upper()} conversion (FFMPEG not found)", visible=True)
+                    return False
+
+                file = ffmpeg_process.stdin
             else:
-                self.download_progress.update(
-                    self.download_progress_id,
-                    total=total_for_bar,
-                    completed=0,
-                    visible=True,
-                    description="Downloading audio stream",
-                )
+                file = open(job.temp_download_file, 'wb')
 
-            with open(self.temp_download_file, 'wb') as file:
+            with file:
                 while True:
                     chunk = stream_iter.read(self.config['chunk_size'])
                     if not chunk:
                         break
                     file.write(chunk)
+                    job.downloaded_bytes += len(chunk)
                     self.download_progress.update(
-                        self.download_progress_id,
+                        job.download_progress_id,
                         advance=len(chunk),
                     )
 
-            self.download_progress.update(
-                self.download_progress_id, visible=False)
+            if ffmpeg_process:
+                if ffmpeg_process.wait() != 0:
+                    raise RuntimeError(
+                        f"ffmpeg exited with code {ffmpeg_process.returncode}: {self.read_ffmpeg_errors(ffmpeg_process)}")
+
+            job.transcoded = self.uses_ogg_passthrough() or ffmpeg_process is not None
 
             return True
 
         except Exception as e:
+            if ffmpeg_process:
+                if ffmpeg_process.poll() is None:
+                    ffmpeg_process.kill()
+                ffmpeg_process.wait()
+
+                # a broken pipe only means ffmpeg gave up; its own message says why
+                if isinstance(e, BrokenPipeError):
+                    e = self.read_ffmpeg_errors(ffmpeg_process) or e
+
+                if os.path.exists(job.temp_transcode_file):
+                    Path(job.temp_transcode_file).unlink()
+
             self.status_bar.update(
                 self.status_bar_id, description=f"ERROR: Could not download audio stream. ({e})", visible=True)
             return False
 
-    def transcode_audio(self):
-        try:
-            self.metadata_progress.update(
-                self.metadata_progress_id, description="Transcoding audio", visible=True)
+    def uses_ogg_passthrough(self):
+        return self.config['download_format'] == 'ogg'
+
+    def get_transcode_codec(self):
+        codecs = {
+            'm4a': 'aac',
+            'mp3': 'libmp3lame',
+            'ogg': 'copy',
+            'opus': 'libopus',
+        }
 
-            codecs = {
-                'm4a': 'aac',
-                'mp3': 'libmp3lame',
-                'ogg': 'copy',
-                'opus': 'libopus',
-            }
+        return codecs[self.config['download_format']]
 
-            bitrates = {
-                'normal': '96k',
-                'high': '160k',
-            }
+    def get_transcode_output_params(self):
+        bitrates = {
+            'normal': '96k',
+            'high': '160k',
+        }
 
-            file_codec = codecs[self.config['download_format']]
+        file_codec = self.get_transcode_codec()
 
-            if file_codec != 'copy':
-                bitrate = bitrates[self.config['download_quality']]
-            else:
-                bitrate = None
+        if file_codec != 'copy':
+            bitrate = bitrates[self.config['download_quality']]
+        else:
+            bitrate = None
+
+        output_params = ['-c:a', file_codec]
+        if bitrate:
+            output_params += ['-b:a', bitrate]
+        if self.config['download_format'] == 'm4a':
+            output_params += ['-movflags', '+faststart']
+        if self.config.get('transcode_threads'):
+            output_params += ['-threads', str(self.config['transcode_threads'])]
+
+        return output_params
+
+    def start_streaming_transcode(self, job):
+        command = [
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'ogg', '-i', 'pipe:0',
+            *self.get_transcode_output_params(),
+            job.temp_transcode_file,
+        ]
+
+        ffmpeg_process = self.start_ffmpeg(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+
+        # drained while the download writes to stdin: once the stderr pipe is full, ffmpeg
+        # stops reading stdin and the download blocks forever. Only the last lines are kept.
+        ffmpeg_process.stderr_tail = deque(maxlen=FFMPEG_STDERR_TAIL_LINES)
+        ffmpeg_process.stderr_reader = threading.Thread(
+            target=ffmpeg_process.stderr_tail.extend, args=(ffmpeg_process.stderr,), daemon=True)
+        ffmpeg_process.stderr_reader.start()
+
+        return ffmpeg_process
+
+    def read_ffmpeg_errors(self, ffmpeg_process):
+        # ffmpeg has exited, so its stderr is at EOF and the reader finishes
+        ffmpeg_process.stderr_reader.join()
+        return b"".join(ffmpeg_process.stderr_tail).decode(errors='replace').strip()
+
+    def transcode_audio(self, job):
+        # already in the output format
+        if job.transcoded:
+            return True
+
+        try:
+            self.update_job_progress(job, "Transcoding audio")
 
-            output_params = ['-c:a', file_codec]
-            if bitrate:
-                output_params += ['-b:a', bitrate]
-            if self.config['download_format'] == 'm4a':
-                output_params += ['-movflags', '+faststart']
+            file_codec = self.get_transcode_codec()
+
+            command = [
+                'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+                '-i', job.temp_download_file,
+                *self.get_transcode_output_params(),
+                job.temp_transcode_file,
+            ]
 
             try:
-                ffmpy_method = ffmpy.FFmpeg(
-                    global_options=['-y', '-hide_banner', '-loglevel error'],
-                    inputs={self.temp_download_file: None},
-                    outputs={self.temp_transcode_file: output_params}
-                )
+                ffmpeg_process = self.start_ffmpeg(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                _, ffmpeg_errors = ffmpeg_process.communicate()
 
-                ffmpy_method.run()
+                if ffmpeg_process.returncode != 0:
+                    raise RuntimeError(
+                        f"ffmpeg exited with code {ffmpeg_process.returncode}: {ffmpeg_errors.decode(errors='replace').strip()}")
 
-                if Path(self.temp_download_file).exists():
-                    Path(self.temp_download_file).unlink()
+                if Path(job.temp_download_file).exists():
+                    Path(job.temp_download_file).unlink()
 
-                self.metadata_progress.stop_task(self.metadata_progress_id)
                 return True
 
-            except ffmpy.FFExecutableNotFoundError:
+            except FileNotFoundError:
                 self.status_bar.update(
                     self.status_bar_id, description=f'Skipping {file_codec.upper()} conversion (FFMPEG not found)', visible=True)
                 return False
@@ -1424,44 +2040,196 @@ class Unify:
                 self.status_bar_id, description=f"ERROR: Could not transcode audio stream. ({e})", visible=True)
             return False
 
-    def fetch_genres(self):
+    def get_genre_cache(self):
+        if self.genre_cache is None:
+            ttl_days = self.config.get('genre_cache_ttl_days')
+            self.genre_cache = PersistentCache(
+                self.get_runtime_file_path("unify-cache", "artist-genres.json"),
+                ttl_seconds=ttl_days * 86400 if ttl_days is not None else None,
+                max_entries=self.config.get('genre_cache_max_entries'),
+            )
+            self.genre_cache.load()
+
+        return self.genre_cache
+
+    def save_caches(self):
+        for cache in (self.genre_cache, self.cover_cache, self.lyrics_cache, self.content_store):
+            if cache is not None:
+                cache.save()
+
+    def report_cache_stats(self):
+        self.save_caches()
+
+        if self.genre_cache is not None:
+            lookups = self.genre_cache.hits + self.genre_cache.misses
+            if lookups:
+                print(
+                    f"Artist genre cache: {self.genre_cache.hits}/{lookups} hits ({self.genre_cache.get_hit_rate():.0%}) | Cached artists: {len(self.genre_cache)}")
+
+        if self.lyrics_cache is not None:
+            lookups = self.lyrics_cache.hits + self.lyrics_cache.misses
+            if lookups:
+                print(
+                    f"Lyrics cache: {self.lyrics_cache.hits}/{lookups} hits ({self.lyrics_cache.get_hit_rate():.0%})")
+
+        if self.cover_cache is not None and self.cover_cache.lookups:
+            print(
+                f"Cover art cache: {self.cover_cache.hits}/{self.cover_cache.lookups} hits ({self.cover_cache.hits / self.cover_cache.lookups:.0%}) | Covers downloaded: {self.cover_cache.fetches}")
+
+    def report_metrics(self):
+        if self.config.get('metrics_summary'):
+            console = Console()
+            for table in self.metrics.build_summary_tables(self.format_bytes):
+                console.print(table)
+
+        report_path = self.config.get('metrics_report')
+        if report_path:
+            try:
+                self.metrics.write_report(report_path)
+                print(f"Metrics report written to {report_path}")
+            except OSError as e:
+                print(f"MINOR: Could not write the metrics report. ({e})")
+
+    def get_cache_stats(self):
+        cache_stats = {}
+
+        for cache_name, cache in (('genres', self.genre_cache), ('lyrics', self.lyrics_cache)):
+            if cache is not None:
+                cache_stats[cache_name] = (cache.hits, cache.hits + cache.misses)
+
+        if self.cover_cache is not None:
+            cache_stats['covers'] = (self.cover_cache.hits, self.cover_cache.lookups)
+
+        return cache_stats
+
+    def record_sync_metrics(self, sync_succeeded):
+        track_counts = {
+            'fetched': len(self.spotify_tracks_raw),
+            'matched': len(self.spotify_tracks_already_downloaded),
+            'downloaded': len(self.spotify_tracks_downloaded),
+            'failed': len(self.spotify_tracks_failed),
+            'removed': len(self.local_tracks_unmatched) + len(self.local_tracks_duplicate),
+        }
+        for state, count in track_counts.items():
+            self.metrics.add_tracks(state, count)
+
+        if self.playlist_unchanged:
+            self.metrics.add_playlist('unchanged')
+        else:
+            self.metrics.add_playlist('succeeded' if sync_succeeded else 'failed')
+
+    def write_metrics_textfile(self, run_completed=False):
+        textfile_path = self.config.get('metrics_textfile')
+        if not textfile_path:
+            return
+
+        # pipeline workers write through here too, and every write goes through the same temp file
+        with self.metrics_textfile_lock:
+            self.metrics_textfile_written_at = time.monotonic()
+
+            try:
+                self.metrics.write_textfile(textfile_path, self.get_cache_stats(), run_completed)
+            except OSError as e:
+                self.show_status(
+                    f"MINOR: Could not write the metrics textfile. ({e})")
+
+    def write_metrics_textfile_periodically(self):
+        if time.monotonic() - self.metrics_textfile_written_at >= METRICS_TEXTFILE_INTERVAL:
+            self.write_metrics_textfile()
+
+    def prefetch_artist_genres(self):
+        genre_cache = self.get_genre_cache()
+
+        # unique artists of the whole download queue; cached ones skip the API entirely
+        artist_ids = []
+        for artist_id in dict.fromkeys(
+            artist_id
+            for spotify_track in self.spotify_tracks_to_download
+            for artist_id in spotify_track.get('artist_ids') or []
+            if artist_id and artist_id not in self.artist_genres
+        ):
+            cached_genres = genre_cache.get(artist_id)
+            if cached_genres is not None:
+                self.artist_genres[artist_id] = cached_genres
+            else:
+                artist_ids.append(artist_id)
+
+        # the rest is fetched 50 per request (the endpoint's limit)
+
+        for batch_start in range(0, len(artist_ids), 50):
+            batch = artist_ids[batch_start:batch_start + 50]
+            self.show_status(f"Fetching artist genres ({batch_start + len(batch)}/{len(artist_ids)})")
+
+            try:
+                response = self.call_spotipy('artists', batch)
+            except Exception:
+                # tracks with these artists fall back to their own request in fetch_genres
+                continue
+
+            for artist_id, artist in zip(batch, response.get('artists', [])):
+                self.store_artist_genres(artist_id, artist)
+
+        genre_cache.save()
+        self.status_bar.update(self.status_bar_id, description="", visible=False)
+
+    def store_artist_genres(self, artist_id, artist):
+        self.artist_genres[artist_id] = artist['genres'] if artist else None
+        self.get_genre_cache().put(artist_id, self.artist_genres[artist_id])
+
+    def fetch_genres(self, job):
         try:
-            self.metadata_progress.update(
-                self.metadata_progress_id, description="Fetching genres")
+            self.update_job_progress(job, "Fetching genres")
 
-            response = self.call_spotipy(
-                'artists', self.currently_downloading_track['artist_ids'])
-            artists_fetched = response.get('artists', [])
+            artist_ids = job.spotify_track['artist_ids']
+
+            if all(artist_id in self.artist_genres for artist_id in artist_ids):
+                artists_genres = [self.artist_genres[artist_id] for artist_id in artist_ids]
+            else:
+                response = self.call_spotipy('artists', artist_ids)
+                artists_fetched = response.get('artists', [])
+
+                for artist_id, artist in zip(artist_ids, artists_fetched):
+                    self.store_artist_genres(artist_id, artist)
+
+                artists_genres = [artist['genres'] for artist in artists_fetched]
 
-            artists_genres = [artist['genres'] for artist in artists_fetched]
+            if None in artists_genres:
+                raise ValueError("Artist not found")
 
             genres = ''
             for artist_genre in artists_genres:
                 for genre in artist_genre:
                     genres += genre.title() + ', '
 
-            self.newly_downloaded_track_genres = genres.rstrip(', ')
-
-            self.metadata_progress.stop_task(self.metadata_progress_id)
+            job.genres = genres.rstrip(', ')
 
         except Exception as e:
             self.status_bar.update(
-                self.status_bar_id, description=f"MINOR: Could not fetch genres for '{self.currently_downloading_track['title']}'", visible=True)
+                self.status_bar_id, description=f"MINOR: Could not fetch genres for '{job.spotify_track['title']}'", visible=True)
+
+    def fetch_lyrics(self, job):
+        track_id = job.spotify_track['track_id']
+        lyrics_cache = self.get_lyrics_cache()
+
+        # False marks a track known to have no lyrics
+        cached_lyrics = lyrics_cache.get(track_id)
+        if cached_lyrics is not None:
+            job.lyrics = cached_lyrics or ''
+            return
 
-    def fetch_lyrics(self):
         try:
-            self.metadata_progress.update(
-                self.metadata_progress_id, description="Fetching lyrics")
+            self.update_job_progress(job, "Fetching lyrics")
 
             _, data = self.fetch_url(
-                url=f"https://spclient.wg.spotify.com/color-lyrics/v2/track/{self.currently_downloading_track['track_id']}")
+                url=f"{self.config['spotify_client_url'].rstrip('/')}/color-lyrics/v2/track/{track_id}",
+                no_retry_status_codes={404})
 
             if data:
                 try:
                     lyrics_raw = data['lyrics']['lines']
 
                 except KeyError:
-                    raise ValueError("Lyrics not available")
+                    raise LyricsNotAvailableError("Lyrics not available")
 
                 lyrics = []
                 if (data['lyrics']['syncType'] == "UNSYNCED"):
@@ -1480,23 +2248,29 @@ class Unify:
                         lyrics.append(
                             f'[{ts_minutes}:{ts_seconds}.{ts_millis}]' + line['words'] + '\n')
 
-                self.newly_downloaded_track_lyrics = ''.join(lyrics)
-
-            self.metadata_progress.stop_task(self.metadata_progress_id)
+                job.lyrics = ''.join(lyrics)
+                lyrics_cache.put(track_id, job.lyrics)
 
         except (Exception, ValueError) as e:
+            if isinstance(e, LyricsNotAvailableError) or getattr(e, 'status_code', None) == 404:
+                miss_ttl_hours = self.config.get('lyrics_cache_miss_ttl_hours') or 0
+                lyrics_cache.put(track_id, False, ttl_seconds=miss_ttl_hours * 3600)
+
             self.status_bar.update(
-                self.status_bar_id, description=f"MINOR: Could not fetch lyrics for '{self.currently_downloading_track['title']}'", visible=True)
+                self.status_bar_id, description=f"MINOR: Could not fetch lyrics for '{job.spotify_track['title']}'", visible=True)
 
-    def add_metadata(self):
+    def add_metadata(self, job):
         try:
-            self.metadata_progress.update(
-                self.metadata_progress_id, description="Adding metadata")
+            self.update_job_progress(job, "Adding metadata")
+
+            spotify_track = job.spotify_track
 
-            spotify_track = self.currently_downloading_track
+            if self.uses_ogg_passthrough():
+                self.add_ogg_metadata(job)
+                return True
 
             # add tags
-            music_file = music_tag.load_file(self.temp_transcode_file)
+            music_file = music_tag.load_file(job.temp_transcode_file)
             music_file['tracktitle'] = spotify_track['title']
             music_file['title'] = spotify_track['title']
             music_file['artist'] = spotify_track['artist']
@@ -1509,24 +2283,15 @@ class Unify:
             music_file['comment'] = spotify_track.get('linked_from_uri') or spotify_track['track_uri']
             music_file['composer'] = spotify_track['release_date']
             music_file['year'] = spotify_track['release_date'].split('-')[0]
-            music_file['genre'] = self.newly_downloaded_track_genres
-            music_file['lyrics'] = self.newly_downloaded_track_lyrics
+            music_file['genre'] = job.genres
+            music_file['lyrics'] = job.lyrics
             music_file.save()
 
             # add cover
-            cover_response = requests.get(spotify_track['image_url'])
-            cover_response.raise_for_status()
-
-            cover_bytes = cover_response.content
-            content_type = cover_response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
-            cover_format = {
-                'image/jpeg': 'jpeg',
-                'image/jpg': 'jpeg',
-                'image/png': 'png',
-            }.get(content_type, 'jpeg')
+            cover_bytes, content_type, cover_format = self.fetch_cover_art(spotify_track['image_url'])
 
             if self.config['download_format'] == 'mp3':
-                id3_tags = mutagen.id3.ID3(self.temp_transcode_file)
+                id3_tags = mutagen.id3.ID3(job.temp_transcode_file)
                 id3_tags.delall('APIC')
                 id3_tags.add(mutagen.id3.APIC(
                     encoding=3,
@@ -1535,14 +2300,13 @@ class Unify:
                     desc='Cover',
                     data=cover_bytes
                 ))
-                id3_tags.save(self.temp_transcode_file, v2_version=3)
+                id3_tags.save(job.temp_transcode_file, v2_version=3)
 
             else:
-                music_file = music_tag.load_file(self.temp_transcode_file)
+                music_file = music_tag.load_file(job.temp_transcode_file)
                 music_file['artwork'] = music_tag.Artwork(cover_bytes, fmt=cover_format)
                 music_file.save()
 
-            self.metadata_progress.stop_task(self.metadata_progress_id)
             return True
 
         except Exception as e:
@@ -1550,32 +2314,152 @@ class Unify:
                 self.status_bar_id, description=f"ERROR: Could not write metadata to audio file. ({e})", visible=True)
             return False
 
-    def change_modification_date_to_added_date(self):
+    def get_lyrics_cache(self):
+        if self.lyrics_cache is None:
+            ttl_days = self.config.get('lyrics_cache_ttl_days')
+            self.lyrics_cache = PersistentCache(
+                self.get_runtime_file_path("unify-cache", "lyrics.json"),
+                ttl_seconds=ttl_days * 86400 if ttl_days is not None else None,
+                max_entries=self.config.get('lyrics_cache_max_entries'),
+            )
+            self.lyrics_cache.load()
+
+        return self.lyrics_cache
+
+    def get_cover_cache(self):
+        if self.cover_cache is None:
+            max_megabytes = self.config.get('cover_cache_max_mb')
+            self.cover_cache = CoverArtCache(
+                self.get_runtime_file_path("unify-cache", "covers"),
+                max_bytes=max_megabytes * 1024 * 1024 if max_megabytes is not None else None,
+            )
+            self.cover_cache.load()
+
+        return self.cover_cache
+
+    def download_cover_art(self, image_url):
+        cover_response = self.get_http_session().get(image_url)
+        cover_response.raise_for_status()
+
+        content_type = cover_response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        return cover_response.content, content_type
+
+    def fetch_cover_art(self, image_url):
+        # each album cover is downloaded once, then shared by its tracks and later runs
+        cover_bytes, content_type = self.get_cover_cache().get_or_fetch(image_url, self.download_cover_art)
+        cover_format = {
+            'image/jpeg': 'jpeg',
+            'image/jpg': 'jpeg',
+            'image/png': 'png',
+        }.get(content_type, 'jpeg')
+
+        return cover_bytes, content_type, cover_format
+
+    def add_ogg_metadata(self, job):
+        spotify_track = job.spotify_track
+
+        # same Vorbis comment keys music_tag writes, saved once instead of twice
+        ogg_file = mutagen.oggvorbis.OggVorbis(job.temp_transcode_file)
+        ogg_file['title'] = spotify_track['title']
+        ogg_file['artist'] = spotify_track['artist']
+        ogg_file['album'] = spotify_track['album']
+        ogg_file['albumartist'] = spotify_track['albumartist']
+        ogg_file['disctotal'] = str(spotify_track['total_discs'])
+        ogg_file['discnumber'] = str(spotify_track['disc_number'])
+        ogg_file['tracktotal'] = str(spotify_track['total_tracks'])
+        ogg_file['tracknumber'] = str(spotify_track['track_number'])
+        ogg_file['comment'] = spotify_track.get('linked_from_uri') or spotify_track['track_uri']
+        ogg_file['composer'] = spotify_track['release_date']
+        ogg_file['date'] = spotify_track['release_date'].split('-')[0]
+        ogg_file['genre'] = job.genres
+        ogg_file['lyrics'] = job.lyrics
+
+        cover_bytes, content_type, cover_format = self.fetch_cover_art(spotify_track['image_url'])
+
+        # width/height/depth stay 0 ("unknown"), which avoids decoding the image
+        picture = mutagen.flac.Picture()
+        picture.type = mutagen.id3.PictureType.COVER_FRONT
+        picture.mime = content_type or f'image/{cover_format}'
+        picture.data = cover_bytes
+        ogg_file['metadata_block_picture'] = [base64.b64encode(picture.write()).decode('ascii')]
+
+        ogg_file.save()
+
+    def get_content_store(self):
+        if self.content_store is None and self.config.get('content_store'):
+            self.content_store = ContentStore(
+                self.config.get('content_store_folder') or self.get_runtime_file_path("unify-store"))
+            self.content_store.load()
+
+        return self.content_store
+
+    def get_content_store_key(self, track_id):
+        return track_id, self.config['download_format'], self.config['download_quality']
+
+    def use_stored_track(self, job):
+        content_store = self.get_content_store()
+        if content_store is None:
+            return False
+
+        job.content_store_file = content_store.get(*self.get_content_store_key(job.spotify_track['track_id']))
+        # already transcoded and tagged, so only the finalize stage has work left
+        job.transcoded = bool(job.content_store_file)
+        return job.transcoded
+
+    def store_downloaded_track(self, job, content_store):
+        # hardlinks share one modification time, so it is set once from the first playlist's added_at
+        if self.set_file_mtime_from_added_at:
+            self.change_modification_date_to_added_date(job, job.spotify_track)
+
+        try:
+            job.content_store_file = content_store.add(
+                job.temp_transcode_file, *self.get_content_store_key(job.spotify_track['track_id']))
+        except Exception as e:
+            self.status_bar.update(
+                self.status_bar_id, description=f"ERROR: Could not add track to content store. ({e})", visible=True)
+
+    def collect_content_store_garbage(self):
+        content_store = self.get_content_store()
+        if content_store is None:
+            return
+
+        removed_files, removed_bytes = content_store.collect_garbage()
+        if removed_files:
+            print(
+                f"Content store: removed {removed_files} unreferenced tracks ({removed_bytes / (1024 * 1024):.1f} MB)")
+
+    def place_downloaded_track(self, job, spotify_track, keep_file=False):
+        if self.set_file_mtime_from_added_at and not job.content_store_file:
+            self.change_modification_date_to_added_date(job, spotify_track)
+
+        file_path = self.move_downloaded_track(job, spotify_track, keep_file)
+        if file_path:
+            job.placed_files.append((self, spotify_track, file_path))
+
+    def change_modification_date_to_added_date(self, job, spotify_track):
         if not self.set_file_mtime_from_added_at:
             return
 
         try:
-            self.metadata_progress.update(self.metadata_progress_id, description="Updating modification date", visible=True)
+            self.update_job_progress(job, "Updating modification date")
 
-            timestamp_raw = self.currently_downloading_track['added_at']
+            timestamp_raw = spotify_track['added_at']
             ts_utc = datetime.strptime(timestamp_raw, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
             timestamp_epoch = ts_utc.timestamp()
 
-            os.utime(self.temp_transcode_file, (timestamp_epoch, timestamp_epoch))
-
-            self.metadata_progress.stop_task(self.metadata_progress_id)
+            os.utime(job.temp_transcode_file, (timestamp_epoch, timestamp_epoch))
 
         except Exception as e:
             self.status_bar.update(
                 self.status_bar_id, description=f"ERROR: Could not update modification date of audio file. ({e})", visible=True)
 
-    def move_downloaded_track(self):
+    def move_downloaded_track(self, job, spotify_track, keep_file=False):
         try:
-            self.metadata_progress.update(
-                self.metadata_progress_id, description="Moving file to destination folder")
+            self.update_job_progress(job, "Moving file to destination folder")
 
-            file_path_old = self.temp_transcode_file
-            file_path_new = self.final_output_file
+            file_path_old = job.temp_transcode_file
+            file_path_new = os.path.join(
+                self.local_playlist_folder, f"{spotify_track['save_as']}.{self.config['download_format']}")
 
             if not os.path.exists(self.local_playlist_folder):
                 os.makedirs(self.local_playlist_folder)
@@ -1589,13 +2473,19 @@ class Unify:
                     file_extension
                 )
 
-            shutil.move(file_path_old, file_path_new)
+            if job.content_store_file:
+                self.get_content_store().link(job.content_store_file, file_path_new)
+            elif keep_file:
+                shutil.copy2(file_path_old, file_path_new)
+            else:
+                shutil.move(file_path_old, file_path_new)
 
-            self.metadata_progress.stop_task(self.metadata_progress_id)
+            return file_path_new
 
         except Exception as e:
             self.status_bar.update(
                 self.status_bar_id, description=f"ERROR: ({e})", visible=True)
+            return None
 
     def remove_temp_download_folder(self):
         if os.path.exists(self.config['temp_download_folder']):
@@ -1603,7 +2493,25 @@ class Unify:
 
     ######################################################
 
-    def fetch_url(self, url, retry_count=0):
+    def get_http_session(self):
+        if self.http_session is None:
+            pool_size = int(self.config.get('http_pool_size') or 10)
+            # every tag worker hits the lyrics and image hosts once per track
+            host_pool_size = max(pool_size, self.get_stage_workers('tag_jobs'))
+
+            self.http_session = create_http_session(
+                pool_size=pool_size,
+                timeout=(self.config.get('http_connect_timeout'), self.config.get('http_read_timeout')),
+                retries=2,
+                host_pool_sizes={
+                    SPOTIFY_LYRICS_HOST: host_pool_size,
+                    SPOTIFY_IMAGE_HOST: host_pool_size,
+                },
+            )
+
+        return self.http_session
+
+    def fetch_url(self, url, retry_count=0, no_retry_status_codes=()):
         access_token = self.spotipy_session.auth_manager.get_access_token(
             as_dict=False)
         headers = {
@@ -1613,7 +2521,21 @@ class Unify:
             'app-platform': 'WebPlayer'
         }
 
-        response = requests.get(url, headers=headers)
+        started_at = time.perf_counter()
+        try:
+            response = self.get_http_session().get(url, headers=headers)
+        except Exception:
+            self.metrics.record_request('http', urlsplit(url).netloc, time.perf_counter() - started_at)
+            raise
+
+        self.metrics.record_request(
+            'http',
+            urlsplit(url).netloc,
+            time.perf_counter() - started_at,
+            response.status_code,
+            len(response.content),
+            count_rate_limited_responses(response),
+        )
         response_text = response.text
 
         try:
@@ -1627,6 +2549,11 @@ class Unify:
             error_status = response_json.get('error', {}).get('status', response.status_code)
             error_message = response_json.get('error', {}).get('message', response.reason or 'unknown error')
             retry_limit = self.config.get('retry_attempts', 0)
+
+            # definite answers (e.g. 404 for a track without lyrics) are not worth retrying
+            if response.status_code in no_retry_status_codes:
+                raise FetchUrlError(
+                    f"Reason: {error_status} | Error message: {error_message}", response.status_code)
             retry_delay = 5
 
             if int(error_status) == 429:
@@ -1644,10 +2571,10 @@ class Unify:
                 self.show_status(
                     f"ERROR: Could not fetch the requested URL. (retry {retry_count + 1}) ({error_status}): {error_message}")
                 time.sleep(retry_delay)
-                return self.fetch_url(url, retry_count + 1)
+                return self.fetch_url(url, retry_count + 1, no_retry_status_codes)
 
-            raise Exception(
-                f"Reason: {error_status} | Error message: {error_message}")
+            raise FetchUrlError(
+                f"Reason: {error_status} | Error message: {error_message}", response.status_code)
 
         return response_text, response_json
 